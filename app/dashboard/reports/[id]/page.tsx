@@ -2,7 +2,7 @@
 
 import { useEffect, useState, use } from "react"
 import { useAuth } from "@/app/context/AuthContext"
-import { getReport, modernizeRepo, getModernizationRecommendation } from "@/lib/api"
+import { getReportSummary, getReportFiles, modernizeRepoStream, getModernizationRecommendation, explainOpportunitiesStream } from "@/lib/api"
 import { Card, CardContent, CardHeader, CardTitle } from "@/components/ui/card"
 import { Badge } from "@/components/ui/badge"
 import {
@@ -26,13 +26,21 @@ import {
 import ReactMarkdown from "react-markdown"
 import { AgentOpportunityCard } from "@/components/AgentOpportunityCard"
 
+// The file list is paged from the report's index; only these parts of each file are sent
+const FILES_PAGE_SIZE = 50
+const FILE_FIELDS = ["complexity", "ast.error", "ast.functions", "ast.imports"]
+
 export default function ReportDetailPage({ params }: { params: Promise<{ id: string }> }) {
   const resolvedParams = use(params)
   const { getToken } = useAuth()
   const [report, setReport] = useState<any>(null)
+  const [files, setFiles] = useState<any[]>([])
+  const [filesTotal, setFilesTotal] = useState(0)
+  const [loadingFiles, setLoadingFiles] = useState(false)
   const [loading, setLoading] = useState(true)
   const [recommendation, setRecommendation] = useState<any>(null)
   const [generating, setGenerating] = useState(false)
+  const [explaining, setExplaining] = useState(false)
 
   useEffect(() => {
     const fetchReport = async () => {
@@ -40,16 +48,20 @@ export default function ReportDetailPage({ params }: { params: Promise<{ id: str
         if (!token) return
         
         try {
-            // Fetch report and try to fetch saved recommendation in parallel
-            const reportPromise = getReport(resolvedParams.id, token);
+            // Fetch the report summary, the first page of files and any saved recommendation in parallel
+            const reportPromise = getReportSummary(resolvedParams.id, token, true);
+            const filesPromise = getReportFiles(resolvedParams.id, token, { limit: FILES_PAGE_SIZE, fields: FILE_FIELDS });
             const recommendationPromise = getModernizationRecommendation(resolvedParams.id, token);
 
-            const [reportData, recommendationData] = await Promise.all([
+            const [reportData, filesData, recommendationData] = await Promise.all([
                 reportPromise,
+                filesPromise,
                 recommendationPromise
             ]);
 
             setReport(reportData);
+            setFiles(filesData.items);
+            setFilesTotal(filesData.total);
             if (recommendationData) {
                 setRecommendation(recommendationData);
             }
@@ -62,17 +74,60 @@ export default function ReportDetailPage({ params }: { params: Promise<{ id: str
     fetchReport()
   }, [resolvedParams.id, getToken])
 
+  const handleLoadMoreFiles = async () => {
+      const token = await getToken()
+      if (!token) return
+
+      setLoadingFiles(true)
+      getReportFiles(resolvedParams.id, token, { offset: files.length, limit: FILES_PAGE_SIZE, fields: FILE_FIELDS })
+        .then((page) => setFiles((prev) => [...prev, ...page.items]))
+        .catch(console.error)
+        .finally(() => setLoadingFiles(false))
+  }
+
   const handleGenerateAI = async () => {
       const token = await getToken()
       if (!token) return
 
       setGenerating(true)
-      modernizeRepo(resolvedParams.id, token)
-        .then(setRecommendation)
+      // Show the playbook section by section while the model writes it
+      modernizeRepoStream(resolvedParams.id, token, (event) => {
+          if (event.type === "section") {
+              setRecommendation((prev: any) => ({ ...(prev || {}), [event.key]: event.value }))
+          } else if (event.type === "item") {
+              setRecommendation((prev: any) => ({
+                  ...(prev || {}),
+                  [event.key]: [...((prev || {})[event.key] || []), event.value]
+              }))
+          } else if (event.type === "result") {
+              setRecommendation(event.recommendation)
+          } else if (event.type === "error") {
+              setRecommendation({ error: event.detail })
+          }
+      })
         .catch(console.error)
         .finally(() => setGenerating(false))
   }
 
+  const handleExplain = async () => {
+      const token = await getToken()
+      if (!token) return
+
+      setExplaining(true)
+      // Fill in each candidate's justification as soon as its explanation arrives
+      explainOpportunitiesStream(resolvedParams.id, token, (event) => {
+          if (event.type !== "explanation") return
+          setRecommendation((prev: any) => prev && ({
+              ...prev,
+              agent_opportunities: prev.agent_opportunities?.map((opp: any) =>
+                  opp.location === event.location ? { ...opp, llm_justification: event.llm_justification } : opp
+              )
+          }))
+      })
+        .catch(console.error)
+        .finally(() => setExplaining(false))
+  }
+
   if (loading) return <div className="space-y-4"><Skeleton className="h-12 w-full" /><Skeleton className="h-64 w-full" /></div>
   if (!report) return <div>Report not found</div>
 
@@ -95,7 +150,13 @@ export default function ReportDetailPage({ params }: { params: Promise<{ id: str
         </div>
       </div>
       
-      <div className="flex justify-end">
+      <div className="flex justify-end gap-2">
+         {recommendation && !recommendation.error && (
+            <Button variant="outline" onClick={handleExplain} disabled={explaining} className="gap-2">
+                {explaining ? <Loader2 className="w-4 h-4 animate-spin" /> : <Lightbulb className="w-4 h-4" />}
+                Explain Candidates
+            </Button>
+         )}
          <Button onClick={handleGenerateAI} disabled={generating || recommendation} className="gap-2">
             {generating ? <Loader2 className="w-4 h-4 animate-spin" /> : <Sparkles className="w-4 h-4" />}
             {recommendation ? "Workflow Agentified" : "Agentify Workflow"}
@@ -239,10 +300,10 @@ export default function ReportDetailPage({ params }: { params: Promise<{ id: str
       <div className="space-y-4">
         <h2 className="text-xl font-semibold">Detailed Analysis</h2>
         <Accordion type="single" collapsible className="w-full">
-            {Object.entries(report.files).map(([file, data]: [string, any]) => (
-                <AccordionItem key={file} value={file}>
+            {files.map((data: any) => (
+                <AccordionItem key={data.path} value={data.path}>
                     <AccordionTrigger className="font-mono text-sm">
-                        {file} 
+                        {data.path} 
                         <span className="ml-auto mr-4 text-xs text-muted-foreground flex items-center gap-1">
                              Complexity: {data.complexity}
                              {data.complexity > 10 && (
@@ -288,6 +349,14 @@ export default function ReportDetailPage({ params }: { params: Promise<{ id: str
                 </AccordionItem>
             ))}
         </Accordion>
+        {files.length < filesTotal && (
+            <div className="flex justify-center">
+                <Button variant="outline" onClick={handleLoadMoreFiles} disabled={loadingFiles} className="gap-2">
+                    {loadingFiles && <Loader2 className="w-4 h-4 animate-spin" />}
+                    Load more ({files.length} of {filesTotal})
+                </Button>
+            </div>
+        )}
       </div>
     </div>
     </TooltipProvider>
@@ -0,0 +1,110 @@
+import os
+from typing import Callable, Dict, List, Optional, Tuple, Union
+from backend.ai_engine.rate_limiter import estimate_tokens
+
+# Tokens of repository context per playbook prompt, on top of the instructions and
+# the tool library. Well under the context windows: past this, answers get no
+# better, only slower and more expensive.
+MODEL_CONTEXT_BUDGETS = {
+    "gemini-2.5-flash": 8000,
+    "gemini-2.5-pro": 16000,
+}
+DEFAULT_CONTEXT_BUDGET = 6000
+
+def context_budget(model: str) -> int:
+    override = os.getenv("LLM_CONTEXT_TOKENS")
+    if override:
+        return int(override)
+    return MODEL_CONTEXT_BUDGETS.get(model, DEFAULT_CONTEXT_BUDGET)
+
+class ContextPacker:
+    """
+    Fills a token budget with the highest scoring items first. Every section is
+    first granted its reserved share of the budget (so one crowded section can't
+    starve the others), then what is left goes to the best remaining items of
+    any section. The output keeps the sections in declaration order and the items
+    in the order they were added, so ranking only decides what gets in. A
+    section's header is paid for when its first item is admitted.
+
+    An item's text can be a callable, rendered only when the item is considered
+    and its estimated `tokens` (if given) still fit: items that clearly can't
+    make it (code of low ranked candidates) are never produced.
+    """
+
+    def __init__(self, budget_tokens: int, sections: List[Tuple[str, float]]):
+        self.budget = budget_tokens
+        self.sections = sections # (header, reserved share of the budget)
+        self._items: List[Tuple[float, int, str, Union[str, Callable[[], str]], Optional[int]]] = []
+
+    def add(self, section: str, text: Union[str, Callable[[], str]], score: float, tokens: Optional[int] = None):
+        self._items.append((score, len(self._items), section, text, tokens))
+
+    def pack(self) -> Tuple[str, Dict[str, int]]:
+        ranked = sorted(self._items, key=lambda item: (-item[0], item[1])) # ties keep insertion order
+        chosen: Dict[str, List[Tuple[int, str]]] = {name: [] for name, _ in self.sections}
+        section_used = {name: 0 for name, _ in self.sections}
+        taken = set()
+        rendered: Dict[int, str] = {}
+        used = 0
+
+        def admit(item, limit: int) -> bool:
+            nonlocal used
+            _, seq, section, text, tokens = item
+            header = 0 if chosen[section] else estimate_tokens(section) + 2
+            fits = lambda cost: used + cost <= self.budget and section_used[section] + cost <= limit
+            if tokens is not None and not fits(tokens + 1 + header):
+                return False
+            if callable(text):
+                if seq not in rendered:
+                    rendered[seq] = text()
+                text = rendered[seq]
+            cost = estimate_tokens(text) + 1 + header
+            # Too big here; something smaller further down may still fit
+            if not fits(cost):
+                return False
+            used += cost
+            section_used[section] += cost
+            chosen[section].append((seq, text))
+            taken.add(seq)
+            return True
+
+        for name, share in self.sections:
+            reserved = int(self.budget * share)
+            for item in ranked:
+                if item[2] == name:
+                    admit(item, reserved)
+        for item in ranked:
+            if item[1] not in taken:
+                admit(item, self.budget)
+
+        blocks = []
+        for name, _ in self.sections:
+            if chosen[name]:
+                blocks.append(name + "\n" + "\n".join(text for _, text in sorted(chosen[name])))
+        stats = {"budget": self.budget, "tokens": used, "items": len(taken), "dropped": len(self._items) - len(taken)}
+        return "\n\n".join(blocks), stats
+
+    def wanted(self, exclude: Tuple[str, ...] = ()) -> int:
+        """
+        Estimated tokens of every item added outside the `exclude` sections, as
+        if the budget had no limit. Items with a `tokens` estimate are counted
+        by it, without being rendered.
+        """
+        return sum(
+            (tokens if tokens is not None else estimate_tokens(text() if callable(text) else text)) + 1
+            for _, _, section, text, tokens in self._items
+            if section not in exclude
+        )
+
+def trim_to_tokens(text: str, max_tokens: int, marker: str = "# ... (cut)") -> str:
+    """Keeps whole lines from the top of text while they fit in max_tokens."""
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    kept, used = [], estimate_tokens(marker)
+    for line in text.splitlines():
+        used += estimate_tokens(line) + 1
+        if used > max_tokens:
+            break
+        kept.append(line)
+    kept.append(marker)
+    return "\n".join(kept)
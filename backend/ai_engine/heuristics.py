@@ -1,6 +1,54 @@
-from typing import Dict, Any, List
+import re
+from functools import lru_cache
+from typing import Dict, Any, List, Optional
 from backend.ai_engine.models import AgentOpportunity
 
+# Substrings of import names that mark a module as talking to external services
+IO_PATTERNS = ["requests", "httpx", "aiohttp", "boto3", "sql", "mongo", "redis", "firebase", "api", "client", "ai", "openai", "anthropic", "google"]
+# Frontend components only count specific external services
+COMPONENT_IO_PATTERNS = ["openai", "anthropic", "langchain", "firebase", "google"]
+# Substrings of function names typical of agent tasks ('handle' left out: too noisy)
+AGENT_KEYWORDS = ["process", "manager", "workflow", "run", "execute", "summarize", "generate", "analyze", "chat", "bot", "service", "job", "task"]
+# Frontend UI handlers and hooks
+LOW_VALUE_PREFIXES = ["render", "toggle", "set", "use", "on", "get", "handle"]
+
+FRONTEND_EXTENSIONS = ('.tsx', '.jsx', '.ts', '.js')
+
+def _any_substring_re(patterns: List[str]) -> "re.Pattern":
+    # One alternation instead of a Python-level any() over the list
+    return re.compile("|".join(re.escape(p) for p in sorted(patterns, key=len, reverse=True)))
+
+_IO_RE = _any_substring_re(IO_PATTERNS)
+_COMPONENT_IO_RE = _any_substring_re(COMPONENT_IO_PATTERNS)
+_AGENT_KEYWORD_RE = _any_substring_re(AGENT_KEYWORDS)
+_LOW_VALUE_PREFIX_RE = re.compile("|".join(LOW_VALUE_PREFIXES))
+
+# The same import names and function names recur across files and repos, so
+# each is matched once per process
+@lru_cache(maxsize=65536)
+def _is_io_import(name: str, strict: bool) -> bool:
+    return (_COMPONENT_IO_RE if strict else _IO_RE).search(name.lower()) is not None
+
+@lru_cache(maxsize=65536)
+def _has_agent_keyword(name: str) -> bool:
+    return _AGENT_KEYWORD_RE.search(name.lower()) is not None
+
+class _FileFeatures:
+    """Everything the per-function rules need that only depends on the file."""
+    __slots__ = ("is_frontend", "is_component", "complexity", "detected_io", "io_signal")
+
+    def __init__(self, file_path: str, data: Dict[str, Any]):
+        self.is_frontend = file_path.endswith(FRONTEND_EXTENSIONS)
+        self.is_component = 'components' in file_path or 'views' in file_path or 'pages' in file_path
+        self.complexity = data.get("complexity", 0)
+
+        # Strict mode for frontend components: "api" is too generic there (local
+        # helpers), so only specific external services count. lib/api.ts still does.
+        strict = self.is_frontend and self.is_component
+        imports = (data.get("ast") or {}).get("imports", [])
+        self.detected_io = [imp for imp in imports if _is_io_import(imp, strict)]
+        self.io_signal = f"external_io_dependencies: {', '.join(self.detected_io)}" if self.detected_io else None
+
 class HeuristicDetector:
     """
     Deterministic engine for identifying agent opportunities based on static analysis signals.
@@ -8,74 +56,68 @@ class HeuristicDetector:
     
     def detect(self, files_data: Dict[str, Any]) -> List[AgentOpportunity]:
         opportunities = []
-        
         for file_path, data in files_data.items():
-            ast_data = data.get("ast", {})
-            complexity = data.get("complexity", 0)
-            
-            # Analyze functions
-            for func in ast_data.get("functions", []):
-                opp = self._analyze_function(file_path, func, complexity, ast_data)
-                if opp:
-                    opportunities.append(opp)
-                    
+            opportunities.extend(self.detect_file(file_path, data))
         return opportunities
 
-    def _analyze_function(self, file_path: str, func: Dict[str, Any], file_complexity: int, file_ast: Dict[str, Any]) -> AgentOpportunity:
+    def detect_file(self, file_path: str, data: Dict[str, Any]) -> List[AgentOpportunity]:
+        """
+        Scores all functions of one file in a batch: file-level features (path
+        context, I/O imports) are computed once, not once per function.
+        """
+        functions = (data.get("ast") or {}).get("functions", [])
+        if not functions:
+            return []
+        features = _FileFeatures(file_path, data)
+
+        # Without I/O imports no rule below can make a candidate
+        if not features.detected_io:
+            return []
+
+        opportunities = []
+        for func in functions:
+            opp = self._score_function(file_path, func, features)
+            if opp:
+                opportunities.append(opp)
+        return opportunities
+
+    def _score_function(self, file_path: str, func: Dict[str, Any], features: _FileFeatures) -> Optional[AgentOpportunity]:
         signals = []
         name = func.get("name")
         start_line = func.get("lineno")
         end_line = func.get("end_lineno", start_line + 10) # Fallback if not provided
-        
+        file_complexity = features.complexity
+        detected_io = features.detected_io
+
         # 1. Complexity Signal
-        # We don't have function-level complexity in this MVP, using file-level proxy or simple heuristics
-        # Ideally we'd calculate cyclomatic complexity per function. 
-        # For now, let's use a placeholder if file complexity is VERY high, it likely trickles down.
-        if file_complexity > 20: 
+        # Functions carry their own cyclomatic complexity from the parser; when one
+        # doesn't, fall back to the file-level number as a proxy.
+        func_complexity = func.get("complexity")
+        if func_complexity is not None:
+            if func_complexity > 10:
+                signals.append("high_complexity_context")
+        elif file_complexity > 20: 
              signals.append("high_complexity_context")
              
         # 2. Context Filtering (path based)
-        is_frontend = file_path.endswith(('.tsx', '.jsx', '.ts', '.js'))
-        is_component = 'components' in file_path or 'views' in file_path or 'pages' in file_path
-        
         # Skip UI event handlers and hooks in frontend components
-        if is_frontend:
-            low_value_prefixes = ['render', 'toggle', 'set', 'use', 'on', 'get', 'handle']
-            # Allow 'handle' only if it's 'handleSubmit' or complex
-            if any(name.startswith(p) for p in low_value_prefixes):
+        if features.is_frontend:
+            if _LOW_VALUE_PREFIX_RE.match(name):
                 # Exception: complex submit handlers might be agents
                 if not (name.startswith('handle') and 'submit' in name.lower()):
                      return None # Skip pure UI handlers
             
             # Skip pure UI components (starting with Uppercase) unless they are in specific directories
             # actually we extracted definitions. If it's a function named "Home", it's a React component.
-            if name[0].isupper() and is_component:
+            if name[0].isupper() and features.is_component:
                  return None # Skip React components
                  
-        # 3. External I/O Signals from imports
-        imports = file_ast.get("imports", [])
-        # Broader I/O detection including common patterns
-        io_patterns = ["requests", "httpx", "aiohttp", "boto3", "sql", "mongo", "redis", "firebase", "api", "client", "ai", "openai", "anthropic", "google"]
-        
-        # Strict mode for frontend: only count "AI" or "API" as relevant I/O, ignore generic utils
-        if is_frontend:
-             # For frontend, "api" is too generic if it's just local.
-             # We want specific external services or 'api' IF it's in a non-component file (like lib/api.ts)
-             if is_component:
-                 io_patterns = ["openai", "anthropic", "langchain", "firebase", "google"] # Strict for components
-             
-        detected_io = [imp for imp in imports if any(pat in imp.lower() for pat in io_patterns)]
-        
-        if detected_io:
-             signals.append(f"external_io_dependencies: {', '.join(detected_io)}")
+        # 3. External I/O Signals from imports (matched once for the file)
+        signals.append(features.io_signal)
              
         # 4. Error Handling (Try/Except) - Not in current AST output, assuming generic
         # 5. Magic Strings / Heuristic Naming
-        # Expanded keywords for typical agent tasks
-        agent_keywords = ["process", "manager", "workflow", "run", "execute", "summarize", "generate", "analyze", "chat", "bot", "service", "job", "task"]
-        # Removed 'handle' to avoid noise
-        
-        if any(x in name.lower() for x in agent_keywords):
+        if _has_agent_keyword(name):
             signals.append("orchestration_naming_pattern")
             
         # Decision Logic
@@ -83,16 +125,16 @@ class HeuristicDetector:
         risk = "low"
         agent_type = None
         
-        # Rules for qualification
-        if "orchestration_naming_pattern" in signals and detected_io:
+        # Rules for qualification (every function reaching here has I/O imports)
+        if "orchestration_naming_pattern" in signals:
             verdict = "candidate"
             risk = "medium"
             agent_type = "Orchestration Agent"
-        elif "high_complexity_context" in signals and detected_io:
+        elif "high_complexity_context" in signals:
              verdict = "candidate"
              risk = "high"
              agent_type = "Reasoning & Planning Agent"
-        elif detected_io and file_complexity > 5: # Relaxed rule: I/O + moderate complexity
+        elif file_complexity > 5: # Relaxed rule: I/O + moderate complexity
              verdict = "candidate"
              risk = "low"
              agent_type = "Tool Use Agent"
@@ -1,52 +1,62 @@
 import os
+import re
 import json
 import asyncio
+from typing import Any, AsyncIterator, List, Optional, Tuple
+import httpx
 from google import genai
 from google.genai import types
 from backend.ai_engine import prompts
+from backend.ai_engine.response_cache import ResponseCache, response_cache
+from backend.ai_engine.rate_limiter import (
+    RateLimiter, rate_limiter, estimate_tokens, PRIORITY_INTERACTIVE, PRIORITY_BACKGROUND
+)
+from backend.ai_engine.streaming import JsonStreamParser, events_from_result
+from backend.ai_engine.tool_library import tool_library
+
+PLAYBOOK_MODEL = 'gemini-2.5-flash'
 
 class LLMClient:
-    def __init__(self):
+    def __init__(self, cache: ResponseCache = response_cache, limiter: RateLimiter = rate_limiter,
+                 http_client: Optional[httpx.AsyncClient] = None):
         self.api_key = os.getenv("GEMINI_API_KEY")
         self.client = None
         if self.api_key:
-            self.client = genai.Client(api_key=self.api_key)
+            # The app passes its pooled client, so model calls reuse warm connections
+            http_options = types.HttpOptions(httpx_async_client=http_client) if http_client else None
+            self.client = genai.Client(api_key=self.api_key, http_options=http_options)
+        self.cache = cache
+        # Shared by every client in the process, so the quota is paced as a whole
+        self.limiter = limiter
+
+    async def _generate_with_retry(self, prompt: str, model: str = 'gemini-2.5-flash', retries: int = 3,
+                                   use_search: bool = False, bypass_cache: bool = False,
+                                   priority: int = PRIORITY_BACKGROUND) -> dict:
+        # Identical prompts (re-clicked modernize, several users on one commit) are
+        # answered from the cache; bypass_cache forces a fresh answer and stores it
+        cache_key = self.cache.make_key(model, prompt, use_search)
+        if not bypass_cache:
+            cached = await asyncio.to_thread(self.cache.get, cache_key)
+            if cached is not None:
+                return cached
+
+        result = await self._generate_uncached(prompt, model, retries, use_search, priority)
+        await asyncio.to_thread(self.cache.put, cache_key, model, result)
+        return result
 
-    async def _generate_with_retry(self, prompt: str, model: str = 'gemini-2.5-flash', retries: int = 3, use_search: bool = False) -> dict:
+    async def _generate_uncached(self, prompt: str, model: str, retries: int, use_search: bool, priority: int) -> dict:
+        prompt_tokens = estimate_tokens(prompt)
         for attempt in range(retries):
             try:
-                # Configure tools if search is enabled
-                tools = []
-                if use_search:
-                    tools.append(types.Tool(google_search=types.GoogleSearch()))
-
-                response = await self.client.aio.models.generate_content(
-                    model=model,
-                    contents=prompt,
-                    config=types.GenerateContentConfig(
-                        response_mime_type="application/json" if not tools else None,
-                        tools=tools if tools else None
+                async with self.limiter.slot(prompt_tokens, priority):
+                    response = await self.client.aio.models.generate_content(
+                        model=model,
+                        contents=prompt,
+                        config=self._config(use_search)
                     )
-                )
+                self.limiter.on_success()
                 
-                content = response.text
-                
-                # Robustly extract JSON if wrapped in markdown code blocks
-                import re
-                json_match = re.search(r'```(?:json)?\s*(\{.*?\})\s*```', content, re.DOTALL)
-                if json_match:
-                    content = json_match.group(1)
-                else:
-                    # Cleanup strictly if startswith (legacy fallback) but avoid naive replace checks
-                    content = content.strip()
-                    if content.startswith("```json"):
-                        content = content[7:]
-                    if content.startswith("```"):
-                        content = content[3:]
-                    if content.endswith("```"):
-                        content = content[:-3]
-                    content = content.strip()
-
+                content = self._extract_json(response.text)
                 return json.loads(content)
                 
             except json.JSONDecodeError as e:
@@ -59,15 +69,95 @@ class LLMClient:
                 # Check for 429 or rate limit strings in error
                 error_str = str(e)
                 if "429" in error_str or "RESOURCE_EXHAUSTED" in error_str:
-                    wait_time = (2 ** attempt) * 2 + 5 # 7s, 9s, 13s... aggressive wait
-                    print(f"Rate limited on {model}. Waiting {wait_time}s... (Attempt {attempt+1}/{retries})")
-                    await asyncio.sleep(wait_time)
+                    # No sleep of our own: the limiter pauses every caller for the
+                    # cooldown and halves concurrency, so retries don't stampede
+                    cooldown = self.limiter.on_rate_limited()
+                    print(f"Rate limited on {model}. Cooling down {cooldown}s... (Attempt {attempt+1}/{retries})")
                 else:
                     raise e
                     
         raise Exception("Max retries exceeded for AI generation")
 
-    async def explain_opportunity(self, opportunity: dict, code_slice: str) -> dict:
+    async def _stream_json(self, prompt: str, model: str = 'gemini-2.5-flash', retries: int = 3,
+                           use_search: bool = False, bypass_cache: bool = False,
+                           priority: int = PRIORITY_BACKGROUND) -> AsyncIterator[Tuple[Any, ...]]:
+        """
+        Streaming counterpart of _generate_with_retry. Yields ("field", key, value)
+        and ("item", key, index, value) as parts of the answer complete, then
+        ("result", answer) with the whole parsed answer, which is cached like any
+        other. A cached answer is replayed as the same events. Rate limits are
+        retried only until the first chunk: after that the caller has seen output.
+        """
+        if not self.client:
+            yield ("result", {"error": "AI unavailable"})
+            return
+
+        cache_key = self.cache.make_key(model, prompt, use_search)
+        if not bypass_cache:
+            cached = await asyncio.to_thread(self.cache.get, cache_key)
+            if cached is not None:
+                for event in events_from_result(cached):
+                    yield event
+                yield ("result", cached)
+                return
+
+        prompt_tokens = estimate_tokens(prompt)
+        parser = JsonStreamParser()
+        for attempt in range(retries):
+            try:
+                async with self.limiter.slot(prompt_tokens, priority):
+                    stream = await self.client.aio.models.generate_content_stream(
+                        model=model,
+                        contents=prompt,
+                        config=self._config(use_search)
+                    )
+                    async for chunk in stream:
+                        for event in parser.feed(chunk.text or ""):
+                            yield event
+                self.limiter.on_success()
+                break
+            except Exception as e:
+                error_str = str(e)
+                if not parser.text and ("429" in error_str or "RESOURCE_EXHAUSTED" in error_str):
+                    cooldown = self.limiter.on_rate_limited()
+                    print(f"Rate limited on {model}. Cooling down {cooldown}s... (Attempt {attempt+1}/{retries})")
+                    if attempt == retries - 1:
+                        raise Exception("Max retries exceeded for AI generation")
+                else:
+                    raise e
+
+        result = json.loads(self._extract_json(parser.text))
+        await asyncio.to_thread(self.cache.put, cache_key, model, result)
+        yield ("result", result)
+
+    @staticmethod
+    def _config(use_search: bool) -> types.GenerateContentConfig:
+        # Configure tools if search is enabled
+        tools = []
+        if use_search:
+            tools.append(types.Tool(google_search=types.GoogleSearch()))
+        return types.GenerateContentConfig(
+            response_mime_type="application/json" if not tools else None,
+            tools=tools if tools else None
+        )
+
+    @staticmethod
+    def _extract_json(content: str) -> str:
+        # Robustly extract JSON if wrapped in markdown code blocks
+        json_match = re.search(r'```(?:json)?\s*(\{.*?\})\s*```', content, re.DOTALL)
+        if json_match:
+            return json_match.group(1)
+        # Cleanup strictly if startswith (legacy fallback) but avoid naive replace checks
+        content = content.strip()
+        if content.startswith("```json"):
+            content = content[7:]
+        if content.startswith("```"):
+            content = content[3:]
+        if content.endswith("```"):
+            content = content[:-3]
+        return content.strip()
+
+    async def explain_opportunity(self, opportunity: dict, code_slice: str, bypass_cache: bool = False) -> dict:
         """
         Explain WHY a specific code component was flagged as an agent opportunity.
         Strictly bounded to the provided code slice.
@@ -79,17 +169,24 @@ class LLMClient:
         prompt = prompts.get_explain_opportunity_prompt(opportunity, code_slice)
         
         try:
-            return await self._generate_with_retry(prompt, model='gemini-2.5-flash', use_search=False)
+            return await self._generate_with_retry(prompt, model='gemini-2.5-flash', use_search=False,
+                                                   bypass_cache=bypass_cache, priority=PRIORITY_INTERACTIVE)
             
         except Exception as e:
             print(f"LLM Explanation Error: {e}")
             return {
+                "error": "AI explanation failed",
                 "justification": "AI explanation failed",
                 "risk_assessment": "Unknown",
                 "recommended_agent_pattern": "Manual Review"
             }
 
-    async def modernize_workflow_text(self, text: str) -> dict:
+    def stream_workflow_text(self, text: str, bypass_cache: bool = False) -> AsyncIterator[Tuple[Any, ...]]:
+        """Streaming modernize_workflow_text: see _stream_json for the events."""
+        prompt = prompts.get_modernize_workflow_prompt(text)
+        return self._stream_json(prompt, model='gemini-2.5-flash', use_search=True, bypass_cache=bypass_cache)
+
+    async def modernize_workflow_text(self, text: str, bypass_cache: bool = False) -> dict:
         """
         Generates modernization playbook for text-based workflow descriptions.
         (Restored functionality for document uploads)
@@ -100,75 +197,66 @@ class LLMClient:
         prompt = prompts.get_modernize_workflow_prompt(text)
         
         try:
-            return await self._generate_with_retry(prompt, model='gemini-2.5-flash', use_search=True)
+            return await self._generate_with_retry(prompt, model='gemini-2.5-flash', use_search=True, bypass_cache=bypass_cache)
         except Exception as e:
             print(f"Workflow Modernization Error: {e}")
             return {"error": str(e)}
 
-    def _load_tool_library(self) -> str:
+    def _load_tool_library(self, tool_signals: Optional[List[str]] = None) -> str:
         """
-        Dynamically reads the project's own tool library from lib/tools.ts.
-        Parses TypeScript content and filters for relevant tools (Developers & Automation)
-        to avoid flooding the context with irrelevant consumer apps.
+        The project's own tool library (lib/tools.ts), narrowed to the Developers &
+        Automation tools that best match the repo's signals. Parsed once and cached
+        until the file changes.
         """
         try:
-            # Resolve path to lib/tools.ts relative to this file
-            base_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-            tools_path = os.path.join(base_dir, "lib", "tools.ts")
-            
-            if not os.path.exists(tools_path):
-                return "No local tool library found."
-
-            with open(tools_path, 'r') as f:
-                content = f.read()
-
-            # Simple regex parser to extract relevant fields from the TS object structure
-            # Looking for patterns like: name: "X", category: "Y", description: "Z"
-            import re
-            tools = []
-            
-            # Find all object blocks inside the TOOLS array
-            matches = re.finditer(r'{\s*name:\s*"(.*?)",\s*category:\s*"(.*?)",.*?description:\s*"(.*?)",', content, re.DOTALL)
-            
-            # Categories considered relevant for "Agentic Workflow Modernization"
-            RELEVANT_CATEGORIES = {"Developers", "Automation"}
-            
-            for m in matches:
-                name = m.group(1)
-                category = m.group(2)
-                desc = m.group(3)
-                
-                if category in RELEVANT_CATEGORIES:
-                    tools.append(f"- {name} ({category}): {desc}")
-                
-            if not tools:
-                return "Tool library detected but no relevant tools found."
-                
-            return "=== RELEVANT PROJECT TOOLS (Developers & Automation) ===\n" + "\n".join(tools[:50]) # Limit to top 50 relevant ones
-            
+            return tool_library.render(tool_library.select(tool_signals or []))
         except Exception as e:
             print(f"Error loading tool library: {e}")
             return "Error loading tool library."
 
-    async def generate_playbook(self, repo_context: str) -> dict:
+    def stream_playbook(self, repo_context: str, bypass_cache: bool = False,
+                        tool_signals: Optional[List[str]] = None) -> AsyncIterator[Tuple[Any, ...]]:
+        """Streaming generate_playbook: see _stream_json for the events."""
+        prompt = prompts.get_playbook_generation_prompt(repo_context, self._load_tool_library(tool_signals))
+        return self._stream_json(prompt, model=PLAYBOOK_MODEL, use_search=True, bypass_cache=bypass_cache)
+
+    async def generate_playbook(self, repo_context: str, bypass_cache: bool = False,
+                                tool_signals: Optional[List[str]] = None) -> dict:
         """
         Generates a modernization playbook based on a holistic view of the repository.
         """
         if not self.client:
             return {"error": "AI unavailable"}
 
-        # Load the dynamic tool library
-        tool_library_str = self._load_tool_library()
+        # Tools matching the repo's languages, I/O libraries and agent types
+        tool_library_str = self._load_tool_library(tool_signals)
             
         prompt = prompts.get_playbook_generation_prompt(repo_context, tool_library_str)
         
         try:
-            return await self._generate_with_retry(prompt, model='gemini-2.5-flash', use_search=True)
+            return await self._generate_with_retry(prompt, model=PLAYBOOK_MODEL, use_search=True, bypass_cache=bypass_cache)
             
         except Exception as e:
             print(f"Playbook Generation Error: {e}")
             return {"error": str(e)}
 
+    async def summarize_subsystem(self, subsystem: str, subsystem_context: str, bypass_cache: bool = False) -> dict:
+        """
+        Map step of hierarchical playbook generation: a compact summary of one
+        subsystem. The prompt is built from the subsystem's own files only, so the
+        response cache keeps the summary until that subsystem changes.
+        """
+        if not self.client:
+            return {"error": "AI unavailable"}
+
+        prompt = prompts.get_subsystem_summary_prompt(subsystem, subsystem_context)
+
+        try:
+            return await self._generate_with_retry(prompt, model=PLAYBOOK_MODEL, use_search=False, bypass_cache=bypass_cache)
+        except Exception as e:
+            print(f"Subsystem Summary Error ({subsystem}): {e}")
+            return {"error": str(e)}
+
     async def modernize(self, system_description: dict) -> dict:
         """
         DEPRECATED: Legacy method. 
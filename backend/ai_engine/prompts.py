@@ -65,7 +65,7 @@ def get_playbook_generation_prompt(repo_context: str, tool_library_str: str) ->
         - Where can data intake be automated by Tool Uses?
         
         REPOSITORY CONTEXT:
-        {repo_context[:50000]} 
+        {repo_context}
         
         {tool_library_str}
         
@@ -123,3 +123,33 @@ def get_playbook_generation_prompt(repo_context: str, tool_library_str: str) ->
             }}
         }}
         """
+
+def get_subsystem_summary_prompt(subsystem: str, subsystem_context: str) -> str:
+    return f"""
+        You are a Staff Software Architect mapping one subsystem of a large repository, as input
+        for a later repository-wide AI Agent modernization playbook.
+
+        SUBSYSTEM: {subsystem}
+
+        SUBSYSTEM CONTEXT:
+        {subsystem_context}
+
+        TASK:
+        Summarize what this subsystem does and where its workflow could use AI Agents, based ONLY on the context above.
+        Be compact: the summary is combined with the summaries of the other subsystems.
+
+        OUTPUT FORMAT (JSON):
+        {{
+            "purpose": "One or two sentences on the business role of this subsystem",
+            "workflows": ["Key processes it implements or orchestrates"],
+            "pain_points": ["Short description of a rigid, manual or complex area"],
+            "agent_opportunities": [
+                {{
+                    "location": "File :: Function (or Logical Area)",
+                    "summary": "What an agent would do here",
+                    "recommended_framework": "Generic pattern name (e.g. 'Orchestrator', 'Researcher', 'Planner')",
+                    "confidence": 0.8
+                }}
+            ]
+        }}
+        """
@@ -0,0 +1,158 @@
+import os
+import time
+import heapq
+import asyncio
+import itertools
+from contextlib import asynccontextmanager
+from typing import Any, Dict, List, Optional
+
+# Lower runs first: a user waiting on an explanation beats a playbook in the background
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BACKGROUND = 1
+
+DEFAULT_RPM = 60
+DEFAULT_TPM = 1_000_000
+DEFAULT_MAX_CONCURRENCY = 8
+# Global pause after a 429, doubled for every further 429 in a row
+BASE_COOLDOWN_SECONDS = 5.0
+MAX_COOLDOWN_SECONDS = 60.0
+
+def estimate_tokens(text: str) -> int:
+    # ~4 characters per token for English and code; only used for budgeting
+    return max(1, len(text) // 4)
+
+class TokenBucket:
+    """Refills continuously at capacity per minute, starting full."""
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.rate = self.capacity / 60.0
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """Seconds until amount is available (0 if it is now)."""
+        self._refill(now)
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.rate
+
+    def take(self, amount: float):
+        self.tokens -= min(amount, self.capacity)
+
+class RateLimiter:
+    """
+    Process-wide admission control for LLM calls. A call is admitted when the
+    request and input-token buckets allow it, fewer than the current concurrency
+    limit are running and no 429 cooldown is active. Waiters are served by
+    priority, then arrival. The concurrency limit adapts AIMD-style: it grows by
+    1/limit per success and halves on a 429, which also pauses every caller.
+    """
+
+    def __init__(self, rpm: Optional[int] = None, tpm: Optional[int] = None, max_concurrency: Optional[int] = None):
+        rpm = rpm or int(os.getenv("LLM_RPM", str(DEFAULT_RPM)))
+        tpm = tpm or int(os.getenv("LLM_TPM", str(DEFAULT_TPM)))
+        self.max_concurrency = max_concurrency or int(os.getenv("LLM_MAX_CONCURRENCY", str(DEFAULT_MAX_CONCURRENCY)))
+        self.requests = TokenBucket(rpm)
+        self.input_tokens = TokenBucket(tpm)
+        self.limit = float(self.max_concurrency)
+        self.active = 0
+        self.cooldown_until = 0.0
+        self._consecutive_429 = 0
+        self._waiters: List[list] = [] # heap of [priority, seq, tokens, event]
+        self._seq = itertools.count()
+        self.counters = {"admitted": 0, "rate_limited": 0, "waited_seconds": 0.0}
+
+    @asynccontextmanager
+    async def slot(self, tokens: int, priority: int = PRIORITY_BACKGROUND):
+        await self.acquire(tokens, priority)
+        try:
+            yield
+        finally:
+            self.release()
+
+    async def acquire(self, tokens: int, priority: int = PRIORITY_BACKGROUND):
+        entry = [priority, next(self._seq), tokens, asyncio.Event()]
+        heapq.heappush(self._waiters, entry)
+        started = time.monotonic()
+        try:
+            while True:
+                delay = self._admit_delay(entry)
+                if delay is None:
+                    break
+                entry[3].clear()
+                try:
+                    # delay is inf when only a release can unblock us
+                    await asyncio.wait_for(entry[3].wait(), None if delay == float("inf") else delay)
+                except asyncio.TimeoutError:
+                    pass
+        except BaseException:
+            self._waiters.remove(entry)
+            heapq.heapify(self._waiters)
+            self._wake_head()
+            raise
+        heapq.heappop(self._waiters)
+        self.active += 1
+        self.requests.take(1)
+        self.input_tokens.take(tokens)
+        self.counters["admitted"] += 1
+        self.counters["waited_seconds"] += time.monotonic() - started
+        # The next waiter may fit as well
+        self._wake_head()
+
+    def _admit_delay(self, entry: list) -> Optional[float]:
+        """None if entry can go now, else how long to wait before checking again."""
+        if self._waiters[0] is not entry:
+            return float("inf")
+        now = time.monotonic()
+        if now < self.cooldown_until:
+            return self.cooldown_until - now
+        if self.active >= int(self.limit):
+            return float("inf")
+        delay = max(self.requests.wait_time(1, now), self.input_tokens.wait_time(entry[2], now))
+        return delay if delay > 0 else None
+
+    def _wake_head(self):
+        if self._waiters:
+            self._waiters[0][3].set()
+
+    def release(self):
+        self.active -= 1
+        self._wake_head()
+
+    def on_success(self):
+        self._consecutive_429 = 0
+        self.limit = min(float(self.max_concurrency), self.limit + 1.0 / self.limit)
+        self._wake_head()
+
+    def on_rate_limited(self) -> float:
+        """Backs everybody off after a 429; returns the cooldown in seconds."""
+        self.counters["rate_limited"] += 1
+        self._consecutive_429 += 1
+        self.limit = max(1.0, self.limit / 2)
+        cooldown = min(MAX_COOLDOWN_SECONDS, BASE_COOLDOWN_SECONDS * 2 ** (self._consecutive_429 - 1))
+        # Requests already in flight report their 429s too: don't stack cooldowns
+        self.cooldown_until = max(self.cooldown_until, time.monotonic() + cooldown)
+        # The quota is spent, whatever our buckets think
+        self.requests.tokens = 0.0
+        return cooldown
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **self.counters,
+            "waited_seconds": round(self.counters["waited_seconds"], 3),
+            "concurrency_limit": round(self.limit, 2),
+            "max_concurrency": self.max_concurrency,
+            "active": self.active,
+            "waiting": len(self._waiters),
+            "cooldown_remaining": round(max(0.0, self.cooldown_until - time.monotonic()), 3),
+            "rpm": self.requests.capacity,
+            "tpm": self.input_tokens.capacity
+        }
+
+rate_limiter = RateLimiter()
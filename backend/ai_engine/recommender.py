@@ -1,24 +1,166 @@
 import os
 import json
-from typing import Optional
+import asyncio
+import threading
+from functools import partial
+from typing import Any, AsyncIterator, Dict, List, Optional, Set, Tuple
 from backend.ai_engine.slice_collector import SliceCollector
-from backend.ai_engine.llm_client import LLMClient
+from backend.ai_engine.llm_client import LLMClient, PLAYBOOK_MODEL
+from backend.ai_engine.context_packer import ContextPacker, context_budget, trim_to_tokens
+from backend.ai_engine.rate_limiter import estimate_tokens
+from backend.ai_engine.single_flight import SingleFlight
+from backend.ai_engine.streaming import EventLog, events_from_result
+from backend.ai_engine.subsystems import split_subsystems
+from backend.analysis.report_store import report_store
+from backend.analysis.catalog import catalog
+from backend.analysis.dependency_graph import DependencyGraph
+
+# Double clicks, two tabs, /ai/recommend and /modernize/repo at once: concurrent
+# runs for the same user and report share one generation
+_recommendation_flights = SingleFlight()
+# Streams being generated, by the same key: later streams follow their events
+_recommendation_streams: Dict[Tuple[Optional[str], str], EventLog] = {}
+# Explanations are merged into the stored recommendation one at a time
+# (read, merge, write), also across streams for the same key
+_explanation_locks: Dict[Tuple[Optional[str], str], threading.Lock] = {}
+
+SECTION_FILES = "=== FILE STRUCTURE ==="
+SECTION_DEPENDENCIES = "=== DEPENDENCIES (IMPORTS) ==="
+SECTION_HUBS = "=== MOST DEPENDED-ON MODULES AND IMPORT CYCLES ==="
+SECTION_CANDIDATES = "=== HEURISTIC CANDIDATES ==="
+SECTION_CODE = "=== CANDIDATE CODE ==="
+TOP_FILES_IN_CONTEXT = 50
+MAX_IMPORTS_PER_LINE = 5
+RISK_WEIGHTS = {"high": 3, "medium": 2, "low": 1}
+# Share of the budget each section is guaranteed before the rest goes by score
+CONTEXT_SECTIONS = [
+    (SECTION_FILES, 0.1),
+    (SECTION_DEPENDENCIES, 0.1),
+    (SECTION_HUBS, 0.05),
+    (SECTION_CANDIDATES, 0.3),
+    (SECTION_CODE, 0.3),
+]
+
+# Map-reduce playbooks, for repos whose context doesn't fit one prompt
+SECTION_SUBSYSTEMS = "=== SUBSYSTEM SUMMARIES ==="
+REDUCE_SECTIONS = [
+    (SECTION_SUBSYSTEMS, 0.8),
+    (SECTION_HUBS, 0.1),
+]
+# Map-reduce only when the repo's description (code aside) is this many times the
+# budget: below that, packing by relevance keeps what matters in one call
+MAP_REDUCE_OVERFLOW = 3
+SUBSYSTEM_MAX_FILES = 150
+MAX_SUBSYSTEMS = 24
+SUBSYSTEM_CONTEXT_TOKENS = 4000
+MAP_CONCURRENCY = int(os.getenv("PLAYBOOK_MAP_CONCURRENCY", "4"))
+
+# Explanations running at once per batch; the rate limiter paces them further
+EXPLAIN_CONCURRENCY = int(os.getenv("LLM_EXPLAIN_CONCURRENCY", "8"))
+# In place of a candidate's code when its file changed since the analysis
+STALE_SLICE_NOTE = "(file changed since the analysis; code not shown, re-run the analysis)"
 
 class Recommender:
-    def __init__(self, report_id: str, uid: Optional[str] = None):
+    def __init__(self, report_id: str, uid: Optional[str] = None, llm_client: Optional[LLMClient] = None):
         self.report_id = report_id
         self.uid = uid
         self.slice_collector = SliceCollector()
-        self.llm_client = LLMClient()
+        # Routes pass the app's shared client; standalone use gets its own
+        self.llm_client = llm_client or LLMClient()
+
+    async def generate(self, bypass_cache: bool = False) -> dict:
+        return await _recommendation_flights.run(
+            (self.uid, self.report_id), lambda: self._generate(bypass_cache)
+        )
+
+    async def _generate(self, bypass_cache: bool) -> dict:
+        report, repo_context = await self._prepare_context()
 
-    async def generate(self) -> dict:
+        # 4. Generate AI Playbook (Holistic Analysis)
+        ai_result = await self.llm_client.generate_playbook(repo_context, bypass_cache=bypass_cache,
+                                                            tool_signals=self._tool_signals(report))
+
+        recommendation = self._build_recommendation(report, ai_result)
+        self._save_recommendation(recommendation)
+        return recommendation
+
+    async def generate_stream(self, bypass_cache: bool = False) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Streaming generate(): yields "section" events for top-level parts of the
+        playbook (system_summary, modernization_playbook, ...) and "item" events for
+        each pain point and agent opportunity (merged with heuristics) as the model
+        writes them, then "result" with the saved recommendation. Coalesced like
+        generate(): a stream joining a running one gets its events from the start,
+        one arriving during a plain generate() gets that result replayed.
+        """
+        key = (self.uid, self.report_id)
+        log = _recommendation_streams.get(key)
+        if log is None and _recommendation_flights.in_flight(key):
+            recommendation = await self.generate(bypass_cache)
+            yield {"type": "start", "report_id": self.report_id}
+            for event in events_from_result(recommendation):
+                yield self._stream_event(event)
+            yield {"type": "result", "recommendation": recommendation}
+            return
+
+        if log is None:
+            log = EventLog()
+            _recommendation_streams[key] = log
+            _recommendation_flights.start(key, lambda: self._generate_streamed(log, bypass_cache))
+        else:
+            _recommendation_flights.coalesced += 1
+        async for event in log.follow():
+            yield event
+
+    async def _generate_streamed(self, log: EventLog, bypass_cache: bool) -> dict:
+        """_generate() publishing the stream events to log as the model writes them."""
+        try:
+            return await self._stream_into(log, bypass_cache)
+        except Exception as e:
+            log.close(e)
+            raise
+        finally:
+            log.close() # No-op once closed; ends the followers if the run was cancelled
+            if _recommendation_streams.get((self.uid, self.report_id)) is log:
+                del _recommendation_streams[(self.uid, self.report_id)]
+
+    async def _stream_into(self, log: EventLog, bypass_cache: bool) -> dict:
+        report, repo_context = await self._prepare_context()
+        heuristic_map = self._heuristic_map(report)
+        log.publish({"type": "start", "report_id": self.report_id})
+
+        try:
+            ai_result = None
+            async for event in self.llm_client.stream_playbook(repo_context, bypass_cache=bypass_cache,
+                                                               tool_signals=self._tool_signals(report)):
+                if event[0] == "result":
+                    ai_result = event[1]
+                    continue
+                if event[0] == "item" and event[1] == "agent_opportunities" and isinstance(event[3], dict):
+                    event = event[:3] + (self._enhance_opportunity(event[3], heuristic_map),)
+                log.publish(self._stream_event(event))
+        except Exception as e:
+            print(f"Playbook Streaming Error: {e}")
+            ai_result = {"error": str(e)}
+
+        recommendation = self._build_recommendation(report, ai_result or {"error": "No answer"})
+        await asyncio.to_thread(self._save_recommendation, recommendation)
+        log.publish({"type": "result", "recommendation": recommendation})
+        return recommendation
+
+    @staticmethod
+    def _stream_event(event: tuple) -> Dict[str, Any]:
+        """A JsonStreamParser / events_from_result tuple as a stream event."""
+        if event[0] == "field":
+            return {"type": "section", "key": event[1], "value": event[2]}
+        _, key, index, value = event
+        return {"type": "item", "key": key, "index": index, "value": value}
+
+    async def _prepare_context(self) -> Tuple[dict, str]:
         # 1. Load Analysis Report (Static Signals + Heuristics)
-        report_path = self._find_report_path()
-        if not report_path or not os.path.exists(report_path):
+        report = self._load_report()
+        if report is None:
              raise FileNotFoundError(f"Report {self.report_id} not found")
-        
-        with open(report_path, 'r') as f:
-            report = json.load(f)
             
         repo_name = report.get("repo")
         repo_path = self._find_repo_path(repo_name)
@@ -26,68 +168,174 @@ class Recommender:
         if not repo_path:
              print("Warning: Repo path not found, skipping code extraction.")
         
-        # 2. Collect Code Slices
+        # 2. Plan Code Slices; their code is only read for the ones that make it into the context
         slices = []
         if repo_path:
-            slices = self.slice_collector.collect(report, repo_path)
+            slices = self.slice_collector.plan(report, repo_path)
             
         # 3. Build Repo Context for AI
-        repo_context = self._build_repo_context(report, slices)
-        
-        # 4. Generate AI Playbook (Holistic Analysis)
-        ai_result = await self.llm_client.generate_playbook(repo_context)
-        
+        try:
+            budget = context_budget(PLAYBOOK_MODEL)
+            repo_context, stats = self._build_repo_context(report, slices, budget)
+            subsystems = split_subsystems(self._file_complexities(report), SUBSYSTEM_MAX_FILES)
+            if stats["described"] > MAP_REDUCE_OVERFLOW * budget and len(subsystems) > 1:
+                # Far too big for one prompt: summarize subsystems, then plan over the summaries.
+                # Summaries are cached by prompt, so unchanged subsystems aren't asked again.
+                repo_context, stats = await self._summarize_subsystems(report, slices, subsystems, budget)
+        finally:
+            self.slice_collector.close()
+        print(f"Repo context for {self.report_id}: {stats}")
+        return report, repo_context
+
+    def _build_recommendation(self, report: dict, ai_result: dict) -> dict:
         if ai_result.get("error"):
             # Fallback to heuristics if AI fails
             print(f"AI Generation Failed: {ai_result.get('error')}")
             # ... (keep existing fallback logic logic if needed, or just return basic report)
             # For now, let's just proceed with basic data
-            recommendation = {
+            return {
                  "system_summary": "AI generation failed. using static analysis.",
                  "pain_points": self._format_pain_points(set()),
                  "agent_opportunities": [],
                  "modernization_playbook": self._generate_playbook([], set())
             }
-        else:
-            # 5. Merge AI Findings with Heuristic Data
-            # The AI returns "location": "File :: Function". We need to map this back to our heuristic signals if possible
-            # to get line numbers, etc.
-            
-            final_opportunities = []
-            
-            # Index heuristics for lookup
-            heuristic_map = {}
-            for opp in report.get("agent_opportunities", []):
-                key = f"{opp.get('file_path')} :: {opp.get('function_name')}"
-                heuristic_map[key] = opp
-                
-            for ai_opp in ai_result.get("agent_opportunities", []):
-                loc = ai_opp.get("location")
-                matched_heuristic = heuristic_map.get(loc)
-                
-                # If AI found it, it's high confidence.
-                enhanced_opp = {
-                    "location": loc,
-                    "file": loc.split(" :: ")[0] if " :: " in loc else loc,
-                    "function": loc.split(" :: ")[1] if " :: " in loc else "",
-                    "signals": matched_heuristic.get("signals", []) if matched_heuristic else ["AI Identified"],
-                    "summary": ai_opp.get("summary"),
-                    "confidence": ai_opp.get("confidence", 0.9),
-                    "recommended_framework": ai_opp.get("recommended_framework"),
-                    "details": ai_opp.get("details", {}),
-                    "risk_assessment": ai_opp.get("details", {}).get("risk_assessment")
-                }
-                final_opportunities.append(enhanced_opp)
-            
-            recommendation = {
-                "system_summary": ai_result.get("system_summary"),
-                "pain_points": ai_result.get("pain_points", []),
-                "agent_opportunities": final_opportunities,
-                "modernization_playbook": ai_result.get("modernization_playbook")
+
+        # 5. Merge AI Findings with Heuristic Data
+        # The AI returns "location": "File :: Function". We need to map this back to our heuristic signals if possible
+        # to get line numbers, etc.
+        heuristic_map = self._heuristic_map(report)
+        final_opportunities = [
+            self._enhance_opportunity(ai_opp, heuristic_map) for ai_opp in ai_result.get("agent_opportunities", [])
+        ]
+
+        return {
+            "system_summary": ai_result.get("system_summary"),
+            "pain_points": ai_result.get("pain_points", []),
+            "agent_opportunities": final_opportunities,
+            "modernization_playbook": ai_result.get("modernization_playbook")
+        }
+
+    @staticmethod
+    def _tool_signals(report: dict) -> List[str]:
+        """What the tool library is ranked against: languages, I/O libraries, agent types."""
+        signals = ["agent", "workflow"] + list(report.get("summary", {}).get("languages", []))
+        for opp in report.get("agent_opportunities", []):
+            if opp.get("verdict") != "candidate":
+                continue
+            if opp.get("suggested_agent_type"):
+                signals.append(opp["suggested_agent_type"])
+            for signal in opp.get("signals", []):
+                if signal.startswith("external_io_dependencies: "):
+                    signals.append(signal.split(": ", 1)[1])
+        # Many candidates repeat the same signals
+        return list(dict.fromkeys(signals))
+
+    @staticmethod
+    def _heuristic_map(report: dict) -> Dict[str, dict]:
+        # Index heuristics for lookup
+        heuristic_map = {}
+        for opp in report.get("agent_opportunities", []):
+            key = f"{opp.get('file_path')} :: {opp.get('function_name')}"
+            heuristic_map[key] = opp
+        return heuristic_map
+
+    @staticmethod
+    def _enhance_opportunity(ai_opp: dict, heuristic_map: Dict[str, dict]) -> dict:
+        loc = ai_opp.get("location")
+        matched_heuristic = heuristic_map.get(loc)
+
+        # If AI found it, it's high confidence.
+        return {
+            "location": loc,
+            "file": loc.split(" :: ")[0] if " :: " in loc else loc,
+            "function": loc.split(" :: ")[1] if " :: " in loc else "",
+            "signals": matched_heuristic.get("signals", []) if matched_heuristic else ["AI Identified"],
+            "summary": ai_opp.get("summary"),
+            "confidence": ai_opp.get("confidence", 0.9),
+            "recommended_framework": ai_opp.get("recommended_framework"),
+            "details": ai_opp.get("details", {}),
+            "risk_assessment": ai_opp.get("details", {}).get("risk_assessment")
+        }
+
+    async def explain_opportunities(self, limit: Optional[int] = None, bypass_cache: bool = False,
+                                    concurrency: int = EXPLAIN_CONCURRENCY) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Asks the LLM to justify each heuristic candidate of the report, at most
+        `concurrency` at a time, and yields events: "start", one "explanation" per
+        candidate in completion order, then "done". Each justification is merged
+        into the stored recommendation as it arrives; failed ones are streamed
+        but never replace a stored justification.
+        """
+        report = self._load_report()
+        if report is None:
+            raise FileNotFoundError(f"Report {self.report_id} not found")
+        if self._load_recommendation() is None:
+            raise FileNotFoundError(f"No recommendation for {self.report_id} yet")
+
+        candidates = [opp for opp in report.get("agent_opportunities", []) if opp.get("verdict") == "candidate"]
+        report["agent_opportunities"] = candidates[:limit] if limit else candidates
+        repo_path = self._find_repo_path(report.get("repo"))
+        slices = await asyncio.to_thread(self.slice_collector.plan, report, repo_path) if repo_path else []
+
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def explain(code_slice: dict) -> Dict[str, Any]:
+            async with semaphore:
+                code = await asyncio.to_thread(self.slice_collector.read, code_slice)
+                if code_slice.get("stale"):
+                    # Not worth a call: the model would explain other code
+                    result = {"error": STALE_SLICE_NOTE}
+                else:
+                    result = await self.llm_client.explain_opportunity(code_slice, code, bypass_cache=bypass_cache)
+            explanation = {
+                "location": f"{code_slice['file']} :: {code_slice['function']}",
+                "file": code_slice["file"],
+                "function": code_slice["function"],
+                "start_line": code_slice["start_line"],
+                "llm_justification": result.get("justification") or result.get("error"),
+                "risk_assessment": result.get("risk_assessment"),
+                "recommended_agent_pattern": result.get("recommended_agent_pattern")
             }
-        
-        self._save_recommendation(recommendation)
-        return recommendation
+            if "error" in result or not result.get("justification"):
+                explanation["failed"] = True
+            return explanation
+
+        yield {"type": "start", "total": len(slices)}
+        tasks = [asyncio.ensure_future(explain(s)) for s in slices]
+        explained = 0
+        unsaved = []
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                explanation = await next_done
+                explained += 1
+                if not explanation.get("failed"):
+                    unsaved.append(explanation)
+                yield {"type": "explanation", **explanation}
+                if unsaved:
+                    await asyncio.to_thread(self._store_explanations, unsaved)
+                    unsaved = []
+        finally:
+            for task in tasks:
+                task.cancel()
+            self.slice_collector.close()
+            # Safety net: what arrived while the consumer was going away
+            if unsaved:
+                await asyncio.to_thread(self._store_explanations, unsaved)
+        yield {"type": "done", "explained": explained}
+
+    def _store_explanations(self, explanations: List[Dict[str, Any]]):
+        with _explanation_locks.setdefault((self.uid, self.report_id), threading.Lock()):
+            # Re-read: a regeneration may have replaced the recommendation meanwhile
+            recommendation = self._load_recommendation()
+            if recommendation is None:
+                return
+            stored = recommendation.setdefault("explanations", {})
+            for explanation in explanations:
+                stored[explanation["location"]] = explanation
+            for opp in recommendation.get("agent_opportunities", []):
+                if opp.get("location") in stored:
+                    opp["llm_justification"] = stored[opp["location"]]["llm_justification"]
+            self._save_recommendation(recommendation)
 
     def _format_pain_points(self, signals: set) -> list:
         readable_points = []
@@ -98,56 +346,218 @@ class Recommender:
             if "orchestration_naming_pattern" in s:
                 readable_points.append("**Implicit Orchestration**: Workflow logic is embedded in code functions matching 'process' or 'manager' patterns, making it hard to visualize.")
             if "high_complexity_context" in s:
-                readable_points.append("**Cognitive Load**: High cyclomatic complexity (>20) detected in key modules, increasing maintenance risk.")
+                readable_points.append("**Cognitive Load**: High cyclomatic complexity detected in key functions and modules, increasing maintenance risk.")
         
         if not readable_points:
             readable_points.append("No critical architectural pain points detected.")
             
         return list(set(readable_points)) # Dedupe
 
-    def _build_repo_context(self, report: dict, slices: list) -> str:
+    def _build_repo_context(self, report: dict, slices: list, budget_tokens: int,
+                            files: Optional[Set[str]] = None) -> Tuple[str, Dict[str, int]]:
         """
-        Constructs a text representation of the repo for the LLM.
+        Constructs a text representation of the repo for the LLM, packed into
+        budget_tokens by relevance: candidates (by risk, complexity and how central
+        their file is) and their code first, then hubs and cycles, then files and
+        imports. Files with identical import lists share one line. With `files`,
+        only those files (one subsystem) are described.
         """
-        lines = []
-        lines.append("=== FILE STRUCTURE ===")
-        # Top 50 files by complexity
-        # Sort files by complexity
         files_data = report.get("files", {})
-        sorted_files = sorted(files_data.items(), key=lambda x: x[1].get("complexity", 0), reverse=True)
-        
-        for f, data in sorted_files[:50]:
-            lines.append(f"- {f} (Complexity: {data.get('complexity')})")
-            
-        lines.append("\n=== DEPENDENCIES (IMPORTS) ===")
-        # Group by file
         deps = report.get("dependencies", {})
-        for f, imports in deps.items():
-            if imports:
-                lines.append(f"{f} depends on: {', '.join(imports[:5])}")
-                
-        lines.append("\n=== HEURISTIC CANDIDATES ===")
+        inside = (lambda f: True) if files is None else (lambda f: f in files)
+
+        if files is None and report.get("top_files") is not None:
+            top_files = report["top_files"]
+        else:
+            complexities = self._file_complexities(report)
+            top_files = sorted(((f, c) for f, c in complexities.items() if inside(f)), key=lambda x: x[1] or 0, reverse=True)
+        top_files = top_files[:TOP_FILES_IN_CONTEXT]
+
+        centrality = self._centrality(deps)
+        max_complexity = max((c or 0 for _, c in top_files), default=0) or 1
+        complexity_of = dict(top_files)
+
+        packer = ContextPacker(budget_tokens, CONTEXT_SECTIONS)
+
+        for f, complexity in top_files:
+            packer.add(SECTION_FILES, f"- {f} (Complexity: {complexity})",
+                       1 + 2 * (complexity or 0) / max_complexity + 2 * centrality(f))
+
+        # Group by file: internal modules first, then external packages; files
+        # importing exactly the same modules are listed together
+        groups: Dict[tuple, List[str]] = {}
+        for f, edges in DependencyGraph.edges_by_file(deps).items():
+            imports = tuple(edges["internal"] + edges["external"])
+            if imports and inside(f):
+                groups.setdefault(imports[:MAX_IMPORTS_PER_LINE], []).append(f)
+        for imports, group in groups.items():
+            shown = ", ".join(group[:5]) + (f" (+{len(group) - 5} more)" if len(group) > 5 else "")
+            verb = "depends on" if len(group) == 1 else "depend on"
+            score = max(0.5 + (complexity_of.get(f) or 0) / max_complexity + centrality(f) for f in group)
+            packer.add(SECTION_DEPENDENCIES, f"{shown} {verb}: {', '.join(imports)}", score)
+
+        for text, score in self._graph_items(deps, inside):
+            packer.add(SECTION_HUBS, text, score)
+
         # List the raw signals found by static analysis
+        candidate_scores = {}
         for opp in report.get("agent_opportunities", []):
-            if opp.get("verdict") == "candidate":
-                lines.append(f"Candidate: {opp.get('file_path')} :: {opp.get('function_name')}")
-                lines.append(f"  Signals: {', '.join(opp.get('signals', []))}")
-                
+            f, name = opp.get("file_path"), opp.get("function_name")
+            if opp.get("verdict") != "candidate" or not inside(f):
+                continue
+            complexity = self._function_complexity(files_data.get(f, {}), name, opp.get("start_line"))
+            score = 4 + RISK_WEIGHTS.get(opp.get("risk_level"), 1) + min(complexity / 20, 1) + centrality(f or "")
+            candidate_scores[(f, name)] = score
+            packer.add(SECTION_CANDIDATES, f"Candidate: {f} :: {name}\n  Signals: {', '.join(opp.get('signals', []))}", score)
+
+        # The code itself ranks just below its candidate line: the model can use a
+        # name without its code, not the other way round. It is read from the
+        # checkout only if it gets in.
+        max_slice_tokens = max(budget_tokens // 8, 200)
+        for code_slice in slices:
+            if not inside(code_slice["file"]):
+                continue
+            score = candidate_scores.get((code_slice["file"], code_slice["function"]), 4) - 1
+            header = (f"--- {code_slice['file']} :: {code_slice['function']} "
+                      f"(lines {code_slice['start_line']}-{code_slice['end_line']}) ---\n")
+            packer.add(SECTION_CODE, partial(self._render_slice, code_slice, header, max_slice_tokens), score,
+                       tokens=estimate_tokens(header) + min(code_slice["size"], max_slice_tokens * 4) // 4)
+
+        context, stats = packer.pack()
+        # Code only illustrates the candidates; the rest is what the model must see
+        stats["described"] = packer.wanted(exclude=(SECTION_CODE,))
+        return context, stats
+
+    def _render_slice(self, code_slice: dict, header: str, max_tokens: int) -> str:
+        # trim_to_tokens keeps at most 4 characters per token; reading twice that
+        # lets it cut at the same line as it would on the whole slice
+        code = self.slice_collector.read(code_slice, max_chars=max_tokens * 8)
+        if code_slice.get("stale"):
+            return header + STALE_SLICE_NOTE
+        return header + trim_to_tokens(code.rstrip("\n"), max_tokens)
+
+    @staticmethod
+    def _centrality(deps: dict):
+        # Share of the most imported file's fan-in
+        fan_in = dict(zip(deps.get("nodes", []), deps.get("fan_in", [])))
+        max_fan_in = max(fan_in.values(), default=0) or 1
+        return lambda f: fan_in.get(f.replace(os.sep, "/"), 0) / max_fan_in
+
+    @staticmethod
+    def _graph_items(deps: dict, inside) -> List[Tuple[str, float]]:
+        """Hub and import cycle lines touching files accepted by inside, with their scores."""
+        nodes = deps.get("nodes", [])
+        hubs = deps.get("hubs", [])
+        max_fan_in = max((hub["fan_in"] for hub in hubs), default=0) or 1
+        items = []
+        for hub in hubs[:10]:
+            if inside(nodes[hub["id"]]):
+                items.append((f"- {nodes[hub['id']]} (imported by {hub['fan_in']}, {hub['dependents']} transitively)",
+                              3 + hub["fan_in"] / max_fan_in))
+        for cycle in deps.get("cycles", [])[:10]:
+            if any(inside(nodes[i]) for i in cycle):
+                items.append((f"Import cycle: {' -> '.join(nodes[i] for i in cycle[:8])}", 2.5))
+        return items
+
+    @staticmethod
+    def _file_complexities(report: dict) -> Dict[str, int]:
+        if "file_index" in report:
+            return {item[0]: item[1] for item in report["file_index"]}
+        return {f: data.get("complexity", 0) for f, data in report.get("files", {}).items()}
+
+    # --- Hierarchical (map-reduce) playbooks for repos that don't fit one prompt ---
+
+    async def _summarize_subsystems(self, report: dict, slices: list, subsystems: Dict[str, List[str]],
+                                    budget_tokens: int) -> Tuple[str, Dict[str, int]]:
+        """
+        Map: summarizes the most relevant subsystems concurrently, each from a
+        context holding only its own files. Reduce input: the summaries, packed
+        like any other context, plus the repo-wide hubs and cycles. The playbook
+        prompt is then run over that instead of the raw repo.
+        """
+        complexities = self._file_complexities(report)
+        owner = {f: name for name, paths in subsystems.items() for f in paths}
+        candidates: Dict[str, List[str]] = {name: [] for name in subsystems}
+        for opp in report.get("agent_opportunities", []):
+            name = owner.get(opp.get("file_path"))
+            if opp.get("verdict") == "candidate" and name:
+                candidates[name].append(f"{opp.get('file_path')} :: {opp.get('function_name')}")
+        complexity = {name: sum(complexities.get(f) or 0 for f in paths) for name, paths in subsystems.items()}
+        ranked = sorted(subsystems, key=lambda name: (-len(candidates[name]), -complexity[name], name))
+        mapped, skipped = ranked[:MAX_SUBSYSTEMS], ranked[MAX_SUBSYSTEMS:]
+
+        semaphore = asyncio.Semaphore(MAP_CONCURRENCY)
+
+        async def summarize(name: str) -> dict:
+            context, _ = self._build_repo_context(report, slices, SUBSYSTEM_CONTEXT_TOKENS, files=set(subsystems[name]))
+            async with semaphore:
+                return await self.llm_client.summarize_subsystem(name, context)
+
+        summaries = await asyncio.gather(*(summarize(name) for name in mapped))
+
+        max_candidates = max((len(candidates[name]) for name in mapped), default=0) or 1
+        max_complexity = max((complexity[name] for name in mapped), default=0) or 1
+        packer = ContextPacker(budget_tokens, REDUCE_SECTIONS)
+        for name, summary in zip(mapped, summaries):
+            packer.add(SECTION_SUBSYSTEMS, self._format_summary(name, subsystems[name], candidates[name], summary),
+                       1 + 2 * len(candidates[name]) / max_candidates + complexity[name] / max_complexity)
+        if skipped:
+            packer.add(SECTION_SUBSYSTEMS, "Not summarized: " + ", ".join(
+                f"{name} ({len(subsystems[name])} files)" for name in skipped), 0)
+        for text, score in self._graph_items(report.get("dependencies", {}), lambda f: True):
+            packer.add(SECTION_HUBS, text, score)
+
+        context, stats = packer.pack()
+        stats["subsystems"] = len(subsystems)
+        stats["summarized"] = sum(1 for summary in summaries if not summary.get("error"))
+        return context, stats
+
+    @staticmethod
+    def _format_summary(name: str, paths: List[str], candidates: List[str], summary: dict) -> str:
+        lines = [f"--- {name} ({len(paths)} files, {len(candidates)} heuristic candidates) ---"]
+        if summary.get("error"):
+            # Still tell the reducer where the candidates are
+            lines.append("Summary unavailable. Candidates: " + (", ".join(candidates[:10]) or "none"))
+            return "\n".join(lines)
+        lines.append(f"Purpose: {summary.get('purpose', '')}")
+        if summary.get("workflows"):
+            lines.append("Workflows: " + "; ".join(summary["workflows"]))
+        if summary.get("pain_points"):
+            lines.append("Pain points: " + "; ".join(summary["pain_points"]))
+        for opp in summary.get("agent_opportunities", []):
+            lines.append(f"- Opportunity: {opp.get('location')}: {opp.get('summary')} "
+                         f"[{opp.get('recommended_framework')}, confidence {opp.get('confidence')}]")
         return "\n".join(lines)
 
-    def _find_report_path(self) -> Optional[str]:
-        # 1. User Scoped
+    @staticmethod
+    def _function_complexity(file_data: dict, name: Optional[str], lineno: Optional[int]) -> int:
+        for func in (file_data.get("ast") or {}).get("functions", []):
+            if func.get("name") == name and func.get("lineno") == lineno:
+                return func.get("complexity") or 0
+        return file_data.get("complexity") or 0
+
+    def _load_report(self) -> Optional[dict]:
+        # 1. User Scoped (may be a reference into the shared report store)
         if self.uid:
-            from backend.auth.user_manager import user_manager
-            user_dir = user_manager._get_user_dir(self.uid)
-            path = os.path.join(user_dir, "reports", f"{self.report_id}.json")
-            if os.path.exists(path):
-                return path
+            reader = report_store.open_user_report(self.uid, self.report_id)
+            if reader is not None:
+                # Only what the prompt uses: the header (summary, top files), the
+                # opportunities, the dependency graph, and the records of the flagged
+                # files for their slices. The other per-file sections stay on disk.
+                try:
+                    report = reader.load(sections=("agent_opportunities", "dependencies"))
+                    paths = {opp.get("file_path") for opp in report.get("agent_opportunities", [])}
+                    report["files"] = reader.files(paths)
+                    report["file_index"] = reader.file_index()
+                    return report
+                except (OSError, ValueError):
+                    pass
         
         # 2. Global Scoped (Legacy/Fallback)
         path = os.path.join("backend", "data", "reports", f"{self.report_id}.json")
         if os.path.exists(path):
-            return path
+            with open(path, 'r') as f:
+                return json.load(f)
             
         return None
 
@@ -221,6 +631,10 @@ class Recommender:
         return playbook
 
     def _find_repo_path(self, repo_name_slug: str) -> str:
+        path = catalog.find_repo(repo_name_slug)
+        if path and os.path.isdir(path):
+            return path
+        # Checkouts the catalog doesn't know about (copied in by hand): scan, then remember
         repos_root = os.path.join("backend", "repos")
         if not os.path.exists(repos_root):
             return ""
@@ -229,18 +643,30 @@ class Recommender:
             if os.path.isdir(owner_dir):
                 for name in os.listdir(owner_dir):
                     if f"{owner}-{name}" == repo_name_slug:
+                         catalog.put_repo(owner, name, os.path.join(owner_dir, name))
                          return os.path.join(owner_dir, name)
         return ""
 
-    def _save_recommendation(self, data: dict):
+    def _recommendation_path(self) -> str:
         if self.uid:
             from backend.auth.user_manager import user_manager
             user_dir = user_manager._get_user_dir(self.uid)
             out_dir = os.path.join(user_dir, "modernization", "repo")
         else:
             out_dir = os.path.join("backend", "data", "ai")
-            
-        os.makedirs(out_dir, exist_ok=True)
-        out_path = os.path.join(out_dir, f"{self.report_id}.json")
+        return os.path.join(out_dir, f"{self.report_id}.json")
+
+    def _load_recommendation(self) -> Optional[dict]:
+        path = self._recommendation_path()
+        if not os.path.exists(path):
+            return None
+        with open(path, 'r') as f:
+            return json.load(f)
+
+    def _save_recommendation(self, data: dict):
+        out_path = self._recommendation_path()
+        os.makedirs(os.path.dirname(out_path), exist_ok=True)
         with open(out_path, 'w') as f:
             json.dump(data, f, indent=2)
+        if self.uid:
+            catalog.put_recommendation(self.uid, self.report_id)
@@ -0,0 +1,154 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from typing import Any, Dict, Optional
+
+CACHE_PATH = os.path.join("backend", "data", "llm_cache.db")
+# Responses older than this are refetched: model output and the tool library drift
+DEFAULT_TTL_SECONDS = 7 * 24 * 3600
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    model TEXT NOT NULL,
+    value TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responses_by_access ON responses (accessed_at);
+"""
+
+class ResponseCache:
+    """
+    Persistent, content-addressed cache of parsed LLM responses in SQLite (WAL).
+    Entries expire after a TTL; past the size budget the least recently used
+    ones are evicted. Hit/miss counters are per process.
+    """
+
+    def __init__(self, path: Optional[str] = None, ttl_seconds: Optional[float] = None, max_bytes: Optional[int] = None):
+        self.path = path or os.getenv("LLM_CACHE_PATH", CACHE_PATH)
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else float(os.getenv("LLM_CACHE_TTL", str(DEFAULT_TTL_SECONDS)))
+        self.max_bytes = max_bytes if max_bytes is not None else int(os.getenv("LLM_CACHE_MAX_BYTES", str(DEFAULT_MAX_BYTES)))
+        self.enabled = os.getenv("LLM_CACHE_DISABLED", "").lower() not in ("1", "true", "yes")
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._total_bytes = 0
+        self.counters = {"hits": 0, "misses": 0, "expired": 0, "evictions": 0, "writes": 0}
+
+    @staticmethod
+    def make_key(model: str, prompt: str, use_search: bool) -> str:
+        digest = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+        return f"{model}:{'search' if use_search else 'plain'}:{digest}"
+
+    def _db(self) -> sqlite3.Connection:
+        # Called with self._lock held
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=5000")
+            conn.executescript(_SCHEMA)
+            self._total_bytes = conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+            self._conn = conn
+        return self._conn
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        if not self.enabled:
+            return None
+        try:
+            return self._get(key)
+        except sqlite3.Error as e:
+            # A broken cache must never break generation: treat it as a miss
+            print(f"LLM cache read failed: {e}")
+            return None
+
+    def _get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            db = self._db()
+            row = db.execute("SELECT value, size, created_at FROM responses WHERE key = ?", (key,)).fetchone()
+            now = time.time()
+            if row is None:
+                self.counters["misses"] += 1
+                return None
+            value, size, created_at = row
+            if now - created_at > self.ttl_seconds:
+                db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._total_bytes -= size
+                self.counters["expired"] += 1
+                self.counters["misses"] += 1
+                return None
+            db.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+            self.counters["hits"] += 1
+        return json.loads(value)
+
+    def put(self, key: str, model: str, value: Dict[str, Any]):
+        if not self.enabled:
+            return
+        text = json.dumps(value)
+        size = len(text.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        try:
+            self._put(key, model, text, size)
+        except sqlite3.Error as e:
+            print(f"LLM cache write failed: {e}")
+
+    def _put(self, key: str, model: str, text: str, size: int):
+        with self._lock:
+            db = self._db()
+            now = time.time()
+            old = db.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+            db.execute(
+                "INSERT OR REPLACE INTO responses (key, model, value, size, created_at, accessed_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (key, model, text, size, now, now)
+            )
+            self._total_bytes += size - (old[0] if old else 0)
+            self.counters["writes"] += 1
+            if self._total_bytes > self.max_bytes:
+                self._evict(db)
+
+    def _evict(self, db: sqlite3.Connection):
+        # Other processes write too: start from the real total
+        self._total_bytes = db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if self._total_bytes <= self.max_bytes:
+            return
+        # Expired entries first, then least recently used until under budget
+        cutoff = time.time() - self.ttl_seconds
+        expired = db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses WHERE created_at < ?", (cutoff,)).fetchone()
+        if expired[0]:
+            db.execute("DELETE FROM responses WHERE created_at < ?", (cutoff,))
+            self._total_bytes -= expired[1]
+            self.counters["expired"] += expired[0]
+        for key, size in db.execute("SELECT key, size FROM responses ORDER BY accessed_at").fetchall():
+            if self._total_bytes <= self.max_bytes:
+                break
+            db.execute("DELETE FROM responses WHERE key = ?", (key,))
+            self._total_bytes -= size
+            self.counters["evictions"] += 1
+
+    def clear(self):
+        with self._lock:
+            self._db().execute("DELETE FROM responses")
+            self._total_bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            entries = self._db().execute("SELECT COUNT(*) FROM responses").fetchone()[0] if self.enabled else 0
+            lookups = self.counters["hits"] + self.counters["misses"]
+            return {
+                "enabled": self.enabled,
+                **self.counters,
+                "hit_rate": round(self.counters["hits"] / lookups, 3) if lookups else None,
+                "entries": entries,
+                "bytes": self._total_bytes,
+                "max_bytes": self.max_bytes,
+                "ttl_seconds": self.ttl_seconds
+            }
+
+response_cache = ResponseCache()
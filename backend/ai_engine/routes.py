@@ -1,24 +1,77 @@
+import json
+from typing import Optional
 from fastapi import APIRouter, HTTPException, Depends
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from backend.ai_engine.recommender import Recommender
+from backend.ai_engine.llm_client import LLMClient
+from backend.clients import get_llm_client
+from backend.ai_engine.response_cache import response_cache
+from backend.ai_engine.rate_limiter import rate_limiter
 from backend.auth.firebase import verify_token
 
 router = APIRouter()
 
 class RecommendRequest(BaseModel):
     report_id: str
+    refresh: bool = False # skip the LLM response cache and ask the model again
 
 @router.post("/recommend")
 async def recommend(
     request: RecommendRequest,
-    uid: str = Depends(verify_token)
+    uid: str = Depends(verify_token),
+    llm: LLMClient = Depends(get_llm_client)
 ):
-    # TODO: Pass uid to Recommender for user-scoped data
-    recommender = Recommender(request.report_id, uid)
+    recommender = Recommender(request.report_id, uid, llm)
     try:
-        result = await recommender.generate()
+        result = await recommender.generate(bypass_cache=request.refresh)
         return result
     except FileNotFoundError as e:
         raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+class ExplainRequest(BaseModel):
+    report_id: str
+    limit: Optional[int] = None # explain only the first N candidates
+    refresh: bool = False
+
+@router.post("/explain/stream")
+async def explain_stream(
+    request: ExplainRequest,
+    uid: str = Depends(verify_token),
+    llm: LLMClient = Depends(get_llm_client)
+):
+    """
+    Explains every heuristic candidate of the report in parallel and streams NDJSON
+    events: "start", one "explanation" per candidate as soon as it's done, then
+    "done" (or "error"). Justifications are stored with the recommendation.
+    """
+    recommender = Recommender(request.report_id, uid, llm)
+    events = recommender.explain_opportunities(limit=request.limit, bypass_cache=request.refresh)
+    try:
+        # Runs up to the "start" event, so a missing report is still a 404
+        first = await events.__anext__()
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+    async def lines():
+        yield json.dumps(first) + "\n"
+        try:
+            async for event in events:
+                yield json.dumps(event) + "\n"
+        except Exception as e:
+            yield json.dumps({"type": "error", "detail": str(e)}) + "\n"
+        finally:
+            # Client gone: cancel the outstanding calls and store what's done
+            await events.aclose()
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+@router.get("/cache/stats")
+async def cache_stats(uid: str = Depends(verify_token)):
+    return response_cache.stats()
+
+@router.get("/rate-limit/stats")
+async def rate_limit_stats(uid: str = Depends(verify_token)):
+    return rate_limiter.stats()
@@ -0,0 +1,42 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls with the same key: the first caller starts the
+    work, later callers await the same task instead of starting their own.
+    The entry is dropped when the work finishes, so the next call runs again.
+    """
+
+    def __init__(self):
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+        self.coalesced = 0
+
+    async def run(self, key: Hashable, work: Callable[[], Awaitable[Any]]) -> Any:
+        # shield: one caller going away (client disconnect) mustn't cancel the
+        # run the other callers are waiting on
+        return await asyncio.shield(self.start(key, work))
+
+    def start(self, key: Hashable, work: Callable[[], Awaitable[Any]]) -> asyncio.Task:
+        """
+        The task running key's work: the one in flight, or a new one started
+        now. Registered before returning, so a call right after joins it.
+        """
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(work())
+            self._inflight[key] = task
+            task.add_done_callback(lambda t, key=key: self._forget(key, t))
+        else:
+            self.coalesced += 1
+        return task
+
+    def _forget(self, key: Hashable, task: asyncio.Task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # Nobody may be left to await it; don't let an error go unretrieved
+        if not task.cancelled():
+            task.exception()
+
+    def in_flight(self, key: Hashable) -> bool:
+        return key in self._inflight
@@ -1,50 +1,180 @@
 import os
+import mmap
+import threading
+from typing import Any, Dict, Optional, Set, Tuple
+from backend.analysis.line_index import build_source_info, git_blob_sha, line_offset
+
+CUT_MARKER = "# ... (cut)"
 
 class SliceCollector:
+    """
+    Code of the report's agent opportunities. plan() only describes the slices
+    (no file is read for reports that carry a line index), read() cuts one
+    slice's bytes out of the memory-mapped file. A file is checked against the
+    content hash recorded at analysis time the first time it is read; if the
+    checkout changed since, the recorded line ranges no longer point at the
+    function, so nothing is read and the slice is marked "stale".
+    Call close() to release the mapped files.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._sources: Dict[str, Optional[Dict[str, Any]]] = {} # file -> recorded line index
+        self._views: Dict[str, Optional[Tuple[Any, Dict[str, Any]]]] = {} # file -> (buffer, line index)
+        self._stale: Set[str] = set() # files changed since the analysis
+
     def collect(self, report: dict, repo_path: str) -> list:
+        """All slices with their "code" read."""
+        slices = self.plan(report, repo_path)
+        for code_slice in slices:
+            code_slice["code"] = self.read(code_slice)
+        return slices
+
+    def plan(self, report: dict, repo_path: str) -> list:
         slices = []
         opportunities = report.get("agent_opportunities", [])
-        
-        # Cache file content to avoid repeated reads
-        file_cache = {}
+        files_data = report.get("files", {})
 
         for opp in opportunities:
             file_rel_path = opp.get("file_path") or opp.get("file") # Fallback for old keys if any
             if not file_rel_path:
                 continue
-                
+
             full_path = os.path.join(repo_path, file_rel_path)
-            
-            if file_rel_path not in file_cache:
-                if not os.path.exists(full_path):
-                     continue
-                try:
-                    with open(full_path, 'r', encoding='utf-8') as f:
-                        file_cache[file_rel_path] = f.readlines()
-                except UnicodeDecodeError:
+            if not os.path.exists(full_path):
+                continue
+            if file_rel_path not in self._sources:
+                self._sources[file_rel_path] = (files_data.get(file_rel_path) or {}).get("source")
+            source = self._sources[file_rel_path]
+            if source is None:
+                # Reports from before the line index: index the file now
+                view = self._open(file_rel_path, full_path)
+                if view is None:
                     continue
-            
-            lines = file_cache.get(file_rel_path)
-            if not lines:
+                source = view[1]
+            line_count = source["lines"]
+            if not line_count:
                 continue
-                
+
             start_line = opp.get("start_line", 1) - 1 # 0-indexed
             end_line = opp.get("end_line", start_line + 50)
-            
+
             # Ensure bounds
             start_line = max(0, start_line)
-            end_line = min(len(lines), end_line)
-            
-            code_snippet = "".join(lines[start_line:end_line])
-            
+            end_line = min(line_count, end_line)
+
+            # Prefer the analyzer's def-use slice; fall back to the whole line range
+            slice_lines = self._find_slice(report, file_rel_path, opp.get("function_name"), start_line + 1)
+            if slice_lines:
+                ranges = list(zip(slice_lines[0::2], slice_lines[1::2]))
+            else:
+                ranges = [(start_line + 1, end_line)]
+            span = sum(max(last - first + 1, 0) for first, last in ranges)
+
             slices.append({
                 "file": file_rel_path,
                 "function": opp.get("function_name"),
                 "start_line": start_line + 1,
                 "end_line": end_line,
-                "code": code_snippet,
+                "sliced": bool(slice_lines),
                 "reason": opp.get("explanation"),
-                "signals": opp.get("signals", [])
+                "signals": opp.get("signals", []),
+                "path": full_path,
+                "ranges": ranges,
+                # Estimated from the file's mean line length, for budgeting before reading
+                "size": span * source["size"] // line_count
             })
-        
+
         return slices
+
+    def read(self, code_slice: dict, max_chars: Optional[int] = None) -> str:
+        """
+        The slice's code, the ranges joined with an indented "# ..." marking each
+        gap. With max_chars, only about that much is read: the code is cut after
+        the last whole line that fits and CUT_MARKER added. Empty, with "stale"
+        set on the slice, if the file changed since the analysis.
+        """
+        view = self._open(code_slice["file"], code_slice["path"])
+        if view is None:
+            if code_slice["file"] in self._stale:
+                code_slice["stale"] = True
+            return ""
+        buf, source = view
+        parts = []
+        size = 0
+        prev_last = None
+        cut = False
+        for first, last in code_slice["ranges"]:
+            start = line_offset(buf, source, first)
+            end = line_offset(buf, source, last + 1)
+            if max_chars is not None and end - start > max_chars - size:
+                # A character is at least a byte: this is enough to fill max_chars
+                end = start + max_chars - size + 1
+                cut = True
+            if start >= end:
+                continue
+            chunk = buf[start:end].decode("utf-8", errors="replace").replace("\r\n", "\n")
+            if prev_last is not None and first > prev_last + 1:
+                line_end = chunk.find("\n") + 1
+                next_line = chunk[:line_end] if line_end else chunk
+                indent = next_line[:len(next_line) - len(next_line.lstrip())]
+                parts.append(f"{indent}# ...\n")
+            parts.append(chunk)
+            size += len(chunk)
+            prev_last = last
+            if cut:
+                break
+
+        code = "".join(parts)
+        if cut or (max_chars is not None and len(code) > max_chars):
+            code = code[:code.rfind("\n", 0, max_chars) + 1] + CUT_MARKER + "\n"
+        return code
+
+    def close(self):
+        with self._lock:
+            for view in self._views.values():
+                if view is not None and isinstance(view[0], mmap.mmap):
+                    view[0].close()
+            self._views.clear()
+            self._stale.clear()
+
+    def _open(self, file_rel_path: str, full_path: str) -> Optional[Tuple[Any, Dict[str, Any]]]:
+        with self._lock:
+            if file_rel_path not in self._views:
+                self._views[file_rel_path] = self._map(file_rel_path, full_path)
+            return self._views[file_rel_path]
+
+    def _map(self, file_rel_path: str, full_path: str) -> Optional[Tuple[Any, Dict[str, Any]]]:
+        source = self._sources.get(file_rel_path)
+        try:
+            size = os.path.getsize(full_path)
+            if not size:
+                return None # mmap can't map an empty file; it has no code anyway
+            with open(full_path, 'rb') as f:
+                buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return None
+        if source is not None:
+            if source["size"] == size and source["sha"] == git_blob_sha(buf):
+                return buf, source
+            # Changed since the analysis: the recorded ranges would cut other code
+            buf.close()
+            self._stale.add(file_rel_path)
+            return None
+        # Reports from before the line index: index what is there now
+        raw = buf[:]
+        buf.close()
+        try:
+            raw.decode('utf-8')
+        except UnicodeDecodeError:
+            return None
+        return raw, build_source_info(raw)
+
+    def _find_slice(self, report: dict, file_rel_path: str, function_name: str, lineno: int) -> list:
+        file_slices = report.get("files", {}).get(file_rel_path, {}).get("slices")
+        if not isinstance(file_slices, dict):
+            return [] # Reports from before the slicer stored a placeholder here
+        for func in file_slices.get("functions", []):
+            if func.get("name") == function_name and func.get("lineno") == lineno:
+                return func.get("lines", [])
+        return []
@@ -0,0 +1,182 @@
+import json
+import asyncio
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+Event = Tuple[Any, ...]
+
+class JsonStreamParser:
+    """
+    Incremental parser for a JSON object arriving in chunks (a streamed model
+    answer). feed() returns what got complete with that chunk:
+      ("field", key, value)        a top-level value other than an array
+      ("item", key, index, value)  one element of a top-level array
+    Anything before the first "{" (a markdown fence) is skipped. Each character
+    is scanned once; only completed values are handed to json.loads. Values that
+    don't parse are skipped here: the final answer is parsed as a whole anyway.
+    """
+
+    def __init__(self):
+        self.text = ""
+        self.done = False
+        self._pos = 0
+        self._stack: List[str] = []
+        self._in_string = False
+        self._escape = False
+        self._expect_key = False
+        self._key: Optional[str] = None
+        self._key_start = 0
+        self._value_start: Optional[int] = None # current top-level value
+        self._item_start: Optional[int] = None  # current element of a top-level array
+        self._item_index = 0
+
+    def feed(self, chunk: str) -> List[Event]:
+        self.text += chunk
+        events: List[Event] = []
+        text, stack = self.text, self._stack
+        i, end = self._pos, len(text)
+        while i < end and not self.done:
+            c = text[i]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif c == "\\":
+                    self._escape = True
+                elif c == '"':
+                    self._in_string = False
+                    if len(stack) == 1 and self._expect_key:
+                        self._key = self._loads(text[self._key_start:i + 1])
+                i += 1
+                continue
+
+            depth = len(stack)
+            if c in " \t\r\n":
+                pass
+            elif depth == 0:
+                if c == "{":
+                    stack.append(c)
+                    self._expect_key = True
+            elif c == "}" or c == "]":
+                if depth == 1:
+                    self._end_field(text, i, events)
+                    self.done = True
+                elif depth == 2 and stack[1] == "[":
+                    # The top-level array itself closes
+                    self._end_item(text, i, events)
+                    self._value_start = None
+                    self._item_index = 0
+                stack.pop()
+                if len(stack) == 1 and c == "}":
+                    self._emit(events, ("field", self._key), text[self._value_start:i + 1])
+                    self._value_start = None
+                elif len(stack) == 2 and stack[1] == "[":
+                    self._emit_item(events, text[self._item_start:i + 1])
+                    self._item_start = None
+            elif c == ",":
+                if depth == 1:
+                    self._end_field(text, i, events)
+                    self._expect_key = True
+                elif depth == 2 and stack[1] == "[":
+                    self._end_item(text, i, events)
+            elif c == ":" and depth == 1:
+                self._expect_key = False
+            else:
+                if depth == 1:
+                    if self._expect_key:
+                        if c == '"':
+                            self._key_start = i
+                    elif self._value_start is None:
+                        self._value_start = i
+                elif depth == 2 and stack[1] == "[" and self._item_start is None:
+                    self._item_start = i
+                if c == '"':
+                    self._in_string = True
+                elif c == "{" or c == "[":
+                    stack.append(c)
+            i += 1
+        self._pos = i
+        return events
+
+    def _end_field(self, text: str, i: int, events: List[Event]):
+        # A scalar top-level value ends at the next "," or the closing "}"
+        if self._value_start is not None:
+            self._emit(events, ("field", self._key), text[self._value_start:i])
+            self._value_start = None
+
+    def _end_item(self, text: str, i: int, events: List[Event]):
+        if self._item_start is not None:
+            self._emit_item(events, text[self._item_start:i])
+            self._item_start = None
+
+    def _emit_item(self, events: List[Event], raw: str):
+        self._emit(events, ("item", self._key, self._item_index), raw)
+        self._item_index += 1
+
+    def _emit(self, events: List[Event], head: Tuple[Any, ...], raw: str):
+        value = self._loads(raw)
+        if value is not _INVALID:
+            events.append(head + (value,))
+
+    @staticmethod
+    def _loads(raw: str) -> Any:
+        try:
+            return json.loads(raw)
+        except ValueError:
+            return _INVALID
+
+_INVALID = object()
+
+def events_from_result(result: Dict[str, Any]) -> List[Event]:
+    """The events a parser would have produced for result: replays cached answers."""
+    events: List[Event] = []
+    for key, value in result.items():
+        if isinstance(value, list):
+            events.extend(("item", key, index, item) for index, item in enumerate(value))
+        else:
+            events.append(("field", key, value))
+    return events
+
+class EventLog:
+    """
+    The events of one streamed generation, for any number of followers:
+    follow() yields what was published so far, then each event as it comes,
+    and ends when the log is closed (raising the error it was closed with).
+    A stream that starts late still gets the whole answer from the beginning.
+    """
+
+    def __init__(self):
+        self.events: List[Any] = []
+        self.closed = False
+        self.error: Optional[Exception] = None
+        self._changed = asyncio.Event()
+
+    def publish(self, event: Any):
+        self.events.append(event)
+        self._wake()
+
+    def close(self, error: Optional[Exception] = None):
+        if self.closed:
+            return
+        self.closed = True
+        self.error = error
+        self._wake()
+
+    def _wake(self):
+        # Followers wait on the current Event; the next change gets a fresh one
+        changed, self._changed = self._changed, asyncio.Event()
+        changed.set()
+
+    async def follow(self) -> AsyncIterator[Any]:
+        seen = 0
+        while True:
+            while seen < len(self.events):
+                seen += 1
+                yield self.events[seen - 1]
+            if self.closed:
+                if self.error is not None:
+                    raise self.error
+                return
+            await self._changed.wait()
+
+def sse_event(event: Dict[str, Any]) -> str:
+    """One Server-Sent Events message, named after the event's type."""
+    return f"event: {event.get('type', 'message')}\ndata: {json.dumps(event)}\n\n"
@@ -0,0 +1,32 @@
+import os
+from typing import Dict, Iterable, List
+
+ROOT_SUBSYSTEM = "(root)"
+
+def split_subsystems(paths: Iterable[str], max_files: int) -> Dict[str, List[str]]:
+    """
+    Groups repo-relative paths into subsystems by directory: top-level
+    directories first, and any directory holding more than max_files files is
+    split into its subdirectories in turn. Files sitting directly in a
+    directory that got split stay together under that directory's name.
+    """
+    subsystems: Dict[str, List[str]] = {}
+    _split(sorted(p.replace(os.sep, "/") for p in paths), 0, "", max_files, subsystems)
+    return subsystems
+
+def _split(paths: List[str], depth: int, prefix: str, max_files: int, out: Dict[str, List[str]]):
+    if len(paths) <= max_files and prefix:
+        out[prefix] = paths
+        return
+    children: Dict[str, List[str]] = {}
+    direct: List[str] = []
+    for path in paths:
+        parts = path.split("/")
+        if len(parts) > depth + 1:
+            children.setdefault(parts[depth], []).append(path)
+        else:
+            direct.append(path)
+    if direct:
+        out[prefix or ROOT_SUBSYSTEM] = direct
+    for name, child_paths in children.items():
+        _split(child_paths, depth + 1, f"{prefix}/{name}" if prefix else name, max_files, out)
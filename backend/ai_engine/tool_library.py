@@ -0,0 +1,133 @@
+import os
+import re
+import math
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+TOOLS_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "lib", "tools.ts")
+
+# Categories considered relevant for "Agentic Workflow Modernization"
+RELEVANT_CATEGORIES = {"Developers", "Automation"}
+TOOLS_IN_PROMPT = 15
+
+# Index weight of a query term found in each field
+FIELD_WEIGHTS = (("name", 3.0), ("category", 2.0), ("tags", 2.0), ("description", 1.0))
+_STOPWORDS = {
+    "a", "an", "and", "as", "ai", "by", "for", "from", "in", "is", "it", "of", "on", "or",
+    "that", "the", "to", "with", "your", "you", "lib", "src"
+}
+_TOKEN_RE = re.compile(r"[a-z0-9+#]+")
+_OBJECT_RE = re.compile(r"\{([^{}]*)\}")
+_STRING = r'"((?:[^"\\]|\\.)*)"'
+_FIELD_RES = {
+    field: re.compile(rf"\b{field}:\s*{_STRING}") for field in ("name", "category", "description")
+}
+_TAGS_RE = re.compile(r"\btags:\s*\[([^\]]*)\]")
+_TAG_RE = re.compile(_STRING)
+
+def tokenize(text: str) -> List[str]:
+    return [t for t in _TOKEN_RE.findall(text.lower()) if t not in _STOPWORDS and len(t) > 1]
+
+class Tool:
+    __slots__ = ("name", "category", "tags", "description")
+
+    def __init__(self, name: str, category: str, tags: List[str], description: str):
+        self.name = name
+        self.category = category
+        self.tags = tags
+        self.description = description
+
+class ToolLibrary:
+    """
+    The project's tool catalogue (lib/tools.ts), parsed once and kept in memory
+    until the file's mtime changes, with an inverted index from terms to tools.
+    select() ranks tools against a repo's signals (TF-IDF style over the fields).
+    """
+
+    def __init__(self, path: str = TOOLS_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._stamp: Optional[Tuple[float, int]] = None
+        self._tools: List[Tool] = []
+        self._index: Dict[str, Dict[int, float]] = {}
+
+    def tools(self) -> List[Tool]:
+        self._refresh()
+        return self._tools
+
+    def _refresh(self):
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            self._stamp, self._tools, self._index = None, [], {}
+            return
+        stamp = (st.st_mtime, st.st_size)
+        if stamp == self._stamp:
+            return
+        with self._lock:
+            if stamp == self._stamp:
+                return
+            with open(self.path, 'r') as f:
+                tools = self._parse(f.read())
+            self._tools, self._index = tools, self._build_index(tools)
+            self._stamp = stamp
+
+    @staticmethod
+    def _parse(content: str) -> List[Tool]:
+        tools = []
+        # Each object literal of the TOOLS array, fields in any order
+        for block in _OBJECT_RE.finditer(content):
+            body = block.group(1)
+            fields = {field: pattern.search(body) for field, pattern in _FIELD_RES.items()}
+            if not fields["name"] or not fields["category"]:
+                continue
+            tags_match = _TAGS_RE.search(body)
+            tags = _TAG_RE.findall(tags_match.group(1)) if tags_match else []
+            description = fields["description"].group(1) if fields["description"] else ""
+            tools.append(Tool(fields["name"].group(1), fields["category"].group(1), tags, description))
+        return tools
+
+    @staticmethod
+    def _build_index(tools: List[Tool]) -> Dict[str, Dict[int, float]]:
+        index: Dict[str, Dict[int, float]] = {}
+        for i, tool in enumerate(tools):
+            texts = {"name": tool.name, "category": tool.category, "tags": " ".join(tool.tags), "description": tool.description}
+            for field, weight in FIELD_WEIGHTS:
+                for term in set(tokenize(texts[field])):
+                    postings = index.setdefault(term, {})
+                    # A term counts once per tool, in its best field
+                    postings[i] = max(postings.get(i, 0.0), weight)
+        return index
+
+    def select(self, signals: Iterable[str], k: int = TOOLS_IN_PROMPT,
+               categories: Optional[set] = RELEVANT_CATEGORIES) -> List[Tool]:
+        """
+        The k tools of the given categories that best match the signals; ties and
+        any remaining slots go by catalogue order.
+        """
+        tools = self.tools()
+        allowed = [i for i, tool in enumerate(tools) if categories is None or tool.category in categories]
+        allowed_set = set(allowed)
+        scores: Dict[int, float] = {}
+        for term in set(t for signal in signals for t in tokenize(signal)):
+            postings = self._index.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + len(tools) / len(postings))
+            for i, weight in postings.items():
+                if i in allowed_set:
+                    scores[i] = scores.get(i, 0.0) + weight * idf
+        ranked = sorted(scores, key=lambda i: (-scores[i], i))[:k]
+        if len(ranked) < k:
+            ranked += [i for i in allowed if i not in scores][:k - len(ranked)]
+        return [tools[i] for i in ranked]
+
+    def render(self, tools: List[Tool]) -> str:
+        if not self._tools:
+            return "No local tool library found."
+        if not tools:
+            return "Tool library detected but no relevant tools found."
+        lines = [f"- {tool.name} ({tool.category}): {tool.description}" for tool in tools]
+        return "=== RELEVANT PROJECT TOOLS (Developers & Automation) ===\n" + "\n".join(lines)
+
+tool_library = ToolLibrary()
@@ -1,66 +1,82 @@
 import os
 import json
-from typing import Dict, Any
+from typing import Dict, Any, Iterator, List, Optional, Tuple
 from backend.analysis.file_scanner import FileScanner
-from backend.analysis.ast_parser import ASTParser
-from backend.analysis.complexity import ComplexityCalculator
+from backend.analysis.file_analyzer import FileAnalyzer
+from backend.analysis.parallel_runner import ParallelRunner
 from backend.analysis.dependency_graph import DependencyGraph
-from backend.analysis.cfg_builder import CFGBuilder
-from backend.analysis.slicer import Slicer
+from backend.analysis.git_state import GitState
 from backend.ai_engine.heuristics import HeuristicDetector
 
+# Bump whenever the shape of per-file entries changes, so incremental runs
+# don't carry over entries produced by an older analyzer.
+ANALYZER_VERSION = 6
+
 class Analyzer:
-    def __init__(self, repo_path: str, repo_name: str):
+    def __init__(self, repo_path: str, repo_name: str, workers: Optional[int] = None):
         self.repo_path = repo_path
         self.repo_name = repo_name
         self.scanner = FileScanner(repo_path)
-        self.ast_parser = ASTParser()
-        self.complexity_calc = ComplexityCalculator()
-        self.dep_graph = DependencyGraph()
-        self.cfg_builder = CFGBuilder()
-        self.cfg_builder = CFGBuilder()
-        self.slicer = Slicer()
+        self.git_state = GitState(repo_path)
+        self.file_analyzer = FileAnalyzer()
+        self.dep_graph = DependencyGraph(repo_path)
         self.heuristic_detector = HeuristicDetector()
+        self.report: Optional[Dict[str, Any]] = None
 
-    def run(self) -> Dict[str, Any]:
-        files = self.scanner.scan()
-        files_data = {}
-        
-        total_complexity = 0
+        # 0 = analyze in-process; N > 0 = fan out over N worker processes
+        if workers is None:
+            workers = int(os.getenv("ANALYSIS_WORKERS", "0"))
+        self.workers = max(0, workers)
+        self.file_time_budget = float(os.getenv("ANALYSIS_FILE_TIMEOUT", "30"))
+        self.file_memory_budget = int(os.getenv("ANALYSIS_FILE_MEMORY_MB", "512")) * 1024 * 1024
+
+    def run(self, previous_report: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        for _ in self.stream(previous_report):
+            pass
         
-        for file_rel_path in files:
-            full_path = os.path.join(self.repo_path, file_rel_path)
-            try:
-                with open(full_path, 'r', encoding='utf-8') as f:
-                    content = f.read()
-            except UnicodeDecodeError:
-                continue # Skip non-utf8 files
-                
-            ast_data = self.ast_parser.parse(file_rel_path, content)
-            complexity = self.complexity_calc.calculate(content)
-            
-            # Tools that might fail on non-python
-            try:
-                cfg = self.cfg_builder.build(content)
-            except:
-                cfg = {}
-                
-            try:
-                slices = self.slicer.slice(content)
-            except:
-                slices = [] # Slicer might depend on AST
-            
-            total_complexity += complexity
-            
-            files_data[file_rel_path] = {
-                "ast": ast_data,
-                "complexity": complexity,
-                "cfg": cfg,
-                "slices": slices
-            }
+        # self._save_report(report) # Responsibility moved to caller
+        return self.report
+
+    def stream(self, previous_report: Optional[Dict[str, Any]] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Yields progress events while analyzing: a "start" event, one "file" event per
+        file as soon as it's done (AST, complexity, opportunities), then "dependencies"
+        and "summary". The assembled report is available as self.report afterwards.
+        """
+        sized_files = self.scanner.scan_with_sizes()
+        files = [f for f, _ in sized_files]
+        commit = self.git_state.head_commit()
+        blobs = self.git_state.blob_hashes()
+
+        # Reuse entries of files unchanged since the previous report; deleted files
+        # simply aren't in the new scan, so they drop out.
+        results = self._reusable_entries(previous_report, files, blobs)
+        to_analyze = [(f, size) for f, size in sized_files if f not in results]
+        file_opportunities = {}
+
+        yield {"type": "start", "repo": self.repo_name, "commit": commit, "files": len(files), "to_analyze": len(to_analyze)}
+
+        for file_rel_path, entry in list(results.items()):
+            file_opportunities[file_rel_path] = self._detect_agent_opportunities({file_rel_path: entry})
+            yield self._file_event(file_rel_path, entry, file_opportunities[file_rel_path])
+
+        for file_rel_path, entry in self._analyze_files(to_analyze):
+            if entry is not None:
+                entry["blob"] = blobs.get(file_rel_path)
+                results[file_rel_path] = entry
+                file_opportunities[file_rel_path] = self._detect_agent_opportunities({file_rel_path: entry})
+                yield self._file_event(file_rel_path, entry, file_opportunities[file_rel_path])
+
+        # Workers finish out of order; keep the scan order in the report
+        files_data = {f: results[f] for f in files if f in results}
+        total_complexity = sum(entry["complexity"] for entry in files_data.values())
             
         dependencies = self.dep_graph.build(files_data)
-        agent_opportunities = self._detect_agent_opportunities(files_data)
+        yield {"type": "dependencies", "dependencies": dependencies}
+
+        # Heuristics are per file, so concatenating per-file results in scan order
+        # gives the same list as running the detector over the whole repo
+        agent_opportunities = [opp for f in files_data for opp in file_opportunities[f]]
         
         # Detect languages
         detected_langs = set()
@@ -73,19 +89,86 @@ class Analyzer:
 
         report = {
             "repo": self.repo_name,
+            "commit": commit,
+            "analyzer_version": ANALYZER_VERSION,
             "summary": {
                 "files": len(files),
                 "languages": list(detected_langs), 
-                "total_complexity": total_complexity
+                "total_complexity": total_complexity,
+                "skipped_files": self.scanner.skipped
             },
             "files": files_data,
             "dependencies": dependencies,
             "agent_opportunities": agent_opportunities
         }
-        
-        
-        # self._save_report(report) # Responsibility moved to caller
-        return report
+        if previous_report is not None:
+            report["incremental"] = {
+                "base_commit": previous_report.get("commit"),
+                "reanalyzed": len(to_analyze),
+                "reused": len(files) - len(to_analyze)
+            }
+        self.report = report
+
+        yield {"type": "summary", "summary": report["summary"], "commit": commit, "incremental": report.get("incremental")}
+
+    @staticmethod
+    def _file_event(file_rel_path: str, entry: Dict[str, Any], opportunities: list) -> Dict[str, Any]:
+        return {
+            "type": "file",
+            "path": file_rel_path,
+            "ast": entry["ast"],
+            "complexity": entry["complexity"],
+            "opportunities": opportunities
+        }
+
+    @staticmethod
+    def report_events(report: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+        """
+        Replays a finished report as the same event sequence stream() produces.
+        """
+        files_data = report.get("files", {})
+        by_file = {}
+        for opp in report.get("agent_opportunities", []):
+            by_file.setdefault(opp.get("file_path"), []).append(opp)
+
+        yield {"type": "start", "repo": report.get("repo"), "commit": report.get("commit"), "files": report.get("summary", {}).get("files", len(files_data)), "to_analyze": 0}
+        for file_rel_path, entry in files_data.items():
+            yield Analyzer._file_event(file_rel_path, entry, by_file.get(file_rel_path, []))
+        yield {"type": "dependencies", "dependencies": report.get("dependencies", {})}
+        yield {"type": "summary", "summary": report.get("summary", {}), "commit": report.get("commit"), "incremental": report.get("incremental")}
+
+    def _reusable_entries(self, previous_report: Optional[Dict[str, Any]], files: List[str], blobs: Dict[str, str]) -> Dict[str, Any]:
+        if not previous_report or previous_report.get("analyzer_version") != ANALYZER_VERSION:
+            return {}
+        base_commit = previous_report.get("commit")
+        if not base_commit or not blobs:
+            return {}
+
+        # The diff is authoritative when the base commit is still in the checkout;
+        # the blob comparison below covers force-pushes and re-clones where it isn't.
+        diff = self.git_state.changed_files(base_commit)
+        changed = diff[0] if diff else set()
+
+        previous_files = previous_report.get("files", {})
+        reused = {}
+        for f in files:
+            entry = previous_files.get(f)
+            if entry is None or f in changed:
+                continue
+            blob = blobs.get(f)
+            if blob and entry.get("blob") == blob:
+                reused[f] = entry
+        return reused
+
+    def _analyze_files(self, sized_files: List[Tuple[str, int]]) -> Iterator[Tuple[str, Optional[Dict[str, Any]]]]:
+        # Process start-up isn't worth it for a handful of files
+        if self.workers == 0 or len(sized_files) < self.workers * 2:
+            for file_rel_path, _ in sized_files:
+                yield file_rel_path, self.file_analyzer.analyze(self.repo_path, file_rel_path)
+            return
+
+        runner = ParallelRunner(self.workers, self.file_time_budget, self.file_memory_budget)
+        yield from runner.run(self.repo_path, sized_files)
 
     def _detect_agent_opportunities(self, files_data: Dict[str, Any]) -> list:
         # returns list of dicts
@@ -0,0 +1,249 @@
+import os
+import json
+import sqlite3
+import threading
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+CATALOG_PATH = os.path.join("backend", "data", "catalog.db")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS reports (
+    uid TEXT NOT NULL,
+    report_id TEXT NOT NULL,
+    owner TEXT,
+    name TEXT,
+    commit_sha TEXT,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL,
+    PRIMARY KEY (uid, report_id)
+);
+CREATE INDEX IF NOT EXISTS reports_by_updated ON reports (uid, updated_at);
+CREATE INDEX IF NOT EXISTS reports_by_commit ON reports (owner, name, commit_sha);
+CREATE TABLE IF NOT EXISTS recommendations (
+    uid TEXT NOT NULL,
+    report_id TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL,
+    PRIMARY KEY (uid, report_id)
+);
+CREATE TABLE IF NOT EXISTS workflows (
+    uid TEXT NOT NULL,
+    workflow_id TEXT NOT NULL,
+    name TEXT,
+    summary TEXT,
+    created_at TEXT NOT NULL,
+    PRIMARY KEY (uid, workflow_id)
+);
+CREATE INDEX IF NOT EXISTS workflows_by_created ON workflows (uid, created_at);
+CREATE TABLE IF NOT EXISTS repos (
+    slug TEXT PRIMARY KEY,
+    owner TEXT NOT NULL,
+    name TEXT NOT NULL,
+    path TEXT NOT NULL,
+    cloned_at TEXT NOT NULL
+);
+"""
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+class Catalog:
+    """
+    Local SQLite index (WAL mode) of what lives on disk: user reports, repo
+    recommendations, workflow reports and repo checkouts. The files stay the source
+    of truth; the catalog answers listing and lookup without scanning directories.
+    It is filled from the existing files the first time it's opened.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.getenv("CATALOG_PATH", CATALOG_PATH)
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.RLock()
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            with self._lock:
+                if self._conn is None:
+                    os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                    conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+                    conn.row_factory = sqlite3.Row
+                    # WAL: readers don't block the writer (and vice versa) across workers
+                    conn.execute("PRAGMA journal_mode=WAL")
+                    conn.execute("PRAGMA synchronous=NORMAL")
+                    conn.execute("PRAGMA busy_timeout=5000")
+                    conn.executescript(_SCHEMA)
+                    self._conn = conn
+                    if self._get_meta("backfilled") is None:
+                        self._backfill()
+                        self._set_meta("backfilled", _now())
+        return self._conn
+
+    def _execute(self, sql: str, params: tuple = ()) -> List[sqlite3.Row]:
+        conn = self._db()
+        with self._lock:
+            return conn.execute(sql, params).fetchall()
+
+    def _get_meta(self, key: str) -> Optional[str]:
+        rows = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchall()
+        return rows[0]["value"] if rows else None
+
+    def _set_meta(self, key: str, value: str):
+        self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+
+    @staticmethod
+    def _page(sql: str, params: tuple, offset: int, limit: Optional[int]):
+        # LIMIT -1 is "no limit" in SQLite
+        return sql + " LIMIT ? OFFSET ?", params + (-1 if limit is None else limit, offset)
+
+    # --- Reports ---
+
+    def put_report(self, uid: str, report_id: str, owner: Optional[str], name: Optional[str],
+                   commit: Optional[str], updated_at: Optional[str] = None):
+        now = updated_at or _now()
+        self._execute(
+            "INSERT INTO reports (uid, report_id, owner, name, commit_sha, created_at, updated_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT (uid, report_id) DO UPDATE SET "
+            "owner = excluded.owner, name = excluded.name, commit_sha = excluded.commit_sha, updated_at = excluded.updated_at",
+            (uid, report_id, owner, name, commit, now, now)
+        )
+
+    def delete_report(self, uid: str, report_id: str):
+        self._execute("DELETE FROM reports WHERE uid = ? AND report_id = ?", (uid, report_id))
+
+    def list_reports(self, uid: str, offset: int = 0, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """The user's reports, most recently updated first."""
+        sql, params = self._page(
+            "SELECT report_id, owner, name, commit_sha, created_at, updated_at FROM reports "
+            "WHERE uid = ? ORDER BY updated_at DESC, report_id",
+            (uid,), offset, limit
+        )
+        return [dict(row) for row in self._execute(sql, params)]
+
+    # --- Recommendations ---
+
+    def put_recommendation(self, uid: str, report_id: str, updated_at: Optional[str] = None):
+        now = updated_at or _now()
+        self._execute(
+            "INSERT INTO recommendations (uid, report_id, created_at, updated_at) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT (uid, report_id) DO UPDATE SET updated_at = excluded.updated_at",
+            (uid, report_id, now, now)
+        )
+
+    def delete_recommendation(self, uid: str, report_id: str):
+        self._execute("DELETE FROM recommendations WHERE uid = ? AND report_id = ?", (uid, report_id))
+
+    def has_recommendation(self, uid: str, report_id: str) -> bool:
+        return bool(self._execute(
+            "SELECT 1 FROM recommendations WHERE uid = ? AND report_id = ?", (uid, report_id)
+        ))
+
+    # --- Workflows ---
+
+    def put_workflow(self, uid: str, workflow_id: str, name: Optional[str], summary: Optional[str],
+                     created_at: Optional[str] = None):
+        self._execute(
+            "INSERT OR REPLACE INTO workflows (uid, workflow_id, name, summary, created_at) VALUES (?, ?, ?, ?, ?)",
+            (uid, workflow_id, name, summary, created_at or _now())
+        )
+
+    def delete_workflow(self, uid: str, workflow_id: str):
+        self._execute("DELETE FROM workflows WHERE uid = ? AND workflow_id = ?", (uid, workflow_id))
+
+    def list_workflows(self, uid: str, offset: int = 0, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """The user's workflow reports, newest first."""
+        sql, params = self._page(
+            "SELECT workflow_id, name, summary, created_at FROM workflows "
+            "WHERE uid = ? ORDER BY created_at DESC, workflow_id",
+            (uid,), offset, limit
+        )
+        return [dict(row) for row in self._execute(sql, params)]
+
+    # --- Repo checkouts ---
+
+    def put_repo(self, owner: str, name: str, path: str):
+        self._execute(
+            "INSERT OR REPLACE INTO repos (slug, owner, name, path, cloned_at) VALUES (?, ?, ?, ?, ?)",
+            (f"{owner}-{name}", owner, name, path, _now())
+        )
+
+    def delete_repo(self, slug: str):
+        self._execute("DELETE FROM repos WHERE slug = ?", (slug,))
+
+    def find_repo(self, slug: str) -> Optional[str]:
+        rows = self._execute("SELECT path FROM repos WHERE slug = ?", (slug,))
+        return rows[0]["path"] if rows else None
+
+    # --- Backfill ---
+
+    def _backfill(self):
+        """Indexes whatever was written before the catalog existed."""
+        from backend.auth.user_manager import DATA_DIR
+
+        repos_root = os.path.join("backend", "repos")
+        if os.path.isdir(repos_root):
+            for owner in os.listdir(repos_root):
+                owner_dir = os.path.join(repos_root, owner)
+                if os.path.isdir(owner_dir):
+                    for name in os.listdir(owner_dir):
+                        if os.path.isdir(os.path.join(owner_dir, name)):
+                            self.put_repo(owner, name, os.path.join(owner_dir, name))
+
+        if not os.path.isdir(DATA_DIR):
+            return
+        for uid in os.listdir(DATA_DIR):
+            user_dir = os.path.join(DATA_DIR, uid)
+            if not os.path.isdir(user_dir):
+                continue
+            self._backfill_reports(uid, os.path.join(user_dir, "reports"))
+            for filename, path in self._json_files(os.path.join(user_dir, "modernization", "repo")):
+                self.put_recommendation(uid, filename, self._mtime(path))
+            for filename, path in self._json_files(os.path.join(user_dir, "modernization", "workflow")):
+                data = self._read_json(path) or {}
+                self.put_workflow(
+                    uid, data.get("id", filename), data.get("name", "Untitled Workflow"),
+                    data.get("workflow_summary", ""), data.get("created_at") or self._mtime(path)
+                )
+
+    def _backfill_reports(self, uid: str, report_dir: str):
+        if not os.path.isdir(report_dir):
+            return
+        for entry in os.listdir(report_dir):
+            report_id, ext = os.path.splitext(entry)
+            if ext not in (".json", ".report"):
+                continue
+            path = os.path.join(report_dir, entry)
+            owner = name = commit = None
+            ref = (self._read_json(path) or {}).get("shared_ref") if ext == ".json" else None
+            if ref:
+                owner, name, commit = ref.get("owner"), ref.get("name"), ref.get("commit")
+            self.put_report(uid, report_id, owner, name, commit, self._mtime(path))
+
+    @staticmethod
+    def _json_files(directory: str):
+        if not os.path.isdir(directory):
+            return []
+        return [
+            (filename[:-len(".json")], os.path.join(directory, filename))
+            for filename in os.listdir(directory) if filename.endswith(".json")
+        ]
+
+    @staticmethod
+    def _mtime(path: str) -> str:
+        return datetime.fromtimestamp(os.path.getmtime(path), timezone.utc).isoformat()
+
+    @staticmethod
+    def _read_json(path: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(path, 'r') as f:
+                data = json.load(f)
+            return data if isinstance(data, dict) else None
+        except (OSError, ValueError):
+            return None
+
+catalog = Catalog()
@@ -1,11 +1,274 @@
-from typing import Dict, Any
+import ast
+from typing import Dict, Any, Iterator, List, Optional, Tuple
 
-class CFGBuilder:
-    def build(self, content: str) -> Dict[str, Any]:
-        # MVP: Just return a placeholder structure indicating we processed it.
-        # Real CFG construction is complex.
+# One character per edge in the compact "kinds" string
+EDGE_NEXT = "n"      # fall-through / sequential
+EDGE_TRUE = "t"      # branch taken (if body, loop body, match case)
+EDGE_FALSE = "f"     # branch not taken / loop exit
+EDGE_LOOP = "l"      # back edge to the loop header
+EDGE_BREAK = "b"
+EDGE_CONTINUE = "c"
+EDGE_RETURN = "r"
+EDGE_RAISE = "x"     # raise, or the implicit "may raise" edge into except handlers
+
+ENTRY, EXIT = 0, 1
+
+class _FunctionCFG:
+    """
+    Basic blocks of one function. Block 0 is the entry, block 1 the exit; both are
+    virtual (no lines). A block's lines are tracked as a [first, last] range.
+    """
+
+    def __init__(self):
+        self.lines: List[List[int]] = [[0, 0], [0, 0]]
+        self.edges: List[Tuple[int, int, str]] = []
+        self.has_predecessor = set()
+        # (header, after) of enclosing loops, innermost last
+        self.loops: List[Tuple[int, int]] = []
+        # handler entry blocks of enclosing try statements, innermost last
+        self.handlers: List[List[int]] = []
+
+    def new_block(self) -> int:
+        self.lines.append([0, 0])
+        return len(self.lines) - 1
+
+    def add_edge(self, src: int, dst: int, kind: str = EDGE_NEXT):
+        self.edges.append((src, dst, kind))
+        self.has_predecessor.add(dst)
+
+    def add_lines(self, block: int, first: int, last: int):
+        span = self.lines[block]
+        if span[0] == 0:
+            span[0], span[1] = first, last
+        else:
+            span[0] = min(span[0], first)
+            span[1] = max(span[1], last)
+
+    def compact(self) -> Dict[str, Any]:
+        """
+        Drops unreachable blocks and renumbers the rest. Output is flat integer
+        arrays: blocks = [first0, last0, first1, last1, ...], edges = [src0, dst0, ...],
+        kinds = one character per edge.
+        """
+        successors: Dict[int, List[int]] = {}
+        for src, dst, _ in self.edges:
+            successors.setdefault(src, []).append(dst)
+        reachable = {ENTRY}
+        stack = [ENTRY]
+        while stack:
+            for nxt in successors.get(stack.pop(), []):
+                if nxt not in reachable:
+                    reachable.add(nxt)
+                    stack.append(nxt)
+
+        index = {}
+        blocks: List[int] = []
+        for block, span in enumerate(self.lines):
+            if block in reachable:
+                index[block] = len(index)
+                blocks.extend(span)
+
+        edges: List[int] = []
+        kinds = []
+        for src, dst, kind in self.edges:
+            if src in reachable:
+                edges.extend((index[src], index[dst]))
+                kinds.append(kind)
+
+        n_nodes = len(index)
+        n_edges = len(kinds)
         return {
-            "nodes": [],
-            "edges": [],
-            "message": "CFG construction not fully implemented in MVP"
+            "blocks": blocks,
+            "edges": edges,
+            "kinds": "".join(kinds),
+            # McCabe: E - N + 2P, one connected component per function
+            "complexity": n_edges - n_nodes + 2
         }
+
+class CFGBuilder:
+    """
+    Builds per-function control-flow graphs for Python from an existing AST.
+    """
+
+    def build(self, content: str, tree: Optional[ast.AST] = None) -> Dict[str, Any]:
+        if tree is None:
+            try:
+                tree = ast.parse(content)
+            except SyntaxError:
+                return {"functions": []}
+
+        functions = []
+        for node in self._iter_functions(tree.body):
+            cfg = self._build_function(node)
+            cfg["name"] = node.name
+            cfg["lineno"] = node.lineno
+            functions.append(cfg)
+        return {"functions": functions}
+
+    def _iter_functions(self, body: List[ast.stmt]) -> Iterator[ast.AST]:
+        # Definitions can only appear in statement lists, so there's no need
+        # to walk expressions (the bulk of the tree) to find them
+        for stmt in body:
+            if isinstance(stmt, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                yield stmt
+            for child_body in self._child_bodies(stmt):
+                yield from self._iter_functions(child_body)
+
+    def _child_bodies(self, stmt: ast.stmt) -> Iterator[List[ast.stmt]]:
+        for field in ("body", "orelse", "finalbody"):
+            value = getattr(stmt, field, None)
+            if isinstance(value, list):
+                yield value
+        for handler in getattr(stmt, "handlers", []):
+            yield handler.body
+        for case in getattr(stmt, "cases", []):
+            yield case.body
+
+    def _build_function(self, node) -> Dict[str, Any]:
+        cfg = _FunctionCFG()
+        start = cfg.new_block()
+        cfg.add_edge(ENTRY, start)
+        end = self._visit_body(cfg, node.body, start)
+        if end is not None:
+            cfg.add_edge(end, EXIT)
+        return cfg.compact()
+
+    def _visit_body(self, cfg: _FunctionCFG, body: List[ast.stmt], current: Optional[int]) -> Optional[int]:
+        """
+        Appends statements to the graph starting in `current`. Returns the block
+        control falls out of, or None if every path left (return/raise/break/continue).
+        """
+        for stmt in body:
+            if current is None:
+                # Dead code after a jump: gets its own block, pruned as unreachable
+                current = cfg.new_block()
+            current = self._visit_stmt(cfg, stmt, current)
+        return current
+
+    def _visit_stmt(self, cfg: _FunctionCFG, stmt: ast.stmt, current: int) -> Optional[int]:
+        if isinstance(stmt, ast.If):
+            cfg.add_lines(current, stmt.lineno, stmt.lineno)
+            return self._visit_branches(cfg, current, [stmt.body], stmt.orelse or None)
+
+        if isinstance(stmt, (ast.For, ast.AsyncFor, ast.While)):
+            return self._visit_loop(cfg, stmt, current)
+
+        if isinstance(stmt, (ast.Try,) + ((ast.TryStar,) if hasattr(ast, "TryStar") else ())):
+            return self._visit_try(cfg, stmt, current)
+
+        if isinstance(stmt, (ast.With, ast.AsyncWith)):
+            cfg.add_lines(current, stmt.lineno, stmt.lineno)
+            return self._visit_body(cfg, stmt.body, current)
+
+        if hasattr(ast, "Match") and isinstance(stmt, ast.Match):
+            cfg.add_lines(current, stmt.lineno, stmt.lineno)
+            last = stmt.cases[-1] if stmt.cases else None
+            exhaustive = (
+                last is not None and last.guard is None
+                and isinstance(last.pattern, ast.MatchAs) and last.pattern.pattern is None
+            )
+            return self._visit_branches(cfg, current, [case.body for case in stmt.cases], None, exhaustive)
+
+        cfg.add_lines(current, stmt.lineno, getattr(stmt, "end_lineno", stmt.lineno) or stmt.lineno)
+
+        if isinstance(stmt, ast.Return):
+            cfg.add_edge(current, EXIT, EDGE_RETURN)
+            return None
+        if isinstance(stmt, ast.Raise):
+            targets = cfg.handlers[-1] if cfg.handlers else [EXIT]
+            for target in targets:
+                cfg.add_edge(current, target, EDGE_RAISE)
+            return None
+        if isinstance(stmt, ast.Break) and cfg.loops:
+            cfg.add_edge(current, cfg.loops[-1][1], EDGE_BREAK)
+            return None
+        if isinstance(stmt, ast.Continue) and cfg.loops:
+            cfg.add_edge(current, cfg.loops[-1][0], EDGE_CONTINUE)
+            return None
+        return current
+
+    def _visit_branches(self, cfg: _FunctionCFG, current: int, bodies: List[List[ast.stmt]],
+                        orelse: Optional[List[ast.stmt]], exhaustive: bool = False) -> Optional[int]:
+        join = cfg.new_block()
+        for body in bodies:
+            branch = cfg.new_block()
+            cfg.add_edge(current, branch, EDGE_TRUE)
+            end = self._visit_body(cfg, body, branch)
+            if end is not None:
+                cfg.add_edge(end, join)
+        if orelse:
+            branch = cfg.new_block()
+            cfg.add_edge(current, branch, EDGE_FALSE)
+            end = self._visit_body(cfg, orelse, branch)
+            if end is not None:
+                cfg.add_edge(end, join)
+        elif not exhaustive:
+            cfg.add_edge(current, join, EDGE_FALSE)
+        return join if join in cfg.has_predecessor else None
+
+    def _visit_loop(self, cfg: _FunctionCFG, stmt, current: int) -> Optional[int]:
+        header = cfg.new_block()
+        cfg.add_edge(current, header)
+        cfg.add_lines(header, stmt.lineno, stmt.lineno)
+        after = cfg.new_block()
+
+        body = cfg.new_block()
+        cfg.add_edge(header, body, EDGE_TRUE)
+        cfg.loops.append((header, after))
+        end = self._visit_body(cfg, stmt.body, body)
+        cfg.loops.pop()
+        if end is not None:
+            cfg.add_edge(end, header, EDGE_LOOP)
+
+        # `while True:` only exits through break/return/raise
+        infinite = isinstance(stmt, ast.While) and isinstance(stmt.test, ast.Constant) and bool(stmt.test.value)
+        if not infinite:
+            if stmt.orelse:
+                orelse = cfg.new_block()
+                cfg.add_edge(header, orelse, EDGE_FALSE)
+                end = self._visit_body(cfg, stmt.orelse, orelse)
+                if end is not None:
+                    cfg.add_edge(end, after)
+            else:
+                cfg.add_edge(header, after, EDGE_FALSE)
+        return after if after in cfg.has_predecessor else None
+
+    def _visit_try(self, cfg: _FunctionCFG, stmt, current: int) -> Optional[int]:
+        cfg.add_lines(current, stmt.lineno, stmt.lineno)
+        handler_blocks = [cfg.new_block() for _ in stmt.handlers]
+
+        body = cfg.new_block()
+        cfg.add_edge(current, body)
+        # Any statement in the body may raise: one edge from the body's entry per handler
+        for handler_block in handler_blocks:
+            cfg.add_edge(body, handler_block, EDGE_RAISE)
+        if handler_blocks:
+            cfg.handlers.append(handler_blocks)
+        end = self._visit_body(cfg, stmt.body, body)
+        if handler_blocks:
+            cfg.handlers.pop()
+        if end is not None and stmt.orelse:
+            end = self._visit_body(cfg, stmt.orelse, end)
+
+        ends = [end] if end is not None else []
+        for handler, handler_block in zip(stmt.handlers, handler_blocks):
+            cfg.add_lines(handler_block, handler.lineno, handler.lineno)
+            handler_end = self._visit_body(cfg, handler.body, handler_block)
+            if handler_end is not None:
+                ends.append(handler_end)
+
+        if not ends and not stmt.finalbody:
+            return None
+        join = cfg.new_block()
+        for block in ends:
+            cfg.add_edge(block, join)
+        if not stmt.finalbody:
+            return join
+        if ends:
+            return self._visit_body(cfg, stmt.finalbody, join)
+        # Every path returned or raised: finally runs on the way out, then leaves too
+        cfg.add_edge(body, join, EDGE_RAISE)
+        end = self._visit_body(cfg, stmt.finalbody, join)
+        if end is not None:
+            cfg.add_edge(end, EXIT, EDGE_RAISE)
+        return None
@@ -0,0 +1,445 @@
+import re
+import string
+from bisect import bisect_left
+from collections import Counter
+from itertools import accumulate
+from typing import Dict, Any, List, Optional, Tuple
+
+# Strings, comments and regex literals, blanked out before the tokenizer runs so
+# that braces, parentheses and keywords inside them don't count. Newlines are
+# kept, so line numbers stay valid. A "/" starts a regex literal where an
+# expression starts: after an operator or opening bracket, after "return", or
+# first on its line; anywhere else it divides. Unpaired quotes (an apostrophe in
+# JSX text) aren't matched and stay in the code. The bodies are unrolled (runs of
+# plain characters taken whole, possessively) so the engine doesn't backtrack
+# character by character.
+# Lookbehinds must have a fixed width: one per indentation, up to 16 characters.
+_REGEX_START = '|'.join(
+    [r'(?<=[(,=:\[!&|?{};]/)', r'(?<=[(,=:\[!&|?{};][ \t]/)', r'(?<=\breturn/)', r'(?<=\breturn[ \t]/)']
+    + [r'(?<=^[ \t]{%d}/)' % indent for indent in range(17)]
+)
+_REGEX_BODY = r'[^/\\\[\n]*+(?:(?:\\.|\[[^\]\\\n]*+(?:\\.[^\]\\\n]*+)*+\])[^/\\\[\n]*+)*+/[A-Za-z]*'
+_MASK_RE = re.compile(
+    r'(//[^\n]*|/\*[^*]*+\*++(?:[^/*][^*]*+\*++)*+/'
+    r'|/(?![*/>])(?:' + _REGEX_START + ')' + _REGEX_BODY +
+    r'|"""(?:\\.|[^\\])*?"""|"[^"\\\n]*+(?:\\.[^"\\\n]*+)*+"'
+    r'|\'[^\'\\\n]*+(?:\\.[^\'\\\n]*+)*+\'|`[^`\\]*+(?:\\.[^`\\]*+)*+`)',
+    re.DOTALL | re.MULTILINE
+)
+# Module specifiers: from "x", import "x", require("x"), import(/* hint */ "x").
+# The quote must open one of the strings the mask found.
+_SPECIFIER_RES = [re.compile(pattern) for pattern in (
+    r'from(?<![\w$.]from)\s*(?=["\'`])',
+    r'import(?<![\w$.]import)\s*(?:\(\s*(?:/\*[^*]*+\*++(?:[^/*][^*]*+\*++)*+/\s*)?)?(?=["\'`])',
+    r'require(?<![\w$.]require)\s*\(\s*(?:/\*[^*]*+\*++(?:[^/*][^*]*+\*++)*+/\s*)?(?=["\'`])'
+)]
+
+_GO_IMPORT_RE = re.compile(r'(?<![\w$.])import\s*(?:\(([^)]*)\)|(?:[\w.]+[ \t]+)?"([^"\n]*)")')
+_GO_IMPORT_PATH_RE = re.compile(r'"([^"\n]*)"|`([^`]*)`')
+_JAVA_IMPORT_RE = re.compile(r'(?<![\w$.])import\s+(?:static\s+)?([\w.]+\*?)\s*;')
+
+def _keyword(word: str) -> str:
+    # The boundaries are checked after the word: every alternative of a token
+    # pattern has to start with a literal for sre to skip ahead to the next
+    # candidate character instead of trying each position
+    return word + r'(?<![\w$.]' + word + r')(?![\w$])'
+
+# What the tokenizer stops at: brackets, arrows, decision points and the
+# keywords that open a class. Everything else (names, operators, plain
+# statements) is skipped by the regex engine. "??" counts once, at its
+# second "?".
+_TOKEN_RE = re.compile('|'.join(
+    [r'\{', r'\}', r'\(', r'\)', r'=>', r'&&', r'\|\|', r'\?(?![.:?])']
+    + [_keyword(word) for word in ("case", "class", "interface", "enum")]
+))
+# Go: no arrows or ternary, conditions without parentheses ("if err != nil {",
+# "for {"), "type X struct {"
+_GO_TOKEN_RE = re.compile('|'.join(
+    [r'\{', r'\}', r'\(', r'\)', r'&&', r'\|\|']
+    + [_keyword(word) for word in ("if", "for", "case", "type")]
+))
+# Names before "(" that count as decision points (JS/TS, Java)
+_DECISION_CALLS = {"if": "if", "for": "for", "while": "while", "catch": None}
+
+# The header may span lines; its generics may hold object types (Foo<{a: B}>)
+_CLASS_RE = re.compile(
+    r'(?:class|interface|enum)\s+([A-Za-z_$][\w$]*)'
+    r'(?:[^{};()=\[\]<]++|<(?:[^<>;]++|<[^<>;]*+>)*+>)*+\{'
+)
+_GO_TYPE_RE = re.compile(r'type\s+([A-Za-z_]\w*)\s+(?:struct|interface)\s*\{')
+
+# Between a definition's parameter list and the "{" of its body:
+#   JS/TS  [: return type]
+#   Java   [throws X, Y]
+#   Go     [result type | (results) | func(...) result]
+_JS_RESULT_RE = re.compile(r'\s*(?::[^{};=()]*+)?')
+_JAVA_RESULT_RE = re.compile(r'\s*(?:throws\s+[\w.,\s]+)?')
+_GO_RESULT_RE = re.compile(r'\s*(?:\([^()]*\)|func\s*\([^()]*\)[\w.*\[\] \t]*|[\w.*\[\] \t]*)\s*')
+# What precedes the name of a Go function: func, maybe with a receiver
+_GO_FUNC_HEAD_RE = re.compile(r'\s*func\s*(?:\([^()]*\)\s*)?')
+# Between an arrow's parameters and "=>": [: return type]
+_ARROW_RESULT_RE = re.compile(r'\s*(?::[^=;{}()\n]*)?')
+# name [: Type] = [async]   (Go: name :=), right before the parameters of an
+# arrow or function expression (or their generic arguments)
+_ASSIGNED_RE = re.compile(r'([A-Za-z_$][\w$]*+)\s*+(?::[^=;{}()\n]*+)?=\s*+(async\s*+)?$')
+_ASYNC_RE = re.compile(r'(?<![\w$])async\s*(?:function\s*)?\*?\s*$')
+_SPACE_RE = re.compile(r'\s*')
+# Where an expression-bodied arrow ends: ";" or "=" at its own depth, or the
+# bracket closing around it
+_EXPRESSION_END_RE = re.compile(r'[()\[\]{};]|(?<!=)=(?![=>])')
+_NAME_CHARS = string.ascii_letters + string.digits + "_$"
+# How far back from a "(" its name is looked for, and with generic arguments
+_NAME_WINDOW = 64
+_GENERICS_WINDOW = 1024
+_ASSIGNED_WINDOW = 120
+
+# Names before "(" that are keywords, not calls or definitions
+_KEYWORDS = {
+    "if", "for", "while", "switch", "catch", "function", "func", "return", "typeof", "await",
+    "import", "require", "async", "void", "delete", "in", "of", "instanceof", "else", "do",
+    "try", "case", "throw", "yield", "go", "defer", "select", "new", "class", "synchronized",
+    "with", "super", "this"
+}
+# Words that, right before a name, make "name(...) {" a condition rather than a
+# definition (Go: if ok(x) {, for _, f := range files(dir) {) or mark a
+# constructor call (Java: new Runnable() {)
+_BLOCKING_WORDS = {
+    "if", "for", "while", "switch", "select", "case", "return", "go", "defer", "throw", "else",
+    "new", "await", "range"
+}
+# What may come right before a method or function name in JS/TS: a statement or
+# member boundary (object literal methods follow a ","), a generator's "*", a
+# private name's "#", a decorator's ")", or a word (function, async, static, a
+# modifier). Java adds return types ending in ">" or "]".
+_JS_DEF_AFTER = set("{};,*#)" + _NAME_CHARS)
+_JAVA_DEF_AFTER = _JS_DEF_AFTER | set(">]")
+
+class CLikeScanner:
+    """
+    Scanner for brace languages (JS/TS, Go, Java). Blanks out strings, comments
+    and regex literals, then walks the code once, token by token, keeping a stack
+    of open braces to find real function and class spans. Along the way it counts
+    decision points for cyclomatic complexity (per function and per file) and
+    collects call names; imports come from the masked strings. Output matches the
+    Python visitor's shape.
+    """
+
+    def scan(self, content: str, file_path: str) -> Dict[str, Any]:
+        is_go = file_path.endswith('.go')
+        is_java = file_path.endswith('.java')
+
+        code, imports = self._mask(content, specifiers=not (is_go or is_java))
+        size = len(code)
+        count = code.count
+
+        functions: List[Dict[str, Any]] = []
+        classes: List[Dict[str, Any]] = []
+        calls = Counter()
+        control = {"if": 0, "for": 0, "while": 0}
+        decisions = 0
+        # One entry per open "{": the function or class it opened, or None
+        blocks: List[Optional[Dict[str, Any]]] = []
+        # Functions whose body is open, innermost last, with where the body ends:
+        # known for expression-bodied arrows, past the end until a "}" closes it
+        # for the others
+        open_functions: List[list] = []
+        # Records whose header has been read, waiting for the "{" at that offset
+        pending: Dict[int, Dict[str, Any]] = {}
+        # Open parentheses as (name before it, where the name starts, offset),
+        # and the last two groups closed, with their ")" offset added: a
+        # definition's parameter list ends one of them
+        parens: List[Tuple[Optional[str], int, int]] = []
+        closed = previous = None
+        line = 1
+        cursor = 0
+
+        def charge(pos: int):
+            while open_functions and open_functions[-1][1] <= pos:
+                open_functions.pop()
+            if open_functions:
+                open_functions[-1][0]["complexity"] += 1
+
+        name_before = self._name_before
+        for m in (_GO_TOKEN_RE if is_go else _TOKEN_RE).finditer(code):
+            tok = m[0]
+            pos = m.start()
+            if tok == "{":
+                record = pending.pop(pos, None)
+                if record is None and closed is not None:
+                    record = self._definition(code, pos, (closed, previous) if is_go else (closed,),
+                                              is_go, is_java)
+                    if record is not None:
+                        line += count('\n', cursor, pos)
+                        cursor = pos
+                        record["lineno"] = line - count('\n', record.pop("start"), pos)
+                        functions.append(record)
+                        if record.pop("named"):
+                            calls[record["name"]] -= 1
+                if record is not None and "complexity" in record:
+                    open_functions.append([record, size + 1])
+                blocks.append(record)
+                # A header never spans a brace: groups before it are done with
+                closed = previous = None
+            elif tok == "}":
+                record = blocks.pop() if blocks else None
+                if record is not None:
+                    line += count('\n', cursor, pos)
+                    cursor = pos
+                    record["end_lineno"] = line
+                    if "complexity" in record:
+                        while open_functions and open_functions.pop()[0] is not record:
+                            pass
+                closed = previous = None
+            elif tok == "(":
+                name, start = name_before(code, pos)
+                if name is not None:
+                    calls[name] += 1
+                    if name in _DECISION_CALLS and not is_go:
+                        decisions += 1
+                        if _DECISION_CALLS[name]:
+                            control[name] += 1
+                        charge(start)
+                parens.append((name, start, pos))
+            elif tok == ")":
+                if parens:
+                    previous = closed
+                    closed = (*parens.pop(), pos)
+            elif tok == "=>":
+                record = self._arrow(code, pos, closed)
+                if record is None:
+                    continue
+                line += count('\n', cursor, pos)
+                cursor = pos
+                record["lineno"] = line - count('\n', record.pop("start"), pos)
+                functions.append(record)
+                body = _SPACE_RE.match(code, pos + 2).end()
+                if body < size and code[body] == "{":
+                    pending[body] = record
+                else:
+                    # "=> expr": the function ends with its statement
+                    end, end_line_at = self._expression_end(code, pos + 2)
+                    record["end_lineno"] = line + count('\n', pos, end_line_at)
+                    open_functions.append([record, end])
+            elif tok in ("class", "interface", "enum", "type"):
+                header = (_GO_TYPE_RE if is_go else _CLASS_RE).match(code, pos)
+                if header is None:
+                    continue
+                line += count('\n', cursor, pos)
+                cursor = pos
+                record = {"name": header.group(1), "lineno": line + count('\n', pos, header.start(1))}
+                classes.append(record)
+                pending[header.end() - 1] = record
+            else:
+                # if/for (Go), case, &&, ||, ?
+                decisions += 1
+                if tok in control:
+                    control[tok] += 1
+                charge(pos)
+
+        if is_go and "import" in content:
+            for match in _GO_IMPORT_RE.finditer(content):
+                if match.group(1) is None:
+                    imports.append(match.group(2))
+                else:
+                    imports.extend(path.group(1) or path.group(2) or ""
+                                   for path in _GO_IMPORT_PATH_RE.finditer(match.group(1)))
+        elif is_java and "import" in code:
+            imports.extend(match.group(1) for match in _JAVA_IMPORT_RE.finditer(code))
+
+        # Unbalanced braces (or a file cut short): close whatever is still open
+        total_lines = count('\n') + 1
+        for record in functions:
+            record.setdefault("end_lineno", total_lines)
+        for record in classes:
+            record.setdefault("end_lineno", total_lines)
+
+        return {
+            "classes": classes,
+            "functions": functions,
+            "imports": list(dict.fromkeys(imports)),
+            "calls": [name for name, n in calls.items()
+                      if n > 0 and name not in _KEYWORDS and not name[0].isdigit()],
+            "control_structures": control,
+            "complexity": 1 + decisions
+        }
+
+    @staticmethod
+    def _mask(content: str, specifiers: bool) -> Tuple[str, List[str]]:
+        """
+        content with comments removed and strings and regex literals emptied
+        (newlines kept), and, with specifiers, the strings that are module
+        specifiers (import/require).
+        """
+        # Odd items are the strings, comments and regex literals, even items the
+        # code between them
+        parts = _MASK_RE.split(content)
+        imports = []
+        if specifiers and len(parts) > 1:
+            ends = list(accumulate(map(len, parts))) # ends[i]: where parts[i + 1] starts
+            found = sorted(m.end() for pattern in _SPECIFIER_RES for m in pattern.finditer(content))
+            for pos in found:
+                i = bisect_left(ends, pos)
+                if i < len(ends) and ends[i] == pos and i % 2 == 0 and parts[i + 1][0] in "\"'`":
+                    text = parts[i + 1]
+                    quote = 3 if text.startswith('"""') else 1
+                    imports.append(text[quote:-quote])
+        parts[1::2] = [
+            ('\n' * text.count('\n') or ' ') if text[:2] in ("//", "/*")
+            else '""' if '\n' not in text else '"' + '\n' * text.count('\n') + '"'
+            for text in parts[1::2]
+        ]
+        return "".join(parts), imports
+
+    @staticmethod
+    def _name_before(code: str, pos: int) -> Tuple[Optional[str], int]:
+        """
+        The name right before offset pos, whitespace and generic arguments
+        (foo<T>() skipped, and the offset it starts at; (None, pos) if there is
+        none.
+        """
+        window = pos - _NAME_WINDOW if pos > _NAME_WINDOW else 0
+        head = code[window:pos].rstrip()
+        if head[-1:] == ">" and head[-2:-1] != "=":
+            opening = CLikeScanner._generics_start(code, pos)
+            if opening is None:
+                return None, pos
+            window = opening - _NAME_WINDOW if opening > _NAME_WINDOW else 0
+            head = code[window:opening].rstrip()
+        start = len(head.rstrip(_NAME_CHARS))
+        if start == len(head) or (not start and window):
+            return None, pos # no name, or longer than the window
+        return head[start:], window + start
+
+    @staticmethod
+    def _generics_start(code: str, pos: int) -> Optional[int]:
+        """
+        Where the generic argument list ending right before pos (whitespace
+        skipped) opens: the offset of its "<". None if the ">" there closes
+        none, as in a > (b).
+        """
+        window = pos - _GENERICS_WINDOW if pos > _GENERICS_WINDOW else 0
+        head = code[window:pos].rstrip()
+        # Defaults, constraints and object types (<T extends {a: B} = C>) sit
+        # inside; brackets stay balanced, and an arrow's ">" isn't a closing one
+        angles = brackets = 0
+        for i in range(len(head) - 1, -1, -1):
+            c = head[i]
+            if c == ">":
+                if head[i - 1:i] != "=":
+                    angles += 1
+            elif c == "<":
+                angles -= 1
+                if not angles:
+                    return window + i
+            elif c in ")]}":
+                brackets += 1
+            elif c in "([{":
+                brackets -= 1
+                if brackets < 0:
+                    return None
+            elif c == ";":
+                return None
+        return None
+
+    def _definition(self, code: str, pos: int, groups: tuple, is_go: bool,
+                    is_java: bool) -> Optional[Dict[str, Any]]:
+        """
+        The function whose body the "{" at pos opens, if the parameter list of
+        one of groups (the last parenthesized groups closed, latest first) starts
+        its header: name, "start" (offset of the name) and "named" (declared by
+        name, not assigned).
+        """
+        result_re = _GO_RESULT_RE if is_go else _JAVA_RESULT_RE if is_java else _JS_RESULT_RE
+        for group in groups:
+            if group is None:
+                return None
+            name, start, _, close = group
+            if name is None or not result_re.fullmatch(code, close + 1, pos):
+                continue # Go: results "(int, error)" or "func() error" after the parameters
+            if name == "function" or name == "func":
+                # name = function (...) {, name := func(...) {
+                record = self._assigned(code, start)
+                if record is not None:
+                    return record
+                continue
+            if name in _KEYWORDS or name[0].isdigit():
+                return None
+            before = self._name_before(code, start)[0]
+            if before in _BLOCKING_WORDS:
+                return None # a condition or a constructor call
+            if is_go:
+                line_start = code.rfind('\n', 0, start) + 1
+                if not _GO_FUNC_HEAD_RE.fullmatch(code, line_start, start):
+                    return None
+            else:
+                prev = code[max(0, start - _NAME_WINDOW):start].rstrip()[-1:]
+                if before is None and prev and prev not in (_JAVA_DEF_AFTER if is_java else _JS_DEF_AFTER):
+                    return None # a call inside an expression: x = f(a) {, a ? f(b) {
+            record = {"name": name, "start": start, "named": True, "complexity": 1}
+            if not is_go and _ASYNC_RE.search(code, max(0, start - 32), start):
+                record["async"] = True
+            return record
+        return None
+
+    def _arrow(self, code: str, pos: int, closed: Optional[tuple]) -> Optional[Dict[str, Any]]:
+        """
+        The function the "=>" at pos defines, if it is assigned to a name:
+        name [: Type] = [async] (params) [: Type] =>  or  name = [async] param =>
+        """
+        if closed is not None and _ARROW_RESULT_RE.fullmatch(code, closed[3] + 1, pos):
+            params = closed[2]
+            head = code[params - _NAME_WINDOW if params > _NAME_WINDOW else 0:params]
+            if head.rstrip()[-1:] == ">":
+                # name = <T>(a: T) => ...
+                params = self._generics_start(code, params)
+                if params is None:
+                    return None
+        else:
+            name, params = self._name_before(code, pos)
+            if name is None:
+                return None
+        record = self._assigned(code, params)
+        if record is None:
+            return None
+        del record["named"]
+        return record
+
+    def _assigned(self, code: str, pos: int) -> Optional[Dict[str, Any]]:
+        """The function defined by assigning what starts at pos, named after its variable."""
+        # Searched from the start of the line (the one before, for parameters
+        # that start a line: const f =\n  (a) => ...)
+        line_start = code.rfind('\n', 0, pos) + 1
+        if line_start and not code[line_start:pos].strip():
+            line_start = code.rfind('\n', 0, line_start - 1) + 1
+        assign = _ASSIGNED_RE.search(code, max(line_start, pos - _ASSIGNED_WINDOW), pos)
+        if assign is None:
+            return None
+        name = assign.group(1)
+        if name in _KEYWORDS or name[0].isdigit() or self._name_before(code, assign.start())[0] == "type":
+            return None # type Handler = (e: Event) => void
+        record = {"name": name, "start": assign.start(), "named": False, "complexity": 1}
+        if assign.group(2):
+            record["async"] = True
+        return record
+
+    @staticmethod
+    def _expression_end(code: str, start: int) -> Tuple[int, int]:
+        """
+        Where the expression body starting at start ends, and the offset whose
+        line is its last line.
+        """
+        depth = 0
+        last = start
+        for m in _EXPRESSION_END_RE.finditer(code, start):
+            tok = m.group()
+            if tok in "([{":
+                depth += 1
+            elif tok in ")]}":
+                if not depth:
+                    return m.start(), m.start()
+                depth -= 1
+            elif not depth:
+                # ";" ends on its line; "=" starts the next statement
+                return m.start(), (m.start() if tok == ";" else last)
+            last = m.end()
+        return len(code), len(code)
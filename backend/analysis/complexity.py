@@ -1,7 +1,11 @@
 import ast
+from typing import Dict, Any, Optional
 
 class ComplexityCalculator:
-    def calculate(self, content: str) -> int:
+    def calculate(self, content: str, ast_data: Optional[Dict[str, Any]] = None) -> int:
+        # The Python visitor and the C-like scanner already counted decision points in their single pass
+        if ast_data and ast_data.get("complexity") is not None:
+            return ast_data["complexity"]
         try:
             tree = ast.parse(content)
             complexity = 1
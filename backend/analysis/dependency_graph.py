@@ -1,12 +1,406 @@
-from typing import Dict, List, Any
+import os
+import re
+import json
+import posixpath
+from typing import Dict, List, Any, Optional, Tuple
 
-class DependencyGraph:
+JS_EXTENSIONS = ('.ts', '.tsx', '.js', '.jsx')
+PYTHON_EXTENSION = '.py'
+
+# Number of most-imported files whose transitive dependents are counted
+TOP_HUBS = 20
+
+# tsconfig.json is JSONC: comments and trailing commas are allowed
+_JSONC_TOKEN_RE = re.compile(r'"(?:\\.|[^"\\])*"|//[^\n]*|/\*.*?\*/', re.DOTALL)
+_TRAILING_COMMA_RE = re.compile(r',(\s*[}\]])')
+
+def _load_jsonc(path: str) -> Optional[Dict[str, Any]]:
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            text = f.read()
+    except (OSError, UnicodeDecodeError):
+        return None
+    # Drop comments but keep strings (a "//" inside a path is not a comment)
+    text = _JSONC_TOKEN_RE.sub(lambda m: m.group(0) if m.group(0).startswith('"') else '', text)
+    text = _TRAILING_COMMA_RE.sub(r'\1', text)
+    try:
+        data = json.loads(text)
+    except ValueError:
+        return None
+    return data if isinstance(data, dict) else None
+
+class _Interner:
     def __init__(self):
-        self.graph = {}
-
-    def build(self, files_data: Dict[str, Any]) -> Dict[str, List[str]]:
-        # files_data is { "file_path": { "imports": [...] } }
-        for file, data in files_data.items():
-            imports = data.get("ast", {}).get("imports", [])
-            self.graph[file] = imports
-        return self.graph
+        self.ids: Dict[str, int] = {}
+        self.names: List[str] = []
+
+    def intern(self, name: str) -> int:
+        node_id = self.ids.get(name)
+        if node_id is None:
+            node_id = len(self.names)
+            self.ids[name] = node_id
+            self.names.append(name)
+        return node_id
+
+class DependencyGraph:
+    """
+    Resolves each file's imports to files inside the repo and builds a file-level
+    dependency graph. Imports that don't resolve to a repo file are external
+    packages and are kept apart from the internal edges.
+
+    The report stores the graph with interned integer ids in CSR form: node i's
+    dependencies are targets[offsets[i]:offsets[i + 1]]. Cycles (strongly connected
+    components) and fan-in/fan-out are computed in O(V + E); transitive dependents
+    take one reverse BFS each, so they are only counted for the top hubs.
+    """
+
+    def __init__(self, repo_path: Optional[str] = None):
+        self.repo_path = repo_path
+
+    def build(self, files_data: Dict[str, Any]) -> Dict[str, Any]:
+        # files_data is { "file_path": { "ast": { "imports": [...] } } }
+        # All state is local: building twice never leaks edges between runs.
+        paths = {f: f.replace(os.sep, '/') for f in files_data}
+        nodes = _Interner()
+        for f in files_data:
+            nodes.intern(paths[f])
+        resolver = _ImportResolver(set(nodes.ids), self._load_ts_paths())
+
+        externals = _Interner()
+        internal_edges: List[List[int]] = [[] for _ in nodes.names]
+        external_edges: List[List[int]] = [[] for _ in nodes.names]
+        unresolved = 0
+        for f, data in files_data.items():
+            source = nodes.ids[paths[f]]
+            ast_data = data.get("ast", {})
+            imported_names = ast_data.get("imported_names") or {}
+            for spec in ast_data.get("imports", []):
+                targets, external = resolver.resolve(paths[f], spec, imported_names.get(spec, ()))
+                for target in targets:
+                    if target != paths[f]:
+                        internal_edges[source].append(nodes.ids[target])
+                if external:
+                    external_edges[source].append(externals.intern(external))
+                elif not targets:
+                    unresolved += 1
+
+        offsets, targets = self._to_csr(internal_edges)
+        ext_offsets, ext_targets = self._to_csr(external_edges)
+        n = len(nodes.names)
+
+        fan_out = [offsets[i + 1] - offsets[i] for i in range(n)]
+        fan_in = [0] * n
+        for target in targets:
+            fan_in[target] += 1
+
+        cycles = [c for c in self.strongly_connected_components(offsets, targets) if len(c) > 1]
+        hubs = sorted((i for i in range(n) if fan_in[i]), key=lambda i: (-fan_in[i], i))[:TOP_HUBS]
+        reverse_offsets, reverse_targets = self._reverse(offsets, targets)
+
+        return {
+            "nodes": nodes.names,
+            "offsets": offsets,
+            "targets": targets,
+            "external": {
+                "names": externals.names,
+                "offsets": ext_offsets,
+                "targets": ext_targets
+            },
+            "fan_in": fan_in,
+            "fan_out": fan_out,
+            "cycles": cycles,
+            "hubs": [
+                {"id": i, "fan_in": fan_in[i], "dependents": self._count_reachable(reverse_offsets, reverse_targets, i)}
+                for i in hubs
+            ],
+            "stats": {
+                "nodes": n,
+                "edges": len(targets),
+                "external_edges": len(ext_targets),
+                "unresolved": unresolved,
+                "cycles": len(cycles)
+            }
+        }
+
+    @staticmethod
+    def edges_by_file(dependencies: Dict[str, Any]) -> Dict[str, Dict[str, List[str]]]:
+        """
+        Expands the stored graph into {file: {"internal": [...], "external": [...]}},
+        for consumers that want names. Reports from before the graph was resolved
+        stored {file: [raw imports]}; those come back as external-only.
+        """
+        if "nodes" not in dependencies:
+            return {f: {"internal": [], "external": list(imports)} for f, imports in dependencies.items()}
+
+        names = dependencies["nodes"]
+        offsets, targets = dependencies["offsets"], dependencies["targets"]
+        external = dependencies.get("external", {})
+        ext_names = external.get("names", [])
+        ext_offsets, ext_targets = external.get("offsets", []), external.get("targets", [])
+
+        result = {}
+        for i, name in enumerate(names):
+            internal = [names[t] for t in targets[offsets[i]:offsets[i + 1]]]
+            ext = [ext_names[t] for t in ext_targets[ext_offsets[i]:ext_offsets[i + 1]]] if ext_offsets else []
+            result[name.replace('/', os.sep)] = {"internal": internal, "external": ext}
+        return result
+
+    @staticmethod
+    def transitive_dependents(dependencies: Dict[str, Any], file_path: str) -> List[str]:
+        """
+        Every file that imports file_path directly or indirectly.
+        """
+        names = dependencies.get("nodes", [])
+        try:
+            start = names.index(file_path.replace(os.sep, '/'))
+        except ValueError:
+            return []
+        reverse_offsets, reverse_targets = DependencyGraph._reverse(dependencies["offsets"], dependencies["targets"])
+        seen = DependencyGraph._reachable(reverse_offsets, reverse_targets, start)
+        return [names[i] for i in sorted(seen) if i != start]
+
+    @staticmethod
+    def strongly_connected_components(offsets: List[int], targets: List[int]) -> List[List[int]]:
+        """
+        Tarjan's algorithm with an explicit stack (import chains easily exceed
+        the recursion limit on large repos).
+        """
+        n = len(offsets) - 1
+        index = [-1] * n
+        lowlink = [0] * n
+        on_stack = [False] * n
+        stack: List[int] = []
+        components = []
+        counter = 0
+
+        for root in range(n):
+            if index[root] != -1:
+                continue
+            # Frames are (node, position of the next edge to follow)
+            work = [(root, offsets[root])]
+            index[root] = lowlink[root] = counter
+            counter += 1
+            stack.append(root)
+            on_stack[root] = True
+            while work:
+                node, edge = work[-1]
+                if edge < offsets[node + 1]:
+                    work[-1] = (node, edge + 1)
+                    nxt = targets[edge]
+                    if index[nxt] == -1:
+                        index[nxt] = lowlink[nxt] = counter
+                        counter += 1
+                        stack.append(nxt)
+                        on_stack[nxt] = True
+                        work.append((nxt, offsets[nxt]))
+                    elif on_stack[nxt] and index[nxt] < lowlink[node]:
+                        lowlink[node] = index[nxt]
+                    continue
+
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    if lowlink[node] < lowlink[parent]:
+                        lowlink[parent] = lowlink[node]
+                if lowlink[node] == index[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack[member] = False
+                        component.append(member)
+                        if member == node:
+                            break
+                    components.append(sorted(component))
+        return components
+
+    @staticmethod
+    def _to_csr(adjacency: List[List[int]]) -> Tuple[List[int], List[int]]:
+        offsets = [0]
+        targets: List[int] = []
+        for edges in adjacency:
+            # The same file is often imported by several statements
+            targets.extend(sorted(set(edges)))
+            offsets.append(len(targets))
+        return offsets, targets
+
+    @staticmethod
+    def _reverse(offsets: List[int], targets: List[int]) -> Tuple[List[int], List[int]]:
+        n = len(offsets) - 1
+        reverse: List[List[int]] = [[] for _ in range(n)]
+        for source in range(n):
+            for target in targets[offsets[source]:offsets[source + 1]]:
+                reverse[target].append(source)
+        return DependencyGraph._to_csr(reverse)
+
+    @staticmethod
+    def _reachable(offsets: List[int], targets: List[int], start: int) -> List[int]:
+        seen = bytearray(len(offsets) - 1)
+        seen[start] = 1
+        order = [start]
+        # order doubles as the BFS queue
+        for node in order:
+            for nxt in targets[offsets[node]:offsets[node + 1]]:
+                if not seen[nxt]:
+                    seen[nxt] = 1
+                    order.append(nxt)
+        return order
+
+    @staticmethod
+    def _count_reachable(offsets: List[int], targets: List[int], start: int) -> int:
+        return len(DependencyGraph._reachable(offsets, targets, start)) - 1
+
+    def _load_ts_paths(self) -> List[Tuple[str, List[str]]]:
+        """
+        Path aliases from the root tsconfig.json / jsconfig.json as
+        (pattern, [substitutions]) with substitutions made repo-relative.
+        """
+        if not self.repo_path:
+            return []
+        aliases = []
+        for name in ("tsconfig.json", "jsconfig.json"):
+            config = _load_jsonc(os.path.join(self.repo_path, name))
+            if not config:
+                continue
+            options = config.get("compilerOptions") or {}
+            base_url = posixpath.normpath(options.get("baseUrl") or ".")
+            paths = options.get("paths") or {}
+            for pattern, substitutions in paths.items():
+                if isinstance(substitutions, list):
+                    aliases.append((pattern, [posixpath.normpath(posixpath.join(base_url, s)) for s in substitutions if isinstance(s, str)]))
+            if options.get("baseUrl"):
+                # Bare specifiers are also tried against baseUrl
+                aliases.append(("*", [posixpath.join(base_url, "*")]))
+        return aliases
+
+class _ImportResolver:
+    def __init__(self, files: set, ts_paths: List[Tuple[str, List[str]]]):
+        self.files = files
+        self.ts_paths = ts_paths
+        self.python_roots = self._python_roots(files)
+        self._absolute_cache: Dict[Tuple[str, Tuple[str, ...]], List[str]] = {}
+        # Directories holding Python files, so namespace packages (no __init__.py)
+        # are recognized as internal
+        self.python_dirs = set()
+        for path in files:
+            if path.endswith(PYTHON_EXTENSION):
+                directory = posixpath.dirname(path)
+                while directory and directory not in self.python_dirs:
+                    self.python_dirs.add(directory)
+                    directory = posixpath.dirname(directory)
+
+    def resolve(self, importer: str, spec: str, names) -> Tuple[List[str], Optional[str]]:
+        """
+        Returns (internal files, external package name or None) for one import.
+        """
+        if importer.endswith(PYTHON_EXTENSION):
+            return self._resolve_python(importer, spec, names)
+        if importer.endswith(JS_EXTENSIONS):
+            return self._resolve_js(importer, spec)
+        return [], spec
+
+    # --- Python ---
+
+    @staticmethod
+    def _python_roots(files: set) -> List[str]:
+        # A directory is an import root when it holds a top-level package: the
+        # parent of the outermost directory in a chain of __init__.py files.
+        roots = {""}
+        for path in files:
+            if not path.endswith("/__init__.py"):
+                continue
+            package = posixpath.dirname(path)
+            while posixpath.dirname(package) and posixpath.join(posixpath.dirname(package), "__init__.py") in files:
+                package = posixpath.dirname(package)
+            roots.add(posixpath.dirname(package))
+        return sorted(roots, key=lambda r: (r.count('/'), r))
+
+    def _module_file(self, base: str, parts: List[str]) -> Optional[str]:
+        path = posixpath.join(base, *parts) if parts else base
+        for candidate in (path + PYTHON_EXTENSION, posixpath.join(path, "__init__.py")):
+            if candidate in self.files:
+                return candidate
+        return None
+
+    def _resolve_python(self, importer: str, spec: str, names) -> Tuple[List[str], Optional[str]]:
+        level = len(spec) - len(spec.lstrip('.'))
+        parts = [p for p in spec[level:].split('.') if p]
+
+        if level:
+            base = posixpath.dirname(importer)
+            for _ in range(level - 1):
+                base = posixpath.dirname(base)
+            return self._lookup_python([base], parts, names), None
+
+        # Absolute imports resolve the same way from every file; memoize them
+        key = (spec, tuple(names))
+        found = self._absolute_cache.get(key)
+        if found is None:
+            found = self._absolute_cache[key] = self._lookup_python(self.python_roots, parts, names)
+        if found:
+            return found, None
+
+        # Scripts also import their siblings (sys.path[0] is the script's directory)
+        directory = posixpath.dirname(importer)
+        found = self._lookup_python([directory], parts, names)
+        if found or not parts:
+            return found, None
+        if any(posixpath.join(base, parts[0]) in self.python_dirs for base in self.python_roots + [directory]):
+            return [], None # Internal package, but not a module we can point at
+        return [], parts[0]
+
+    def _lookup_python(self, bases: List[str], parts: List[str], names) -> List[str]:
+        for base in bases:
+            # from pkg import submodule (pkg may be a namespace package with no file)
+            found = [m for m in (self._module_file(base, parts + [name]) for name in names if name != '*') if m]
+            module = self._module_file(base, parts) if parts else None
+            if found or module:
+                return found or [module]
+        return []
+
+    # --- JavaScript / TypeScript ---
+
+    def _js_file(self, path: str) -> Optional[str]:
+        path = posixpath.normpath(path)
+        if path in self.files:
+            return path
+        stem, ext = posixpath.splitext(path)
+        # TS sources imported with their compiled ".js" extension
+        if ext in ('.js', '.jsx') and stem + ext.replace('j', 't', 1) in self.files:
+            return stem + ext.replace('j', 't', 1)
+        for candidate_ext in JS_EXTENSIONS:
+            if path + candidate_ext in self.files:
+                return path + candidate_ext
+        for candidate_ext in JS_EXTENSIONS:
+            index = posixpath.join(path, "index" + candidate_ext)
+            if index in self.files:
+                return index
+        return None
+
+    def _resolve_js(self, importer: str, spec: str) -> Tuple[List[str], Optional[str]]:
+        if spec.startswith(('./', '../')) or spec in ('.', '..'):
+            found = self._js_file(posixpath.join(posixpath.dirname(importer), spec))
+            return ([found] if found else []), None
+        if spec.startswith('/'):
+            found = self._js_file(spec.lstrip('/'))
+            return ([found] if found else []), None
+
+        for pattern, substitutions in self.ts_paths:
+            prefix, star, suffix = pattern.partition('*')
+            if star:
+                if not (spec.startswith(prefix) and spec.endswith(suffix) and len(spec) >= len(prefix) + len(suffix)):
+                    continue
+                matched = spec[len(prefix):len(spec) - len(suffix)]
+            elif spec != pattern:
+                continue
+            else:
+                matched = ""
+            for substitution in substitutions:
+                found = self._js_file(substitution.replace('*', matched))
+                if found:
+                    return [found], None
+
+        # Bare specifier: an npm package ("react", "@scope/pkg/sub", "node:fs")
+        spec = spec[5:] if spec.startswith('node:') else spec
+        segments = spec.split('/')
+        package = '/'.join(segments[:2]) if spec.startswith('@') else segments[0]
+        return [], package
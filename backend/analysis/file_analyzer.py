@@ -0,0 +1,70 @@
+import os
+from typing import Dict, Any, Optional
+from backend.analysis.ast_parser import ASTParser
+from backend.analysis.complexity import ComplexityCalculator
+from backend.analysis.cfg_builder import CFGBuilder
+from backend.analysis.slicer import Slicer
+from backend.analysis.line_index import build_source_info
+
+class FileAnalyzer:
+    """
+    Runs the per-file analysis stages (AST, complexity, CFG, slices) for one file.
+    Used directly by the sequential Analyzer loop and kept warm inside pool workers.
+    """
+
+    def __init__(self):
+        self.ast_parser = ASTParser()
+        self.complexity_calc = ComplexityCalculator()
+        self.cfg_builder = CFGBuilder()
+        self.slicer = Slicer()
+
+    def analyze(self, repo_path: str, file_rel_path: str) -> Optional[Dict[str, Any]]:
+        """
+        Returns the report entry for a file, or None if the file should be skipped.
+        """
+        full_path = os.path.join(repo_path, file_rel_path)
+        with open(full_path, 'rb') as f:
+            raw = f.read()
+        try:
+            content = raw.decode('utf-8')
+        except UnicodeDecodeError:
+            return None # Skip non-utf8 files
+        # What text mode would have read: universal newlines
+        content = content.replace("\r\n", "\n").replace("\r", "\n")
+
+        ast_data, tree = self.ast_parser.parse_with_tree(file_rel_path, content)
+        complexity = self.complexity_calc.calculate(content, ast_data)
+
+        # CFGs and slices are Python-only and built from the tree the parser already produced
+        cfg = {}
+        slices = {}
+        if tree is not None:
+            try:
+                cfg = self.cfg_builder.build(content, tree)
+            except Exception:
+                cfg = {}
+            try:
+                slices = self.slicer.slice(content, tree)
+            except Exception:
+                slices = {}
+
+        return {
+            "ast": ast_data,
+            "complexity": complexity,
+            "cfg": cfg,
+            "slices": slices,
+            # Lets the SliceCollector cut slices straight out of the file
+            "source": build_source_info(raw)
+        }
+
+    def failed_entry(self, error: str) -> Dict[str, Any]:
+        """
+        Entry for a file whose analysis was aborted (e.g. it exceeded its budget).
+        Keeps the report shape so the UI shows the error like a parse failure.
+        """
+        return {
+            "ast": self.ast_parser._empty_result(error=error),
+            "complexity": 0,
+            "cfg": {},
+            "slices": {}
+        }
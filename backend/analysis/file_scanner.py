@@ -1,23 +1,285 @@
 import os
-from typing import List
+import re
+import fnmatch
+import subprocess
+from typing import Dict, List, Optional, Tuple
+
+# Bytes read from the start of each file to sniff binary / minified / generated content
+SNIFF_BYTES = 8192
+
+# Linguist-style path conventions for vendored and generated code
+VENDORED_DIRS = {'vendor', 'vendors', 'third_party', 'third-party', 'bower_components', 'jspm_packages', '.yarn', '.next', 'coverage'}
+GENERATED_FILE_PATTERNS = [
+    '*.min.js', '*-min.js', '*.bundle.js', '*.chunk.js',
+    '*_pb2.py', '*_pb2_grpc.py', '*.pb.go', '*_pb.js', '*_pb.ts', '*_grpc_pb.js',
+    '*.generated.*', '*.gen.go', '*_generated.go'
+]
+# Header comments that code generators put at the top of their output
+GENERATED_HEADER_RE = re.compile(
+    rb'^[ \t]*(?://|#|/?\*)[ \t]*(?:Code generated\b.*DO NOT EDIT|@generated|Generated by the protocol buffer compiler|<auto-generated)',
+    re.MULTILINE
+)
+
+# A sniffed chunk with lines this long on average is minified, not hand-written
+MINIFIED_AVG_LINE_LENGTH = 300
+
+_GENERATED_FILE_RE = re.compile("|".join(fnmatch.translate(p) for p in GENERATED_FILE_PATTERNS))
+
+class _IgnoreRules:
+    """
+    Minimal .gitignore / .gitattributes pattern matcher for non-git checkouts:
+    negation, directory-only and anchored patterns, and ** globs.
+    """
+
+    def __init__(self):
+        # (base_dir, regex, negated, dir_only), in file order; last match wins
+        self.rules: List[Tuple[str, re.Pattern, bool, bool]] = []
+
+    def add(self, base_dir: str, pattern: str):
+        negated = pattern.startswith('!')
+        if negated:
+            pattern = pattern[1:]
+        dir_only = pattern.endswith('/')
+        pattern = pattern.rstrip('/')
+        if not pattern:
+            return
+        anchored = '/' in pattern
+        regex = self._translate(pattern.lstrip('/'))
+        if not anchored:
+            regex = '(?:.*/)?' + regex
+        self.rules.append((base_dir, re.compile(regex), negated, dir_only))
+
+    @staticmethod
+    def _translate(pattern: str) -> str:
+        # fnmatch.translate lets * cross "/" and has no **, so translate by hand
+        out = []
+        i = 0
+        while i < len(pattern):
+            if pattern.startswith('**/', i):
+                out.append('(?:.*/)?')
+                i += 3
+            elif pattern.startswith('**', i):
+                out.append('.*')
+                i += 2
+            elif pattern[i] == '*':
+                out.append('[^/]*')
+                i += 1
+            elif pattern[i] == '?':
+                out.append('[^/]')
+                i += 1
+            elif pattern[i] == '[' and ']' in pattern[i + 2:]:
+                end = pattern.index(']', i + 2)
+                body = pattern[i + 1:end]
+                if body.startswith('!'):
+                    body = '^' + body[1:]
+                out.append('[' + body.replace('\\', '\\\\') + ']')
+                i = end + 1
+            else:
+                out.append(re.escape(pattern[i]))
+                i += 1
+        return ''.join(out)
+
+    def match(self, rel_path: str, is_dir: bool) -> Optional[bool]:
+        result = None
+        for base_dir, regex, negated, dir_only in self.rules:
+            if dir_only and not is_dir:
+                continue
+            if base_dir:
+                if not rel_path.startswith(base_dir + '/'):
+                    continue
+                candidate = rel_path[len(base_dir) + 1:]
+            else:
+                candidate = rel_path
+            if regex.fullmatch(candidate):
+                result = not negated
+        return result
 
 class FileScanner:
-    def __init__(self, repo_path: str):
+    def __init__(self, repo_path: str, max_file_size: Optional[int] = None):
         self.repo_path = repo_path
         self.supported_extensions = {'.py', '.ts', '.js', '.jsx', '.tsx', '.go', '.java'}
         self.ignore_dirs = {'node_modules', '.git', '__pycache__', 'dist', 'build', 'venv', 'env', '.venv'}
+        if max_file_size is None:
+            max_file_size = int(os.getenv("ANALYSIS_MAX_FILE_BYTES", str(1024 * 1024)))
+        self.max_file_size = max_file_size
+        # reason -> number of files skipped for it, filled by the last scan
+        self.skipped: Dict[str, int] = {}
 
     def scan(self) -> List[str]:
+        return [path for path, _ in self.scan_with_sizes()]
+
+    def scan_with_sizes(self) -> List[Tuple[str, int]]:
+        """
+        Returns (relative path, size in bytes) for every file worth analyzing.
+        Uses `git ls-files` in git checkouts (which honors .gitignore) and a
+        .gitignore-aware os.scandir walk otherwise.
+        """
+        self.skipped = {}
+        candidates = self._git_candidates()
+        if candidates is not None:
+            attributes = self._git_linguist_attributes(candidates)
+        else:
+            candidates, attributes = self._walk_candidates()
+
         files_list = []
-        for root, dirs, files in os.walk(self.repo_path):
-            # Modify dirs in-place to skip ignored directories
-            dirs[:] = [d for d in dirs if d not in self.ignore_dirs]
-            
-            for file in files:
-                _, ext = os.path.splitext(file)
-                if ext in self.supported_extensions:
-                    full_path = os.path.join(root, file)
-                    # Store relative path
-                    rel_path = os.path.relpath(full_path, self.repo_path)
-                    files_list.append(rel_path)
+        for rel_path in candidates:
+            size = self._check_file(rel_path, attributes.get(rel_path, {}))
+            if size is not None:
+                # Store relative path
+                files_list.append((rel_path.replace('/', os.sep), size))
         return files_list
+
+    def _is_supported(self, rel_path: str) -> bool:
+        _, ext = os.path.splitext(rel_path)
+        if ext not in self.supported_extensions:
+            return False
+        parts = rel_path.split('/')[:-1]
+        return not any(p in self.ignore_dirs for p in parts)
+
+    def _skip(self, reason: str):
+        self.skipped[reason] = self.skipped.get(reason, 0) + 1
+
+    def _check_file(self, rel_path: str, attrs: Dict[str, bool]) -> Optional[int]:
+        # Explicit linguist attributes beat the built-in path conventions
+        vendored = attrs.get('linguist-vendored')
+        if vendored is None:
+            vendored = any(p in VENDORED_DIRS for p in rel_path.split('/')[:-1])
+        if vendored:
+            self._skip("vendored")
+            return None
+
+        generated = attrs.get('linguist-generated')
+        if generated is None and _GENERATED_FILE_RE.match(os.path.basename(rel_path)):
+            generated = True
+        if generated:
+            self._skip("generated")
+            return None
+
+        full_path = os.path.join(self.repo_path, rel_path)
+        try:
+            size = os.path.getsize(full_path)
+            if size > self.max_file_size:
+                self._skip("too_large")
+                return None
+            with open(full_path, 'rb') as f:
+                head = f.read(SNIFF_BYTES)
+        except OSError:
+            return None # Tracked but deleted, broken symlink, ...
+
+        reason = self._sniff(head, generated is False)
+        if reason:
+            self._skip(reason)
+            return None
+        return size
+
+    def _sniff(self, head: bytes, allow_generated: bool) -> Optional[str]:
+        if b'\0' in head:
+            return "binary"
+        if not allow_generated and GENERATED_HEADER_RE.search(head, 0, 1024):
+            return "generated"
+        if len(head) >= 1024:
+            lines = head.count(b'\n') + 1
+            if len(head) / lines > MINIFIED_AVG_LINE_LENGTH:
+                return "minified"
+        return None
+
+    # --- git checkouts ---
+
+    def _git(self, *args: str, input: Optional[bytes] = None) -> Optional[bytes]:
+        try:
+            result = subprocess.run(
+                ["git", "-C", self.repo_path, *args],
+                input=input, capture_output=True, check=True
+            )
+        except (OSError, subprocess.CalledProcessError):
+            return None
+        return result.stdout
+
+    def _git_candidates(self) -> Optional[List[str]]:
+        if not os.path.exists(os.path.join(self.repo_path, '.git')):
+            return None
+        # Tracked plus untracked-but-not-ignored, i.e. .gitignore applied by git itself
+        output = self._git("ls-files", "-z", "--cached", "--others", "--exclude-standard")
+        if output is None:
+            return None
+        paths = dict.fromkeys(p for p in output.decode('utf-8', 'surrogateescape').split('\0') if p)
+        return sorted(p for p in paths if self._is_supported(p))
+
+    def _git_linguist_attributes(self, paths: List[str]) -> Dict[str, Dict[str, bool]]:
+        if not paths:
+            return {}
+        stdin = '\0'.join(paths).encode('utf-8', 'surrogateescape') + b'\0'
+        output = self._git("check-attr", "-z", "--stdin", "linguist-vendored", "linguist-generated", input=stdin)
+        if output is None:
+            return {}
+
+        attributes: Dict[str, Dict[str, bool]] = {}
+        tokens = output.decode('utf-8', 'surrogateescape').split('\0')
+        # -z output is path, attribute, value triples
+        for path, attr, value in zip(tokens[0::3], tokens[1::3], tokens[2::3]):
+            if value in ('set', 'true'):
+                attributes.setdefault(path, {})[attr] = True
+            elif value in ('unset', 'false'):
+                attributes.setdefault(path, {})[attr] = False
+        return attributes
+
+    # --- plain directories ---
+
+    def _walk_candidates(self) -> Tuple[List[str], Dict[str, Dict[str, bool]]]:
+        ignore_rules = _IgnoreRules()
+        attribute_rules = {'linguist-vendored': _IgnoreRules(), 'linguist-generated': _IgnoreRules()}
+        self._load_gitattributes(attribute_rules)
+
+        candidates = []
+        stack = ['']
+        while stack:
+            rel_dir = stack.pop()
+            self._load_gitignore(ignore_rules, rel_dir)
+            try:
+                entries = list(os.scandir(os.path.join(self.repo_path, rel_dir)))
+            except OSError:
+                continue
+            for entry in entries:
+                rel_path = f"{rel_dir}/{entry.name}" if rel_dir else entry.name
+                is_dir = entry.is_dir(follow_symlinks=False)
+                if is_dir and entry.name in self.ignore_dirs:
+                    continue
+                if ignore_rules.match(rel_path, is_dir):
+                    continue
+                if is_dir:
+                    stack.append(rel_path)
+                elif entry.is_file() and self._is_supported(rel_path):
+                    candidates.append(rel_path)
+
+        attributes: Dict[str, Dict[str, bool]] = {}
+        for rel_path in candidates:
+            for attr, rules in attribute_rules.items():
+                value = rules.match(rel_path, False)
+                if value is not None:
+                    attributes.setdefault(rel_path, {})[attr] = value
+        return sorted(candidates), attributes
+
+    def _load_gitignore(self, rules: _IgnoreRules, rel_dir: str):
+        path = os.path.join(self.repo_path, rel_dir, '.gitignore')
+        for line in self._read_lines(path):
+            rules.add(rel_dir, line)
+
+    def _load_gitattributes(self, attribute_rules: Dict[str, _IgnoreRules]):
+        path = os.path.join(self.repo_path, '.gitattributes')
+        for line in self._read_lines(path):
+            parts = line.split()
+            for attr in parts[1:]:
+                # "linguist-vendored", "-linguist-vendored", "linguist-vendored=false"
+                name, _, value = attr.lstrip('-!').partition('=')
+                if name not in attribute_rules:
+                    continue
+                unset = attr.startswith(('-', '!')) or value == 'false'
+                # Negated rules mark the attribute as explicitly off
+                attribute_rules[name].add('', ('!' if unset else '') + parts[0])
+
+    def _read_lines(self, path: str) -> List[str]:
+        try:
+            with open(path, 'r', encoding='utf-8', errors='replace') as f:
+                return [l.strip() for l in f if l.strip() and not l.startswith('#')]
+        except OSError:
+            return []
@@ -0,0 +1,71 @@
+import os
+from typing import Dict, Optional, Set, Tuple
+import git
+
+class GitState:
+    """
+    Reads commit and blob hashes of a checkout so a re-run can tell which files changed.
+    Every method degrades to "unknown" (None / empty) when the path isn't a git repo.
+    """
+
+    def __init__(self, repo_path: str):
+        self.repo_path = repo_path
+        try:
+            self.repo = git.Repo(repo_path)
+        except (git.InvalidGitRepositoryError, git.NoSuchPathError):
+            self.repo = None
+
+    def head_commit(self) -> Optional[str]:
+        if self.repo is None:
+            return None
+        try:
+            return self.repo.head.commit.hexsha
+        except (ValueError, git.GitCommandError):
+            return None # Empty repo / detached without commits
+
+    def blob_hashes(self) -> Dict[str, str]:
+        """
+        Maps repo-relative path -> blob SHA for every tracked file, from the index.
+        """
+        if self.repo is None:
+            return {}
+        try:
+            output = self.repo.git.ls_files("-s", "-z")
+        except git.GitCommandError:
+            return {}
+
+        blobs = {}
+        for record in output.split("\0"):
+            if not record:
+                continue
+            # "<mode> <sha> <stage>\t<path>"
+            meta, _, path = record.partition("\t")
+            parts = meta.split()
+            if len(parts) == 3:
+                blobs[os.path.normpath(path)] = parts[1]
+        return blobs
+
+    def changed_files(self, base_commit: str) -> Optional[Tuple[Set[str], Set[str]]]:
+        """
+        Returns (added_or_modified, deleted) between base_commit and HEAD,
+        or None if the base commit isn't available in this checkout.
+        """
+        if self.repo is None or not base_commit:
+            return None
+        try:
+            output = self.repo.git.diff("--name-status", "--no-renames", "-z", base_commit, "HEAD")
+        except git.GitCommandError:
+            return None
+
+        changed, deleted = set(), set()
+        tokens = output.split("\0")
+        # -z output alternates status and path
+        for status, path in zip(tokens[0::2], tokens[1::2]):
+            if not status:
+                continue
+            path = os.path.normpath(path)
+            if status.startswith("D"):
+                deleted.add(path)
+            else:
+                changed.add(path)
+        return changed, deleted
@@ -0,0 +1,208 @@
+import os
+import json
+import time
+import uuid
+import threading
+from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+JOBS_DIR = os.path.join("backend", "data", "jobs")
+
+# Persist progress at most this often; status changes are always written
+PROGRESS_FLUSH_INTERVAL = 0.5
+
+# Finished jobs kept in memory; older ones are still served from disk
+MAX_FINISHED_IN_MEMORY = 200
+
+ACTIVE_STATES = ("queued", "running")
+
+class JobQueueFull(Exception):
+    pass
+
+class JobCancelled(Exception):
+    pass
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+class Job:
+    """
+    A unit of background work. The job function receives the Job and reports
+    progress / checks for cancellation through it.
+    """
+
+    def __init__(self, uid: str, kind: str, key: str, params: Dict[str, Any]):
+        self.id = str(uuid.uuid4())
+        self.uid = uid
+        self.kind = kind
+        self.key = key
+        self.params = params
+        self.status = "queued"
+        self.progress = {"done": 0, "total": 0}
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+        self.created_at = _now()
+        self.started_at: Optional[str] = None
+        self.finished_at: Optional[str] = None
+        self._cancel_event = threading.Event()
+        self._last_flush = 0.0
+        self._manager: Optional["JobManager"] = None
+
+    def set_progress(self, done: int, total: int):
+        self.progress = {"done": done, "total": total}
+        if time.monotonic() - self._last_flush >= PROGRESS_FLUSH_INTERVAL:
+            self._flush()
+
+    def check_cancelled(self):
+        if self._cancel_event.is_set():
+            raise JobCancelled()
+
+    @property
+    def cancel_requested(self) -> bool:
+        return self._cancel_event.is_set()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "uid": self.uid,
+            "kind": self.kind,
+            "params": self.params,
+            "status": self.status,
+            "progress": self.progress,
+            "result": self.result,
+            "error": self.error,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at
+        }
+
+    def _flush(self):
+        self._last_flush = time.monotonic()
+        if self._manager is not None:
+            self._manager._persist(self)
+
+class JobManager:
+    """
+    Runs jobs on a bounded thread pool, off the event loop. Job state is kept in
+    memory and mirrored to disk, so status stays queryable from any request and
+    across restarts (jobs that were active when the process died read as "interrupted").
+    """
+
+    def __init__(self, max_workers: int, max_queue: int, jobs_dir: str = JOBS_DIR):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.jobs_dir = jobs_dir
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="analysis-job")
+        self._jobs: Dict[str, Job] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, uid: str, kind: str, key: str, params: Dict[str, Any], fn: Callable[[Job], Dict[str, Any]]) -> Job:
+        """
+        Queues fn(job). An active job with the same uid and key is returned
+        instead of starting a duplicate. Raises JobQueueFull past the queue depth.
+        """
+        with self._lock:
+            active = [j for j in self._jobs.values() if j.status in ACTIVE_STATES]
+            for existing in active:
+                if existing.uid == uid and existing.key == key:
+                    return existing
+            if len(active) >= self.max_workers + self.max_queue:
+                raise JobQueueFull()
+
+            job = Job(uid, kind, key, params)
+            job._manager = self
+            self._jobs[job.id] = job
+            self._prune()
+
+        self._persist(job)
+        self._executor.submit(self._run, job, fn)
+        return job
+
+    def get(self, job_id: str, uid: str) -> Optional[Dict[str, Any]]:
+        job = self._jobs.get(job_id)
+        if job is not None:
+            return job.to_dict() if job.uid == uid else None
+
+        data = self._load(job_id)
+        if data is None or data.get("uid") != uid:
+            return None
+        if data.get("status") in ACTIVE_STATES:
+            # Persisted as active but not owned by this process: it died mid-run
+            data["status"] = "interrupted"
+        return data
+
+    def list(self, uid: str) -> List[Dict[str, Any]]:
+        with self._lock:
+            jobs = [j.to_dict() for j in self._jobs.values() if j.uid == uid]
+        return sorted(jobs, key=lambda j: j["created_at"], reverse=True)
+
+    def cancel(self, job_id: str, uid: str) -> Optional[Dict[str, Any]]:
+        job = self._jobs.get(job_id)
+        if job is None or job.uid != uid:
+            return None
+        with self._lock:
+            if job.status == "queued":
+                # Never started: the worker will see the flag and skip it
+                job.status = "cancelled"
+                job.finished_at = _now()
+            job._cancel_event.set()
+        self._persist(job)
+        return job.to_dict()
+
+    def _run(self, job: Job, fn: Callable[[Job], Dict[str, Any]]):
+        with self._lock:
+            if job.cancel_requested:
+                return
+            job.status = "running"
+            job.started_at = _now()
+        self._persist(job)
+
+        try:
+            job.result = fn(job)
+            job.status = "done"
+        except JobCancelled:
+            job.status = "cancelled"
+        except Exception as e:
+            import traceback
+            traceback.print_exc()
+            job.status = "failed"
+            job.error = str(e)
+        job.finished_at = _now()
+        self._persist(job)
+
+    def _prune(self):
+        finished = [j for j in self._jobs.values() if j.status not in ACTIVE_STATES]
+        if len(finished) <= MAX_FINISHED_IN_MEMORY:
+            return
+        finished.sort(key=lambda j: j.created_at)
+        for job in finished[:len(finished) - MAX_FINISHED_IN_MEMORY]:
+            del self._jobs[job.id]
+
+    def _path(self, job_id: str) -> str:
+        return os.path.join(self.jobs_dir, f"{job_id}.json")
+
+    def _persist(self, job: Job):
+        os.makedirs(self.jobs_dir, exist_ok=True)
+        path = self._path(job.id)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(job.to_dict(), f, indent=2)
+        os.replace(tmp_path, path)
+
+    def _load(self, job_id: str) -> Optional[Dict[str, Any]]:
+        # Job ids are uuids; anything else can't be ours (and mustn't escape jobs_dir)
+        try:
+            uuid.UUID(job_id)
+        except ValueError:
+            return None
+        path = self._path(job_id)
+        if not os.path.exists(path):
+            return None
+        with open(path, 'r') as f:
+            return json.load(f)
+
+job_manager = JobManager(
+    max_workers=int(os.getenv("ANALYSIS_JOB_WORKERS", "2")),
+    max_queue=int(os.getenv("ANALYSIS_JOB_QUEUE", "8"))
+)
@@ -0,0 +1,59 @@
+import hashlib
+from typing import Any, Dict
+
+# Byte offset of every LINE_STEP-th line: ~1 number per 32 lines, and finding a
+# line costs at most LINE_STEP - 1 newline searches from the nearest entry
+LINE_STEP = 32
+
+def git_blob_sha(raw) -> str:
+    """
+    The hash git gives this content (git hash-object). raw may be any buffer,
+    an mmap included, and is hashed without being copied.
+    """
+    digest = hashlib.sha1(b"blob %d\0" % len(raw))
+    digest.update(raw)
+    return digest.hexdigest()
+
+def build_source_info(raw: bytes) -> Dict[str, Any]:
+    """
+    Compact description of a file's bytes stored in its report entry: size,
+    content hash, line count and a sparse line-offset table, enough to cut a
+    line range out of the file later without reading the rest of it. Lines end
+    at "\n" ("\r\n" included).
+    """
+    offsets = [0]
+    pos = 0
+    find = raw.find
+    lines = 1
+    while True:
+        pos = find(b"\n", pos) + 1
+        if not pos:
+            break
+        if lines % LINE_STEP == 0:
+            offsets.append(pos)
+        lines += 1
+    # Same count as readlines(): a trailing newline doesn't start another line
+    line_count = raw.count(b"\n") + (1 if raw and not raw.endswith(b"\n") else 0)
+    return {
+        "size": len(raw),
+        "sha": git_blob_sha(raw),
+        "lines": line_count,
+        "line_step": LINE_STEP,
+        "line_offsets": offsets
+    }
+
+def line_offset(buf, source: Dict[str, Any], line: int) -> int:
+    """
+    Byte offset where 1-based `line` starts in buf (bytes or mmap) described by
+    source; the size of buf for lines past the end.
+    """
+    if line > source["lines"]:
+        return source["size"]
+    step = source["line_step"]
+    index = (line - 1) // step
+    pos = source["line_offsets"][index]
+    for _ in range((line - 1) - index * step):
+        pos = buf.find(b"\n", pos) + 1
+        if not pos:
+            return source["size"]
+    return pos
@@ -0,0 +1,150 @@
+import os
+import heapq
+import signal
+import threading
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+from backend.analysis.file_analyzer import FileAnalyzer
+
+try:
+    import resource
+except ImportError: # Windows: no per-process memory limits
+    resource = None
+
+# Chunks per worker. More chunks = better balancing, fewer = less IPC overhead.
+CHUNKS_PER_WORKER = 4
+# Upper bound on files per chunk, so results (and progress) keep flowing on big repos
+MAX_CHUNK_FILES = 50
+
+# Per-worker state, populated once by _init_worker so parsers stay warm between chunks
+_file_analyzer: Optional[FileAnalyzer] = None
+_time_budget: float = 0
+
+class FileBudgetExceeded(BaseException):
+    # BaseException so the per-stage `except Exception` guards in FileAnalyzer can't swallow it
+    pass
+
+def _on_alarm(signum, frame):
+    raise FileBudgetExceeded()
+
+def _current_address_space() -> int:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[0]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return 0
+
+def _init_worker(time_budget: float, memory_budget: int):
+    global _file_analyzer, _time_budget
+    _file_analyzer = FileAnalyzer()
+    _time_budget = time_budget
+
+    if time_budget and hasattr(signal, "setitimer"):
+        signal.signal(signal.SIGALRM, _on_alarm)
+
+    # The worker handles one file at a time, so capping its address space at
+    # "what the warm interpreter uses now + budget" is effectively a per-file cap.
+    if memory_budget and resource is not None:
+        baseline = _current_address_space()
+        if baseline:
+            _, hard = resource.getrlimit(resource.RLIMIT_AS)
+            limit = baseline + memory_budget
+            if hard != resource.RLIM_INFINITY:
+                limit = min(limit, hard)
+            resource.setrlimit(resource.RLIMIT_AS, (limit, hard))
+
+def _analyze_chunk(repo_path: str, file_rel_paths: List[str]) -> List[Tuple[str, Optional[Dict[str, Any]]]]:
+    results = []
+    use_timer = _time_budget and hasattr(signal, "setitimer")
+    for file_rel_path in file_rel_paths:
+        try:
+            if use_timer:
+                signal.setitimer(signal.ITIMER_REAL, _time_budget)
+            entry = _file_analyzer.analyze(repo_path, file_rel_path)
+        except FileBudgetExceeded:
+            entry = _file_analyzer.failed_entry("TimeBudgetExceeded")
+        except MemoryError:
+            entry = _file_analyzer.failed_entry("MemoryBudgetExceeded")
+        except RecursionError:
+            entry = _file_analyzer.failed_entry("RecursionError")
+        finally:
+            if use_timer:
+                signal.setitimer(signal.ITIMER_REAL, 0)
+        results.append((file_rel_path, entry))
+    return results
+
+def balanced_chunks(sized_files: List[Tuple[str, int]], n_chunks: int) -> List[List[str]]:
+    """
+    Greedy longest-processing-time partition: biggest files first, each into
+    the currently lightest chunk. File size is the proxy for parse cost.
+    """
+    n_chunks = max(1, min(n_chunks, len(sized_files)))
+    heap = [(0, i) for i in range(n_chunks)]
+    chunks: List[List[str]] = [[] for _ in range(n_chunks)]
+    for path, size in sorted(sized_files, key=lambda x: x[1], reverse=True):
+        load, i = heapq.heappop(heap)
+        chunks[i].append(path)
+        # +1 so empty files still spread across chunks
+        heapq.heappush(heap, (load + size + 1, i))
+    return [c for c in chunks if c]
+
+class ParallelRunner:
+    """
+    Fans file analysis out over a process pool. Pools are kept per configuration
+    and reused across runs so workers don't pay interpreter/import start-up again.
+    """
+
+    _pools: Dict[Tuple[int, float, int], ProcessPoolExecutor] = {}
+    _pools_lock = threading.Lock()
+
+    def __init__(self, workers: int, time_budget: float = 30.0, memory_budget: int = 512 * 1024 * 1024):
+        self.workers = workers
+        self.time_budget = time_budget
+        self.memory_budget = memory_budget
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        key = (self.workers, self.time_budget, self.memory_budget)
+        with self._pools_lock:
+            pool = self._pools.get(key)
+            if pool is None:
+                pool = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    initializer=_init_worker,
+                    initargs=(self.time_budget, self.memory_budget)
+                )
+                self._pools[key] = pool
+            return pool
+
+    def _discard_pool(self):
+        key = (self.workers, self.time_budget, self.memory_budget)
+        with self._pools_lock:
+            pool = self._pools.pop(key, None)
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def run(self, repo_path: str, sized_files: List[Tuple[str, int]]) -> Iterator[Tuple[str, Optional[Dict[str, Any]]]]:
+        """
+        Yields (file_rel_path, entry) as chunks complete. Order is not preserved.
+        """
+        if not sized_files:
+            return
+        n_chunks = max(self.workers * CHUNKS_PER_WORKER, -(-len(sized_files) // MAX_CHUNK_FILES))
+        chunks = balanced_chunks(sized_files, n_chunks)
+        pool = self._get_pool()
+        futures = {pool.submit(_analyze_chunk, repo_path, chunk): chunk for chunk in chunks}
+        try:
+            for future in as_completed(futures):
+                try:
+                    results = future.result()
+                except BrokenProcessPool:
+                    # A worker died hard (e.g. OOM-killed). Drop the pool so the next
+                    # run starts fresh, and report the chunk's files as failed.
+                    self._discard_pool()
+                    fallback = FileAnalyzer()
+                    results = [(p, fallback.failed_entry("WorkerCrashed")) for p in futures[future]]
+                for item in results:
+                    yield item
+        finally:
+            for future in futures:
+                future.cancel()
@@ -0,0 +1,101 @@
+import ast
+from collections import deque
+from typing import Dict, Any, List
+
+# Nodes that add a decision point to cyclomatic complexity
+BRANCH_NODES = (
+    ast.If, ast.For, ast.AsyncFor, ast.While, ast.With, ast.AsyncWith,
+    ast.Try, ast.ExceptHandler, ast.BoolOp
+) + ((ast.TryStar,) if hasattr(ast, "TryStar") else ())
+
+class PythonVisitor:
+    """
+    Collects everything the analyzer needs from a Python module in a single traversal:
+    classes, functions (sync and async), imports, calls, control structures, and
+    cyclomatic complexity for the whole file and for each function.
+
+    Walks breadth-first with an explicit queue (same order as ast.walk) and dispatches
+    on the exact node type; ast.NodeVisitor's per-node getattr dispatch costs more
+    than the parse itself on large files.
+    """
+
+    def __init__(self):
+        self.classes: List[Dict[str, Any]] = []
+        self.functions: List[Dict[str, Any]] = []
+        self.imports = set()
+        # from-import module -> names imported from it, for resolving submodule imports
+        self.imported_names: Dict[str, List[str]] = {}
+        self.calls = set()
+        self.control_structures = {"if": 0, "for": 0, "while": 0}
+        self.complexity = 1
+
+    def result(self) -> Dict[str, Any]:
+        return {
+            "classes": self.classes,
+            "functions": self.functions,
+            "imports": list(self.imports),
+            "imported_names": self.imported_names,
+            "calls": list(self.calls),
+            "control_structures": self.control_structures,
+            "complexity": self.complexity
+        }
+
+    def visit(self, tree: ast.AST):
+        branch_types = set(BRANCH_NODES)
+        control = self.control_structures
+        iter_child_nodes = ast.iter_child_nodes
+
+        # Each entry carries the innermost enclosing function, whose complexity
+        # the node's decision points count towards
+        queue = deque([(tree, None)])
+        while queue:
+            node, func = queue.popleft()
+            node_type = type(node)
+
+            if node_type in branch_types:
+                self.complexity += 1
+                if func is not None:
+                    func["complexity"] += 1
+                if node_type is ast.If:
+                    control["if"] += 1
+                elif node_type is ast.For or node_type is ast.AsyncFor:
+                    control["for"] += 1
+                elif node_type is ast.While:
+                    control["while"] += 1
+            elif node_type is ast.Call:
+                target = node.func
+                if type(target) is ast.Name:
+                    self.calls.add(target.id)
+                elif type(target) is ast.Attribute:
+                    self.calls.add(target.attr)
+            elif node_type is ast.FunctionDef or node_type is ast.AsyncFunctionDef:
+                func = self._add_function(node)
+            elif node_type is ast.ClassDef:
+                self.classes.append({"name": node.name, "lineno": node.lineno, "end_lineno": getattr(node, "end_lineno", node.lineno)})
+            elif node_type is ast.Import:
+                for alias in node.names:
+                    self.imports.add(alias.name)
+                continue
+            elif node_type is ast.ImportFrom:
+                # Relative imports keep their leading dots ("..utils", ".")
+                module = "." * (node.level or 0) + (node.module or "")
+                if module:
+                    self.imports.add(module)
+                    names = self.imported_names.setdefault(module, [])
+                    names.extend(alias.name for alias in node.names if alias.name not in names)
+                continue
+
+            for child in iter_child_nodes(node):
+                queue.append((child, func))
+
+    def _add_function(self, node) -> Dict[str, Any]:
+        func: Dict[str, Any] = {
+            "name": node.name,
+            "lineno": node.lineno,
+            "end_lineno": getattr(node, "end_lineno", node.lineno),
+            "complexity": 1
+        }
+        if isinstance(node, ast.AsyncFunctionDef):
+            func["async"] = True
+        self.functions.append(func)
+        return func
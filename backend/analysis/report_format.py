@@ -0,0 +1,168 @@
+import json
+import struct
+import zlib
+from typing import Dict, Any, Iterable, List, Optional
+
+# Container layout:
+#   MAGIC | format version (1 byte) | header length (4 bytes, big endian) | header JSON | sections
+# The header holds the small top-level fields (repo, commit, summary, ...), the
+# most complex files and an index of {section name: [offset, length]} into the
+# zlib-compressed JSON sections that follow it.
+MAGIC = b"AGRPT"
+FORMAT_VERSION = 1
+_PREFIX = struct.Struct(">5sBI")
+
+# Top-level report keys stored as sections; everything else goes in the header
+SECTION_KEYS = ("dependencies", "agent_opportunities")
+# Per-file records are stored in chunks so one file can be read without the rest
+FILES_PER_CHUNK = 128
+TOP_FILES = 50
+
+def _pack(value: Any) -> bytes:
+    return zlib.compress(json.dumps(value, separators=(",", ":")).encode("utf-8"), 6)
+
+def _function_count(entry: Dict[str, Any]) -> int:
+    return len((entry.get("ast") or {}).get("functions") or [])
+
+def encode_report(report: Dict[str, Any]) -> bytes:
+    files: Dict[str, Any] = report.get("files", {})
+    sections: Dict[str, bytes] = {}
+
+    for key in SECTION_KEYS:
+        if key in report:
+            sections[key] = _pack(report[key])
+
+    # file_index: [path, complexity, chunk, function count] per file, in report order
+    paths = list(files)
+    file_index = []
+    for start in range(0, len(paths), FILES_PER_CHUNK):
+        chunk_no = start // FILES_PER_CHUNK
+        chunk = {path: files[path] for path in paths[start:start + FILES_PER_CHUNK]}
+        sections[f"files.{chunk_no}"] = _pack(chunk)
+        file_index.extend([path, entry.get("complexity", 0), chunk_no, _function_count(entry)] for path, entry in chunk.items())
+    sections["file_index"] = _pack(file_index)
+
+    ranked = sorted(file_index, key=lambda item: item[1], reverse=True)[:TOP_FILES]
+    index = {}
+    offset = 0
+    for name, blob in sections.items():
+        index[name] = [offset, len(blob)]
+        offset += len(blob)
+
+    header = {
+        "meta": {k: v for k, v in report.items() if k != "files" and k not in SECTION_KEYS},
+        "top_files": [item[:2] for item in ranked],
+        "sections": index
+    }
+    header_bytes = json.dumps(header, separators=(",", ":")).encode("utf-8")
+    return b"".join([_PREFIX.pack(MAGIC, FORMAT_VERSION, len(header_bytes)), header_bytes, *sections.values()])
+
+class ReportReader:
+    """
+    Reads a report written by encode_report, one section at a time. Plain JSON
+    reports from before the container format are read whole and served from memory.
+    Raises OSError / ValueError on unreadable files.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._legacy: Optional[Dict[str, Any]] = None
+        with open(path, "rb") as f:
+            prefix = f.read(_PREFIX.size)
+            if prefix[:len(MAGIC)] != MAGIC:
+                f.seek(0)
+                self._legacy = json.load(f)
+                self.header = {"meta": {}, "top_files": [], "sections": {}}
+                return
+            _, version, header_length = _PREFIX.unpack(prefix)
+            if version > FORMAT_VERSION:
+                raise ValueError(f"Unsupported report format version {version}")
+            self.header = json.loads(f.read(header_length))
+        self._data_start = _PREFIX.size + header_length
+        self._file_index: Optional[List[list]] = None
+
+    @property
+    def meta(self) -> Dict[str, Any]:
+        if self._legacy is not None:
+            return {k: v for k, v in self._legacy.items() if k != "files" and k not in SECTION_KEYS}
+        return self.header["meta"]
+
+    def top_files(self) -> List[list]:
+        if self._legacy is not None:
+            files = self._legacy.get("files", {})
+            ranked = sorted(files.items(), key=lambda item: item[1].get("complexity", 0), reverse=True)
+            return [[path, entry.get("complexity", 0)] for path, entry in ranked[:TOP_FILES]]
+        return self.header["top_files"]
+
+    def section(self, name: str, default: Any = None) -> Any:
+        if self._legacy is not None:
+            return self._legacy.get(name, default)
+        location = self.header["sections"].get(name)
+        if location is None:
+            return default
+        offset, length = location
+        with open(self.path, "rb") as f:
+            f.seek(self._data_start + offset)
+            blob = f.read(length)
+        try:
+            return json.loads(zlib.decompress(blob))
+        except zlib.error as e:
+            raise ValueError(f"Corrupt report section {name}") from e
+
+    def file_index(self) -> List[list]:
+        """[path, complexity, chunk, function count] for every file, without reading any file record."""
+        if self._legacy is not None:
+            return [
+                [path, entry.get("complexity", 0), 0, _function_count(entry)]
+                for path, entry in self._legacy.get("files", {}).items()
+            ]
+        if self._file_index is None:
+            self._file_index = self.section("file_index", [])
+        return self._file_index
+
+    def files(self, paths: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+        """Per-file records of the given paths (all files when None); unknown paths are left out."""
+        if self._legacy is not None:
+            files = self._legacy.get("files", {})
+            if paths is None:
+                return files
+            return {path: files[path] for path in paths if path in files}
+
+        if paths is None:
+            chunks = sorted({item[2] for item in self.file_index()})
+            wanted = None
+        else:
+            wanted = set(paths)
+            chunks = sorted({item[2] for item in self.file_index() if item[0] in wanted})
+
+        result: Dict[str, Any] = {}
+        for chunk in chunks:
+            for path, entry in self.section(f"files.{chunk}", {}).items():
+                if wanted is None or path in wanted:
+                    result[path] = entry
+        return result
+
+    def load(self, sections: Optional[Iterable[str]] = None, files: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+        """
+        The report as a dict. With sections=None everything is read; otherwise only the
+        named sections ("files", "dependencies", "agent_opportunities") plus the header
+        fields and "top_files" ([path, complexity], most complex first), and "files" is
+        limited to the given paths when it isn't requested whole.
+        """
+        if self._legacy is not None and sections is None:
+            return self._legacy
+        wanted = set(SECTION_KEYS) | {"files"} if sections is None else set(sections)
+
+        report = dict(self.meta)
+        for key in SECTION_KEYS:
+            if key in wanted:
+                value = self.section(key)
+                if value is not None:
+                    report[key] = value
+        if "files" in wanted:
+            report["files"] = self.files()
+        elif files is not None:
+            report["files"] = self.files(files)
+        if sections is not None:
+            report["top_files"] = self.top_files()
+        return report
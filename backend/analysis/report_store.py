@@ -0,0 +1,161 @@
+import os
+import json
+import stat
+import tempfile
+from typing import Dict, Any, Iterable, Optional
+
+from backend.analysis.report_format import ReportReader, encode_report
+from backend.analysis.catalog import catalog
+
+SHARED_DIR = os.path.join("backend", "data", "shared_reports")
+
+class ReportStore:
+    """
+    Analysis reports are a pure function of (repo, commit, analyzer version), so the
+    full report is stored once in a shared, read-only store keyed by repo and commit.
+    Each user's reports directory only holds a small reference to the shared copy.
+    Reports of checkouts without a commit (not a git repo) are still stored per user.
+
+    Full reports are written in the sectioned container of report_format, so callers
+    that only need part of one can open a ReportReader instead of loading it all.
+    Reports written as plain JSON before that are still read.
+    """
+
+    def __init__(self, shared_dir: str = SHARED_DIR):
+        self.shared_dir = shared_dir
+
+    # --- Shared store ---
+
+    def _shared_path(self, owner: str, name: str, commit: str) -> str:
+        return os.path.join(self.shared_dir, owner, name, f"{commit}.report")
+
+    def open_shared(self, owner: str, name: str, commit: str) -> Optional[ReportReader]:
+        path = self._shared_path(owner, name, commit)
+        if not os.path.exists(path):
+            path = path[:-len(".report")] + ".json"
+        return self._open(path)
+
+    def get_shared(self, owner: str, name: str, commit: str) -> Optional[Dict[str, Any]]:
+        reader = self.open_shared(owner, name, commit)
+        return self._load(reader)
+
+    def latest_shared(self, owner: str, name: str) -> Optional[Dict[str, Any]]:
+        """
+        Most recently written shared report of a repo, any commit. Used as the base
+        for incremental analysis when the user has no report of their own yet.
+        """
+        repo_dir = os.path.join(self.shared_dir, owner, name)
+        if not os.path.isdir(repo_dir):
+            return None
+        candidates = [
+            os.path.join(repo_dir, f) for f in os.listdir(repo_dir) if f.endswith((".report", ".json"))
+        ]
+        if not candidates:
+            return None
+        return self._load(self._open(max(candidates, key=os.path.getmtime)))
+
+    def put_shared(self, owner: str, name: str, commit: str, report: Dict[str, Any]):
+        path = self._shared_path(owner, name, commit)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._write_atomic(path, encode_report(report))
+        # Shared reports are never edited in place; replacing them goes through os.replace
+        os.chmod(path, stat.S_IRUSR | stat.S_IRGRP | stat.S_IROTH)
+
+    # --- Per-user references ---
+
+    def _user_report_path(self, uid: str, report_id: str, ext: str = ".json") -> str:
+        # .json holds a shared_ref (or a full report from before the container
+        # format); .report a full report of a checkout without a commit
+        from backend.auth.user_manager import user_manager
+        user_dir = user_manager._get_user_dir(uid)
+        return os.path.join(user_dir, "reports", f"{report_id}{ext}")
+
+    def user_report_exists(self, uid: str, report_id: str) -> bool:
+        return any(os.path.exists(self._user_report_path(uid, report_id, ext)) for ext in (".json", ".report"))
+
+    def link(self, uid: str, report_id: str, owner: str, name: str, commit: str):
+        path = self._user_report_path(uid, report_id)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._write_json_atomic(path, {"shared_ref": {"owner": owner, "name": name, "commit": commit}})
+        self._remove(self._user_report_path(uid, report_id, ".report"))
+        catalog.put_report(uid, report_id, owner, name, commit)
+
+    def save_user_report(self, uid: str, report_id: str, owner: str, name: str, report: Dict[str, Any]):
+        commit = report.get("commit")
+        if commit:
+            self.put_shared(owner, name, commit, report)
+            self.link(uid, report_id, owner, name, commit)
+        else:
+            path = self._user_report_path(uid, report_id, ".report")
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            self._write_atomic(path, encode_report(report))
+            self._remove(self._user_report_path(uid, report_id))
+            catalog.put_report(uid, report_id, owner, name, None)
+
+    def open_user_report(self, uid: str, report_id: str) -> Optional[ReportReader]:
+        path = self._user_report_path(uid, report_id)
+        if os.path.exists(path):
+            data = self._read_json(path)
+            ref = data.get("shared_ref") if data else None
+            if ref:
+                return self.open_shared(ref["owner"], ref["name"], ref["commit"])
+            return self._open(path)
+        return self._open(self._user_report_path(uid, report_id, ".report"))
+
+    def load_user_report(self, uid: str, report_id: str, sections: Optional[Iterable[str]] = None,
+                         files: Optional[Iterable[str]] = None) -> Optional[Dict[str, Any]]:
+        """The whole report, or only some sections of it (see ReportReader.load)."""
+        return self._load(self.open_user_report(uid, report_id), sections, files)
+
+    def delete_user_report(self, uid: str, report_id: str):
+        # Only the reference goes; the shared copy may still be used by other users
+        for ext in (".json", ".report"):
+            self._remove(self._user_report_path(uid, report_id, ext))
+        catalog.delete_report(uid, report_id)
+
+    # --- IO helpers ---
+
+    def _open(self, path: str) -> Optional[ReportReader]:
+        if not os.path.exists(path):
+            return None
+        try:
+            return ReportReader(path)
+        except (OSError, ValueError):
+            return None
+
+    def _load(self, reader: Optional[ReportReader], sections: Optional[Iterable[str]] = None,
+              files: Optional[Iterable[str]] = None) -> Optional[Dict[str, Any]]:
+        if reader is None:
+            return None
+        try:
+            return reader.load(sections, files)
+        except (OSError, ValueError):
+            return None
+
+    def _remove(self, path: str):
+        if os.path.exists(path):
+            os.remove(path)
+
+    def _read_json(self, path: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(path, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_json_atomic(self, path: str, data: Dict[str, Any]):
+        self._write_atomic(path, json.dumps(data, indent=2).encode("utf-8"))
+
+    def _write_atomic(self, path: str, data: bytes):
+        # Readers never see a half-written report, even with concurrent writers
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+report_store = ReportStore()
@@ -1,7 +1,14 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Query
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
 from pydantic import BaseModel
-from backend.analysis.analyzer import Analyzer
-from typing import List, Dict, Any
+from backend.analysis.analyzer import Analyzer, ANALYZER_VERSION
+from backend.analysis.git_state import GitState
+from backend.analysis.jobs import Job, JobQueueFull, job_manager
+from backend.analysis.report_store import report_store
+from backend.analysis.report_format import ReportReader
+from backend.analysis.catalog import catalog
+from typing import List, Dict, Any, Iterator, Literal, Optional, Tuple
 from backend.auth.firebase import verify_token
 import os
 import json
@@ -10,14 +17,12 @@ router = APIRouter()
 
 class AnalysisRequest(BaseModel):
     repo_name: str # owner/name
+    workers: Optional[int] = None # analysis processes; defaults to ANALYSIS_WORKERS
+    full: bool = False # ignore the previous report and re-analyze every file
 
-@router.post("/run")
-async def run_analysis(
-    request: AnalysisRequest,
-    uid: str = Depends(verify_token)
-):
+def _resolve_repo(repo_name: str) -> Tuple[str, str, str]:
     try:
-        owner, name = request.repo_name.split("/")
+        owner, name = repo_name.split("/")
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid repo name format")
         
@@ -31,20 +36,46 @@ async def run_analysis(
     
     if not os.path.exists(repo_path):
         raise HTTPException(status_code=404, detail="Repository not found. Please clone it first.")
-        
-    analyzer = Analyzer(repo_path, f"{owner}-{name}")
+    return owner, name, repo_path
+
+def _link_shared_report(uid: str, owner: str, name: str, repo_path: str) -> Optional[Dict[str, Any]]:
+    """
+    If this commit was already analyzed (by anyone), point the user at that report.
+    """
+    commit = GitState(repo_path).head_commit()
+    if not commit:
+        return None
+    shared = report_store.get_shared(owner, name, commit)
+    if shared and shared.get("analyzer_version") == ANALYZER_VERSION:
+        report_store.link(uid, f"{owner}-{name}", owner, name, commit)
+        return shared
+    return None
+
+def _previous_report(uid: str, owner: str, name: str) -> Optional[Dict[str, Any]]:
+    # Previous report lets the analyzer re-parse only files changed since its commit
+    return report_store.load_user_report(uid, f"{owner}-{name}") or report_store.latest_shared(owner, name)
+
+@router.post("/run")
+async def run_analysis(
+    request: AnalysisRequest,
+    uid: str = Depends(verify_token)
+):
+    owner, name, repo_path = _resolve_repo(request.repo_name)
+    report_id = f"{owner}-{name}"
     try:
-        report = analyzer.run()
-        
-        # Save to user scoped directory
-        from backend.auth.user_manager import user_manager
-        user_dir = user_manager._get_user_dir(uid)
-        reports_dir = os.path.join(user_dir, "reports")
-        os.makedirs(reports_dir, exist_ok=True)
+        if not request.full:
+            shared = await run_in_threadpool(_link_shared_report, uid, owner, name, repo_path)
+            if shared is not None:
+                return {"status": "ok", "report": shared}
+
+        # Loading (decompress, decode), analyzing and saving (encode, compress) are
+        # all CPU-bound: keep them off the event loop so other requests aren't stalled
+        previous_report = None if request.full else await run_in_threadpool(_previous_report, uid, owner, name)
+        analyzer = Analyzer(repo_path, report_id, workers=request.workers)
+        report = await run_in_threadpool(analyzer.run, previous_report=previous_report)
         
-        report_path = os.path.join(reports_dir, f"{owner}-{name}.json")
-        with open(report_path, 'w') as f:
-            json.dump(report, f, indent=2)
+        # Save to the shared store, referenced from the user scoped directory
+        await run_in_threadpool(report_store.save_user_report, uid, report_id, owner, name, report)
             
     except Exception as e:
         import traceback
@@ -53,46 +84,233 @@ async def run_analysis(
         
     return {"status": "ok", "report": report}
 
+@router.post("/run/stream")
+async def run_analysis_stream(
+    request: AnalysisRequest,
+    uid: str = Depends(verify_token)
+):
+    """
+    Same as /run, but streams NDJSON events: "start", one "file" per analyzed file
+    (AST, complexity, opportunities) as soon as it's done, "dependencies", "summary",
+    and finally "done" once the report is saved (or "error").
+    """
+    owner, name, repo_path = _resolve_repo(request.repo_name)
+    report_id = f"{owner}-{name}"
+
+    def events() -> Iterator[Dict[str, Any]]:
+        try:
+            shared = None if request.full else _link_shared_report(uid, owner, name, repo_path)
+            if shared is not None:
+                yield from Analyzer.report_events(shared)
+            else:
+                previous_report = None if request.full else _previous_report(uid, owner, name)
+                analyzer = Analyzer(repo_path, report_id, workers=request.workers)
+                yield from analyzer.stream(previous_report=previous_report)
+                report_store.save_user_report(uid, report_id, owner, name, analyzer.report)
+            yield {"type": "done", "report_id": report_id}
+        except Exception as e:
+            import traceback
+            traceback.print_exc()
+            yield {"type": "error", "detail": f"Analysis failed: {str(e)}"}
+
+    # A sync generator is iterated in Starlette's threadpool, so the analysis
+    # doesn't block the event loop while it streams
+    return StreamingResponse((json.dumps(event) + "\n" for event in events()), media_type="application/x-ndjson")
+
+def _analysis_job(job: Job, uid: str, owner: str, name: str, repo_path: str, request: AnalysisRequest) -> Dict[str, Any]:
+    report_id = f"{owner}-{name}"
+    shared = None if request.full else _link_shared_report(uid, owner, name, repo_path)
+    if shared is not None:
+        files = shared.get("summary", {}).get("files", 0)
+        job.set_progress(files, files)
+        return {"report_id": report_id, "reused_shared_report": True}
+
+    # Jobs always parse in worker processes: a job thread doing CPU work in this
+    # process would still compete with the event loop for the GIL
+    workers = request.workers
+    if workers is None:
+        workers = int(os.getenv("ANALYSIS_WORKERS", "0"))
+    analyzer = Analyzer(repo_path, report_id, workers=max(1, workers))
+
+    previous_report = None if request.full else _previous_report(uid, owner, name)
+    done, total = 0, 0
+    for event in analyzer.stream(previous_report=previous_report):
+        # Closing the generator on cancel also cancels chunks still queued in the pool
+        job.check_cancelled()
+        if event["type"] == "start":
+            total = event["files"]
+        elif event["type"] == "file":
+            done += 1
+        job.set_progress(done, total)
+
+    report_store.save_user_report(uid, report_id, owner, name, analyzer.report)
+    return {"report_id": report_id, "reused_shared_report": False}
+
+@router.post("/jobs", status_code=202)
+async def submit_analysis_job(
+    request: AnalysisRequest,
+    uid: str = Depends(verify_token)
+):
+    """
+    Queues an analysis and returns immediately. Poll GET /analysis/jobs/{id};
+    when done, result.report_id names the report.
+    """
+    owner, name, repo_path = _resolve_repo(request.repo_name)
+    try:
+        job = job_manager.submit(
+            uid,
+            kind="analysis",
+            key=request.repo_name,
+            params=request.dict(),
+            fn=lambda job: _analysis_job(job, uid, owner, name, repo_path, request)
+        )
+    except JobQueueFull:
+        raise HTTPException(status_code=429, detail="Analysis queue is full, try again later")
+    return job.to_dict()
+
+@router.get("/jobs")
+async def list_analysis_jobs(uid: str = Depends(verify_token)):
+    return job_manager.list(uid)
+
+@router.get("/jobs/{job_id}")
+async def get_analysis_job(job_id: str, uid: str = Depends(verify_token)):
+    job = job_manager.get(job_id, uid)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+@router.delete("/jobs/{job_id}")
+async def cancel_analysis_job(job_id: str, uid: str = Depends(verify_token)):
+    job = job_manager.cancel(job_id, uid)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
 @router.get("/list")
-async def list_reports(uid: str = Depends(verify_token)):
-    from backend.auth.user_manager import user_manager
-    user_dir = user_manager._get_user_dir(uid)
-    report_dir = os.path.join(user_dir, "reports")
-    
-    if not os.path.exists(report_dir):
-        return []
-        
-    reports = []
-    for file in os.listdir(report_dir):
-        if file.endswith(".json"):
-            reports.append(file.replace(".json", ""))
-    return reports
+async def list_reports(
+    offset: int = Query(0, ge=0),
+    limit: Optional[int] = Query(None, ge=1, le=1000),
+    uid: str = Depends(verify_token)
+):
+    # Report ids, most recently updated first
+    return [row["report_id"] for row in catalog.list_reports(uid, offset, limit)]
+
+def _open_report(uid: str, report_id: str) -> ReportReader:
+    reader = report_store.open_user_report(uid, report_id)
+    if reader is None:
+        raise HTTPException(status_code=404, detail="Report not found")
+    return reader
+
+def _project(entry: Dict[str, Any], fields: Optional[List[str]]) -> Dict[str, Any]:
+    # "complexity,ast.functions" -> {"complexity": ..., "ast": {"functions": ...}}
+    if fields is None:
+        return entry
+    projected: Dict[str, Any] = {}
+    for field in fields:
+        parts = field.split(".")
+        value: Any = entry
+        for part in parts:
+            if not isinstance(value, dict) or part not in value:
+                break
+            value = value[part]
+        else:
+            target = projected
+            for part in parts[:-1]:
+                target = target.setdefault(part, {})
+            target[parts[-1]] = value
+    return projected
+
+def _parse_fields(fields: Optional[str]) -> Optional[List[str]]:
+    if fields is None:
+        return None
+    return [f.strip() for f in fields.split(",") if f.strip()]
+
+@router.get("/{report_id}/summary")
+async def get_report_summary(report_id: str, opportunities: bool = False, uid: str = Depends(verify_token)):
+    """
+    Header of the report (repo, commit, summary, ...) and its most complex files,
+    without reading any per-file record. opportunities=true adds the agent opportunities.
+    """
+    reader = _open_report(uid, report_id)
+    try:
+        sections = ("agent_opportunities",) if opportunities else ()
+        return await run_in_threadpool(reader.load, sections)
+    except (OSError, ValueError):
+        raise HTTPException(status_code=500, detail="Report is unreadable")
+
+@router.get("/{report_id}/files")
+async def list_report_files(
+    report_id: str,
+    sort: Literal["complexity", "functions", "path"] = "complexity",
+    order: Optional[Literal["asc", "desc"]] = None,
+    offset: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=500),
+    fields: Optional[str] = None,
+    uid: str = Depends(verify_token)
+):
+    """
+    One page of the report's files. Sorting and paging run on the file index; only
+    with `fields` (e.g. "complexity,ast.functions") are the page's records read and
+    projected. Without it each item is just path, complexity and function count.
+    """
+    reader = _open_report(uid, report_id)
+    field_list = _parse_fields(fields)
+
+    def page() -> Dict[str, Any]:
+        index = reader.file_index()
+        column = {"path": 0, "complexity": 1, "functions": 3}[sort]
+        descending = (order or ("asc" if sort == "path" else "desc")) == "desc"
+        ranked = sorted(index, key=lambda item: item[column] if len(item) > column else 0, reverse=descending)
+        selected = ranked[offset:offset + limit]
+
+        if field_list is None:
+            items = [
+                {"path": item[0], "complexity": item[1], "functions": item[3] if len(item) > 3 else 0}
+                for item in selected
+            ]
+        else:
+            records = reader.files(item[0] for item in selected)
+            items = [
+                {"path": item[0], **_project(records.get(item[0], {}), field_list)}
+                for item in selected
+            ]
+        return {"total": len(index), "offset": offset, "limit": limit, "items": items}
+
+    try:
+        return await run_in_threadpool(page)
+    except (OSError, ValueError):
+        raise HTTPException(status_code=500, detail="Report is unreadable")
+
+@router.get("/{report_id}/files/{file_path:path}")
+async def get_report_file(report_id: str, file_path: str, fields: Optional[str] = None, uid: str = Depends(verify_token)):
+    reader = _open_report(uid, report_id)
+    try:
+        records = await run_in_threadpool(reader.files, [file_path])
+    except (OSError, ValueError):
+        raise HTTPException(status_code=500, detail="Report is unreadable")
+    if file_path not in records:
+        raise HTTPException(status_code=404, detail="File not found in report")
+    return {"path": file_path, **_project(records[file_path], _parse_fields(fields))}
 
 @router.get("/{report_id}")
 async def get_report(report_id: str, uid: str = Depends(verify_token)):
-    from backend.auth.user_manager import user_manager
-    user_dir = user_manager._get_user_dir(uid)
-    report_path = os.path.join(user_dir, "reports", f"{report_id}.json")
-    
-    if not os.path.exists(report_path):
+    report = await run_in_threadpool(report_store.load_user_report, uid, report_id)
+    if report is None:
         raise HTTPException(status_code=404, detail="Report not found")
-        
-    with open(report_path, 'r') as f:
-        return json.load(f)
+    return report
 
 @router.delete("/{report_id}")
 async def delete_report(report_id: str, uid: str = Depends(verify_token)):
     from backend.auth.user_manager import user_manager
     user_dir = user_manager._get_user_dir(uid)
     
-    # 1. Delete the analysis report
-    report_path = os.path.join(user_dir, "reports", f"{report_id}.json")
-    if os.path.exists(report_path):
-        os.remove(report_path)
+    # 1. Delete the analysis report (the user's reference; shared copies stay)
+    report_store.delete_user_report(uid, report_id)
     
     # 2. Delete the modernization output (if any)
     ai_path = os.path.join(user_dir, "modernization", "repo", f"{report_id}.json")
     if os.path.exists(ai_path):
         os.remove(ai_path)
+    catalog.delete_recommendation(uid, report_id)
         
     return {"status": "deleted", "id": report_id}
@@ -1,9 +1,297 @@
-from typing import Dict, Any
+import ast
+import re
+import time
+from collections import deque
+from typing import Dict, Any, List, Optional, Set, Tuple
+
+from backend.ai_engine.heuristics import IO_PATTERNS
+
+# Per-function budget: a slice stops growing at whichever limit it hits first.
+# Time is this thread's CPU time, so busy neighbours don't cut slices short.
+MAX_SLICE_STATEMENTS = 40
+MAX_SLICE_SECONDS = 0.025
+
+# Calls that return a handle for further I/O (httpx.AsyncClient(), boto3.client("s3"),
+# engine.connect()) rather than plain data
+_HANDLE_FACTORY_RE = re.compile(r'^[A-Z]|(?i:client|session|connect|cursor|resource)')
+
+class _Stmt:
+    """
+    One node of a function's def-use graph: a simple statement, or the header
+    of a compound one (the `if` test, the `for` target and iterable, ...).
+    """
+    __slots__ = ("first", "last", "defs", "uses", "calls", "makes_handle", "controls", "loops", "is_io", "is_decision")
+
+    def __init__(self, first: int, last: int, controls: Tuple[int, ...], loops: Tuple[int, ...]):
+        self.first = first
+        self.last = last
+        self.defs: Set[str] = set()
+        self.uses: Set[str] = set()
+        # Root names of everything called, e.g. "requests" for requests.get(url).json()
+        self.calls: Set[str] = set()
+        self.makes_handle = False
+        # Indexes of the enclosing headers this statement is control dependent on
+        self.controls = controls
+        self.loops = loops
+        self.is_io = False
+        self.is_decision = False
 
 class Slicer:
-    def slice(self, content: str) -> Dict[str, Any]:
-        # MVP: Placeholder for slicing logic
+    """
+    Intra-procedural backward slicer for Python. For each function, the slicing
+    criteria are the calls into I/O libraries (or, when there are none, its
+    decision points); the slice is every statement they transitively depend on
+    through def-use chains and enclosing control structures.
+
+    Def-use chains are flow-insensitive apart from ordering: a use depends on the
+    earlier definitions of a name, plus later ones when both sit in the same loop.
+    """
+
+    def __init__(self, io_patterns: Optional[List[str]] = None,
+                 max_statements: int = MAX_SLICE_STATEMENTS, max_seconds: float = MAX_SLICE_SECONDS):
+        self.io_patterns = io_patterns or IO_PATTERNS
+        self.max_statements = max_statements
+        self.max_seconds = max_seconds
+
+    def slice(self, content: str, tree: Optional[ast.AST] = None) -> Dict[str, Any]:
+        """
+        Returns {"functions": [{name, lineno, lines, criteria, truncated}]} where
+        lines is a flat list of inclusive line ranges [first0, last0, first1, last1, ...].
+        Functions with nothing to slice on are left out, and so are files that
+        import no I/O library (the heuristics never flag anything in them).
+        """
+        if tree is None:
+            try:
+                tree = ast.parse(content)
+            except SyntaxError:
+                return {"functions": []}
+
+        statements = _statements(tree.body)
+        io_names = self._io_names(statements)
+        if not io_names:
+            return {"functions": []}
+
+        functions = []
+        for node in statements:
+            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                result = self._slice_function(node, io_names)
+                if result is not None:
+                    functions.append(result)
+        return {"functions": functions}
+
+    def _io_names(self, statements: List[ast.stmt]) -> Set[str]:
+        # Names bound by imports of I/O libraries, anywhere in the module
+        names = set()
+        for stmt in statements:
+            if isinstance(stmt, ast.Import):
+                for alias in stmt.names:
+                    if self._is_io_module(alias.name):
+                        names.add(alias.asname or alias.name.split('.')[0])
+            elif isinstance(stmt, ast.ImportFrom):
+                for alias in stmt.names:
+                    if self._is_io_module(f"{stmt.module or ''}.{alias.name}"):
+                        names.add(alias.asname or alias.name)
+        return names
+
+    def _is_io_module(self, name: str) -> bool:
+        name = name.lower()
+        return any(pat in name for pat in self.io_patterns)
+
+    def _slice_function(self, node, io_names: Set[str]) -> Optional[Dict[str, Any]]:
+        deadline = time.thread_time() + self.max_seconds
+        stmts: List[_Stmt] = []
+        self._flatten(node.body, (), (), stmts)
+
+        io_vars = set(io_names)
+        defs_by_name: Dict[str, List[int]] = {}
+        for index, stmt in enumerate(stmts):
+            if stmt.calls & io_vars:
+                stmt.is_io = True
+                if stmt.makes_handle:
+                    # client = httpx.Client(): calls through client are I/O too
+                    io_vars |= stmt.defs
+            for name in stmt.defs:
+                defs_by_name.setdefault(name, []).append(index)
+
+        criteria = [i for i, s in enumerate(stmts) if s.is_io]
+        if not criteria:
+            criteria = [i for i, s in enumerate(stmts) if s.is_decision]
+        if not criteria:
+            return None
+
+        included = set()
+        truncated = False
+        work = deque(criteria)
+        while work:
+            index = work.popleft()
+            if index in included:
+                continue
+            if len(included) >= self.max_statements or time.thread_time() > deadline:
+                truncated = True
+                break
+            included.add(index)
+            stmt = stmts[index]
+            work.extend(stmt.controls)
+            for name in stmt.uses:
+                for d in defs_by_name.get(name, ()):
+                    if d < index or (d > index and set(stmts[d].loops) & set(stmt.loops)):
+                        work.append(d)
+
+        # The signature always leads the slice so parameters read naturally
+        first_body_line = node.body[0].lineno if node.body else node.lineno
+        ranges = [(node.lineno, max(node.lineno, first_body_line - 1))]
+        ranges.extend((stmts[i].first, stmts[i].last) for i in included)
+
         return {
-            "slices": [],
-            "message": "Slicing not fully implemented in MVP"
+            "name": node.name,
+            "lineno": node.lineno,
+            "lines": _merge_ranges(ranges),
+            "criteria": len(criteria),
+            "truncated": truncated
         }
+
+    def _flatten(self, body: List[ast.stmt], controls: Tuple[int, ...], loops: Tuple[int, ...], out: List[_Stmt]):
+        for stmt in body:
+            if isinstance(stmt, ast.If):
+                index = self._header(out, stmt, [stmt.test], controls, loops, decision=True)
+                self._flatten(stmt.body, controls + (index,), loops, out)
+                self._flatten(stmt.orelse, controls + (index,), loops, out)
+
+            elif isinstance(stmt, (ast.For, ast.AsyncFor, ast.While)):
+                is_for = not isinstance(stmt, ast.While)
+                exprs = [stmt.target, stmt.iter] if is_for else [stmt.test]
+                index = self._header(out, stmt, exprs, controls, loops, decision=True)
+                # The loop header is part of its own loop: the test re-reads the body's writes
+                out[index].loops = loops + (index,)
+                self._flatten(stmt.body, controls + (index,), loops + (index,), out)
+                self._flatten(stmt.orelse, controls + (index,), loops, out)
+
+            elif isinstance(stmt, (ast.With, ast.AsyncWith)):
+                exprs = []
+                for item in stmt.items:
+                    exprs.append(item.context_expr)
+                    if item.optional_vars is not None:
+                        exprs.append(item.optional_vars)
+                index = self._header(out, stmt, exprs, controls, loops)
+                self._flatten(stmt.body, controls + (index,), loops, out)
+
+            elif isinstance(stmt, (ast.Try,) + ((ast.TryStar,) if hasattr(ast, "TryStar") else ())):
+                index = self._header(out, stmt, [], controls, loops)
+                inner = controls + (index,)
+                self._flatten(stmt.body, inner, loops, out)
+                for handler in stmt.handlers:
+                    h_index = self._header(out, handler, [handler.type] if handler.type else [], inner, loops, decision=True)
+                    if handler.name:
+                        out[h_index].defs.add(handler.name)
+                    self._flatten(handler.body, inner + (h_index,), loops, out)
+                self._flatten(stmt.orelse, inner, loops, out)
+                self._flatten(stmt.finalbody, inner, loops, out)
+
+            elif hasattr(ast, "Match") and isinstance(stmt, ast.Match):
+                index = self._header(out, stmt, [stmt.subject], controls, loops, decision=True)
+                for case in stmt.cases:
+                    exprs = [case.pattern] + ([case.guard] if case.guard else [])
+                    c_index = self._header(out, case.pattern, exprs, controls + (index,), loops, decision=True)
+                    for sub in ast.walk(case.pattern):
+                        bound = getattr(sub, "name", None) or getattr(sub, "rest", None)
+                        if isinstance(bound, str):
+                            out[c_index].defs.add(bound)
+                    self._flatten(case.body, controls + (index, c_index), loops, out)
+
+            elif isinstance(stmt, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+                # Nested definitions get their own slices; here they only bind a name
+                record = _Stmt(stmt.lineno, stmt.lineno, controls, loops)
+                record.defs.add(stmt.name)
+                out.append(record)
+
+            else:
+                end = getattr(stmt, "end_lineno", None) or stmt.lineno
+                record = _Stmt(stmt.lineno, end, controls, loops)
+                self._collect_names(record, [stmt])
+                # A bare method call (items.append(x)) mutates its receiver
+                if isinstance(stmt, ast.Expr) and isinstance(stmt.value, ast.Call):
+                    receiver = stmt.value.func
+                    if isinstance(receiver, ast.Attribute) and isinstance(receiver.value, ast.Name):
+                        record.defs.add(receiver.value.id)
+                out.append(record)
+
+    def _header(self, out: List[_Stmt], stmt, exprs: List[ast.AST], controls: Tuple[int, ...],
+                loops: Tuple[int, ...], decision: bool = False) -> int:
+        last = stmt.lineno
+        for expr in exprs:
+            last = max(last, getattr(expr, "end_lineno", None) or last)
+        record = _Stmt(stmt.lineno, last, controls, loops)
+        record.is_decision = decision
+        self._collect_names(record, exprs)
+        out.append(record)
+        return len(out) - 1
+
+    def _collect_names(self, record: _Stmt, roots: List[ast.AST]):
+        for root in roots:
+            for node in ast.walk(root):
+                node_type = type(node)
+                if node_type is ast.Name:
+                    if type(node.ctx) is ast.Load:
+                        record.uses.add(node.id)
+                    else:
+                        record.defs.add(node.id)
+                elif node_type is ast.Attribute or node_type is ast.Subscript:
+                    # x.attr = ... / x[i] = ... writes (part of) x
+                    if type(node.ctx) is not ast.Load:
+                        base = _root_name(node)
+                        if base:
+                            record.defs.add(base)
+                elif node_type is ast.Call:
+                    func = node.func
+                    base = _root_name(func)
+                    if base:
+                        record.calls.add(base)
+                    leaf = func.attr if type(func) is ast.Attribute else getattr(func, "id", "")
+                    if _HANDLE_FACTORY_RE.search(leaf):
+                        record.makes_handle = True
+                elif node_type is ast.AugAssign and type(node.target) is ast.Name:
+                    record.uses.add(node.target.id)
+
+def _root_name(node: ast.AST) -> Optional[str]:
+    # requests.get(url).json -> "requests"
+    while True:
+        node_type = type(node)
+        if node_type is ast.Name:
+            return node.id
+        if node_type is ast.Attribute or node_type is ast.Subscript:
+            node = node.value
+        elif node_type is ast.Call:
+            node = node.func
+        else:
+            return None
+
+def _statements(body: List[ast.stmt]) -> List[ast.stmt]:
+    """
+    Every statement in the module, in source order. Imports and definitions only
+    appear in statement lists, so expressions (the bulk of the tree) are skipped.
+    """
+    result = []
+    stack = list(reversed(body))
+    while stack:
+        stmt = stack.pop()
+        result.append(stmt)
+        children = []
+        for field in ("body", "orelse", "finalbody"):
+            value = getattr(stmt, field, None)
+            if isinstance(value, list):
+                children.extend(value)
+        for handler in getattr(stmt, "handlers", ()):
+            children.extend(handler.body)
+        for case in getattr(stmt, "cases", ()):
+            children.extend(case.body)
+        stack.extend(reversed(children))
+    return result
+
+def _merge_ranges(ranges: List[Tuple[int, int]]) -> List[int]:
+    merged: List[List[int]] = []
+    for first, last in sorted(ranges):
+        if merged and first <= merged[-1][1] + 1:
+            merged[-1][1] = max(merged[-1][1], last)
+        else:
+            merged.append([first, last])
+    return [line for span in merged for line in span]
@@ -0,0 +1,59 @@
+import os
+from contextlib import asynccontextmanager
+import httpx
+from fastapi import FastAPI, Request
+from backend.ai_engine.llm_client import LLMClient
+
+try:
+    import h2 # noqa: F401 -- httpx needs it for HTTP/2
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+# Outbound API calls (GitHub): fail fast
+HTTP_TIMEOUT_SECONDS = float(os.getenv("HTTP_TIMEOUT", "30"))
+# Model calls: a playbook can take minutes to generate
+LLM_HTTP_TIMEOUT_SECONDS = float(os.getenv("LLM_HTTP_TIMEOUT", "300"))
+
+def create_http_client(timeout: float = HTTP_TIMEOUT_SECONDS) -> httpx.AsyncClient:
+    """
+    A pooled client: connections are kept alive between requests, and HTTP/2
+    (one multiplexed connection per host) is used when h2 is installed.
+    """
+    limits = httpx.Limits(
+        max_connections=int(os.getenv("HTTP_MAX_CONNECTIONS", "100")),
+        max_keepalive_connections=int(os.getenv("HTTP_MAX_KEEPALIVE_CONNECTIONS", "20")),
+        keepalive_expiry=float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "30"))
+    )
+    return httpx.AsyncClient(http2=HTTP2_AVAILABLE, limits=limits, timeout=httpx.Timeout(timeout, connect=10.0))
+
+def _open_clients(app: FastAPI):
+    app.state.http_client = create_http_client()
+    app.state.llm_http_client = create_http_client(LLM_HTTP_TIMEOUT_SECONDS)
+    app.state.llm_client = LLMClient(http_client=app.state.llm_http_client)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Creates the process-wide clients at startup and closes their pools at shutdown."""
+    _open_clients(app)
+    try:
+        yield
+    finally:
+        await app.state.http_client.aclose()
+        await app.state.llm_http_client.aclose()
+
+def _ensure_clients(app: FastAPI):
+    # Apps served without the lifespan (scripts, TestClient outside a with block)
+    # still get shared clients, created on first use
+    if getattr(app.state, "http_client", None) is None:
+        _open_clients(app)
+
+def get_http_client(request: Request) -> httpx.AsyncClient:
+    """Dependency: the shared, pooled HTTP client."""
+    _ensure_clients(request.app)
+    return request.app.state.http_client
+
+def get_llm_client(request: Request) -> LLMClient:
+    """Dependency: the shared LLM client (one genai client over a pooled connection)."""
+    _ensure_clients(request.app)
+    return request.app.state.llm_client
@@ -14,9 +14,11 @@ class RepoSelectRequest(BaseModel):
 
 from backend.auth.firebase import verify_token
 from backend.auth.user_manager import user_manager
+from backend.analysis.catalog import catalog
+from backend.clients import get_http_client
 
 @router.get("/repos")
-async def get_repos(uid: str = Depends(verify_token)):
+async def get_repos(uid: str = Depends(verify_token), client: httpx.AsyncClient = Depends(get_http_client)):
     print(f"DEBUG: get_repos called for uid: {uid}")
     # Retrieve user's GitHub token
     github_token = user_manager.get_github_token(uid)
@@ -25,39 +27,38 @@ async def get_repos(uid: str = Depends(verify_token)):
         # For now, empty list indicates no connection key
         return []
     
-    async with httpx.AsyncClient() as client:
-        response = await client.get(
-            "https://api.github.com/user/repos",
-            headers={
-                "Authorization": f"Bearer {github_token}",
-                "Accept": "application/vnd.github.v3+json"
-            },
-            params={"per_page": 200, "sort": "updated"}
-        )
+    response = await client.get(
+        "https://api.github.com/user/repos",
+        headers={
+            "Authorization": f"Bearer {github_token}",
+            "Accept": "application/vnd.github.v3+json"
+        },
+        params={"per_page": 200, "sort": "updated"}
+    )
 
-        if response.status_code != 200:
-            # Token might be invalid or expired
-            print(f"GitHub API Error: {response.text}")
-             # If unauthorized, maybe token is bad.
-            if response.status_code == 401:
-                 return [] # Treat as no repos/disconnected
-            raise HTTPException(status_code=response.status_code, detail="Failed to fetch repos")
+    if response.status_code != 200:
+        # Token might be invalid or expired
+        print(f"GitHub API Error: {response.text}")
+         # If unauthorized, maybe token is bad.
+        if response.status_code == 401:
+             return [] # Treat as no repos/disconnected
+        raise HTTPException(status_code=response.status_code, detail="Failed to fetch repos")
 
-        repos = response.json()
+    repos = response.json()
+    
+    # Minimal data
+    minimized_repos = []
+    for repo in repos:
+        minimized_repos.append({
+            "name": repo["name"],
+            "full_name": repo["full_name"],
+            "private": repo["private"],
+            "language": repo["language"],
+            "updated_at": repo["updated_at"],
+            "clone_url": repo["clone_url"]
+        })
         
-        # Minimal data
-        minimized_repos = []
-        for repo in repos:
-            minimized_repos.append({
-                "name": repo["name"],
-                "full_name": repo["full_name"],
-                "private": repo["private"],
-                "language": repo["language"],
-                "updated_at": repo["updated_at"],
-                "clone_url": repo["clone_url"]
-            })
-            
-        return minimized_repos
+    return minimized_repos
 
 @router.post("/select-repo")
 async def select_repo(request: RepoSelectRequest, uid: str = Depends(verify_token)):
@@ -92,6 +93,9 @@ async def select_repo(request: RepoSelectRequest, uid: str = Depends(verify_toke
     try:
         git.Repo.clone_from(clone_url, target_dir)
     except git.GitCommandError as e:
+        catalog.delete_repo(f"{owner}-{name}")
         raise HTTPException(status_code=500, detail=f"Failed to clone repo: {str(e)}")
+
+    catalog.put_repo(owner, name, target_dir)
         
     return {"status": "cloned"}
@@ -5,12 +5,14 @@ from backend.github import repos as github_repos
 from backend.analysis import routes as analysis_routes
 from backend.ai_engine import routes as ai_routes
 from backend.workflow_engine import routes as workflow_routes
+from backend.clients import lifespan
 from dotenv import load_dotenv
 import os
 
 load_dotenv()
 
-app = FastAPI()
+# Shared HTTP and LLM clients live for the app's lifetime (see backend/clients.py)
+app = FastAPI(lifespan=lifespan)
 
 origins = [
     "http://localhost:3000",
@@ -1,4 +1,5 @@
 from typing import Dict, List, Any
+from backend.analysis.dependency_graph import DependencyGraph
 
 class RepoAdapter:
     """
@@ -14,7 +15,7 @@ class RepoAdapter:
         repo_name = report.get("repo", "Unknown Repo")
         summary = report.get("summary", {})
         files = report.get("files", {})
-        dependencies = report.get("dependencies", {})
+        dependencies = DependencyGraph.edges_by_file(report.get("dependencies", {}))
         agent_ops = report.get("agent_opportunities", [])
 
         # 1. High-level System Summary
@@ -42,6 +43,7 @@ class RepoAdapter:
                 "type": "module",
                 "functions": [f["name"] for f in ast_data.get("functions", [])],
                 "imports": ast_data.get("imports", []),
+                "depends_on": dependencies.get(filename, {}).get("internal", []),
                 "complexity": file_data.get("complexity", 0),
                 "calls": ast_data.get("calls", [])
             }
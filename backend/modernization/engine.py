@@ -1,54 +1,38 @@
 import os
 import json
 import uuid
+from typing import Any, AsyncIterator, Dict, Optional
 from backend.ai_engine.recommender import Recommender
+from backend.ai_engine.llm_client import LLMClient
+from backend.analysis.catalog import catalog
 from backend.workflow_engine.text_extractor import TextExtractor
 
 class ModernizationEngine:
     def __init__(self):
         self.text_extractor = TextExtractor()
         
-    async def modernize_repo(self, report_id: str, uid: str) -> dict:
+    async def modernize_repo(self, report_id: str, uid: str, refresh: bool = False,
+                             llm_client: Optional[LLMClient] = None) -> dict:
         """
         Orchestrates the modernization using the new AI Engine Recommender.
         """
-        # Delegate to the new Recommender which implements the rigor
-        # We pass report_id. Recommender needs to handle user-scoped loading?
-        # Current Recommender doesn't accept UID in init, let's patch it or handle pathing there.
-        # But wait, Recommender assumes "backend/data/reports".
-        # We need to make Recommender aware of User context OR copy report to global (bad).
-        
-        # Better: Update Recommender to accept UID (TODO in previous step).
-        # For now, let's instantiate Recommender and let it run.
-        # If Recommender is not user-aware, we might fail to find the report if it's in user_dir.
-        
-        # Let's fix Recommender to find the report by looking in both places
-        # OR we pass the absolute path/uid to Recommender.
-        
-        recommender = Recommender(report_id)
-        # Monkey-patch or update Recommender to look in user dir using a helper?
-        # Actually I should update Recommender.py to take an optional UID or search path.
-        # But to be safe and quick:
-        
-        # 1. Try to find the report manually
-        from backend.auth.user_manager import user_manager
-        user_dir = user_manager._get_user_dir(uid)
-        user_report_path = os.path.join(user_dir, "reports", f"{report_id}.json")
-        
-        # 2. If valid, ensure Recommender can read it.
-        # I will update Recommender.py in the next step to support this.
-        # For now, let's assume Recommender will be updated to take `uid`.
-        
-        recommender = Recommender(report_id, uid)
-        return await recommender.generate()
+        recommender = Recommender(report_id, uid, llm_client)
+        return await recommender.generate(bypass_cache=refresh)
+
+    def modernize_repo_stream(self, report_id: str, uid: str, refresh: bool = False,
+                              llm_client: Optional[LLMClient] = None) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Streaming modernize_repo: the Recommender's events, ending with "result"
+        once the recommendation is saved.
+        """
+        return Recommender(report_id, uid, llm_client).generate_stream(bypass_cache=refresh)
         
-    async def modernize_workflow(self, text: str, uid: str) -> dict:
+    async def modernize_workflow(self, text: str, uid: str, llm_client: Optional[LLMClient] = None) -> dict:
         """
         Orchestrates modernization of a text-based workflow.
         Legacy flow - we can keep utilizing LLMClient directly or refactor this too.
         """
-        from backend.ai_engine.llm_client import LLMClient
-        client = LLMClient()
+        client = llm_client or LLMClient()
         
         system_description = {
             "input_type": "workflow",
@@ -73,7 +57,33 @@ class ModernizationEngine:
         # I MUST fix LLMClient.modernize to work for workflows OR implement `modernize_workflow`.
         
         playbook = await client.modernize_workflow_text(text)
-        
+        return self._finish_workflow(text, playbook, uid)
+
+    async def modernize_workflow_stream(self, text: str, uid: str,
+                                        llm_client: Optional[LLMClient] = None) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Streaming modernize_workflow: "section" and "item" events as the playbook
+        is written, then "result" with the saved workflow report (with its id).
+        """
+        client = llm_client or LLMClient()
+
+        yield {"type": "start"}
+        playbook = None
+        try:
+            async for event in client.stream_workflow_text(text):
+                if event[0] == "result":
+                    playbook = event[1]
+                elif event[0] == "field":
+                    yield {"type": "section", "key": event[1], "value": event[2]}
+                else:
+                    yield {"type": "item", "key": event[1], "index": event[2], "value": event[3]}
+        except Exception as e:
+            print(f"Workflow Modernization Error: {e}")
+            playbook = {"error": str(e)}
+
+        yield {"type": "result", "workflow": self._finish_workflow(text, playbook or {"error": "No answer"}, uid)}
+
+    def _finish_workflow(self, text: str, playbook: dict, uid: str) -> dict:
         workflow_id = str(uuid.uuid4())
         playbook["id"] = workflow_id
         playbook["original_text_snippet"] = text[:200]
@@ -121,24 +131,22 @@ class ModernizationEngine:
         with open(path, 'w') as f:
             json.dump(data, f, indent=2)
 
-    def list_workflow_reports(self, uid: str) -> list:
-        from backend.auth.user_manager import user_manager
-        user_dir = user_manager._get_user_dir(uid)
-        workflow_dir = os.path.join(user_dir, "modernization", "workflow")
-        
-        reports = []
-        if os.path.exists(workflow_dir):
-            for filename in os.listdir(workflow_dir):
-                if filename.endswith(".json"):
-                    try:
-                        with open(os.path.join(workflow_dir, filename), 'r') as f:
-                            data = json.load(f)
-                            reports.append({
-                                "id": data.get("id", filename.replace(".json", "")),
-                                "name": data.get("name", "Untitled Workflow"),
-                                "summary": data.get("workflow_summary", "")[:100] + "...",
-                                "created_at": data.get("created_at", "")
-                            })
-                    except Exception:
-                        continue
-        return reports
+        if source_type == "workflow":
+            catalog.put_workflow(
+                uid, data.get("id", id), data.get("name", "Untitled Workflow"),
+                data.get("workflow_summary", ""), data.get("created_at") or None
+            )
+        elif source_type == "repo":
+            catalog.put_recommendation(uid, id)
+
+    def list_workflow_reports(self, uid: str, offset: int = 0, limit: Optional[int] = None) -> list:
+        # Newest first, straight from the catalog instead of opening every workflow file
+        return [
+            {
+                "id": row["workflow_id"],
+                "name": row["name"],
+                "summary": (row["summary"] or "")[:100] + "...",
+                "created_at": row["created_at"]
+            }
+            for row in catalog.list_workflows(uid, offset, limit)
+        ]
@@ -1,7 +1,13 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Query
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from backend.modernization.engine import ModernizationEngine
+from backend.analysis.catalog import catalog
+from backend.ai_engine.streaming import sse_event
+from backend.ai_engine.llm_client import LLMClient
+from backend.clients import get_llm_client
 from backend.auth.firebase import verify_token
+from typing import Optional
 import os
 
 router = APIRouter()
@@ -9,14 +15,16 @@ engine = ModernizationEngine()
 
 class RepoModernizeRequest(BaseModel):
     report_id: str
+    refresh: bool = False # skip the LLM response cache and ask the model again
 
 @router.post("/modernize/repo")
 async def modernize_repo(
     request: RepoModernizeRequest,
-    uid: str = Depends(verify_token)
+    uid: str = Depends(verify_token),
+    llm: LLMClient = Depends(get_llm_client)
 ):
     try:
-        result = await engine.modernize_repo(request.report_id, uid)
+        result = await engine.modernize_repo(request.report_id, uid, refresh=request.refresh, llm_client=llm)
         if not result:
              raise HTTPException(status_code=404, detail="Analysis failed or report not found")
         return result
@@ -25,6 +33,39 @@ async def modernize_repo(
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/modernize/repo/stream")
+async def modernize_repo_stream(
+    request: RepoModernizeRequest,
+    uid: str = Depends(verify_token),
+    llm: LLMClient = Depends(get_llm_client)
+):
+    """
+    Same as /modernize/repo, but as Server-Sent Events: "start", then "section"
+    (system_summary, modernization_playbook, ...) and "item" (each pain point and
+    agent opportunity) as the model writes them, and "result" with the saved
+    recommendation (or "error").
+    """
+    events = engine.modernize_repo_stream(request.report_id, uid, refresh=request.refresh, llm_client=llm)
+    try:
+        # Runs up to the "start" event, so a missing report is still a 404
+        first = await events.__anext__()
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+    async def messages():
+        yield sse_event(first)
+        try:
+            async for event in events:
+                yield sse_event(event)
+        except Exception as e:
+            import traceback
+            traceback.print_exc()
+            yield sse_event({"type": "error", "detail": str(e)})
+        finally:
+            await events.aclose()
+
+    return StreamingResponse(messages(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
 @router.get("/modernize/repo/{report_id}")
 async def get_repo_recommendation(
     report_id: str,
@@ -41,9 +82,13 @@ async def get_repo_recommendation(
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/modernize/workflows")
-async def list_workflows(uid: str = Depends(verify_token)):
+async def list_workflows(
+    offset: int = Query(0, ge=0),
+    limit: Optional[int] = Query(None, ge=1, le=1000),
+    uid: str = Depends(verify_token)
+):
     try:
-        return engine.list_workflow_reports(uid)
+        return engine.list_workflow_reports(uid, offset, limit)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -57,6 +102,7 @@ async def delete_workflow(workflow_id: str, uid: str = Depends(verify_token)):
         path = os.path.join(user_dir, "modernization", "workflow", f"{workflow_id}.json")
         if os.path.exists(path):
             os.remove(path)
+            catalog.delete_workflow(uid, workflow_id)
             return {"status": "deleted", "id": workflow_id}
         else:
             raise HTTPException(status_code=404, detail="Workflow report not found")
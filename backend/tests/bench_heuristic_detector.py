@@ -0,0 +1,53 @@
+import sys
+import os
+import random
+import time
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from backend.ai_engine.heuristics import HeuristicDetector
+
+IMPORT_POOL = [
+    "requests", "httpx", "json", "os", "re", "typing", "boto3", "sqlalchemy", "redis", "pydantic",
+    "react", "next/link", "@/lib/api", "@/components/ui/button", "openai", "firebase/auth", "lodash",
+    "datetime", "collections", "itertools", "fastapi", "google.cloud.storage", "numpy", "pandas"
+]
+NAME_PARTS = ["process", "get", "load", "render", "handle", "order", "user", "run", "build", "parse",
+              "Submit", "sync", "report", "task", "cache", "set", "compute", "fetch", "Home", "on"]
+EXTENSIONS = [".py", ".ts", ".tsx", ".go"]
+DIRS = ["services", "components", "lib", "pages", "jobs", "utils"]
+
+def make_corpus(n_functions: int, functions_per_file: int, imports_per_file: int, seed: int = 0) -> dict:
+    rng = random.Random(seed)
+    files_data = {}
+    for i in range(n_functions // functions_per_file):
+        path = f"{rng.choice(DIRS)}/module_{i}{rng.choice(EXTENSIONS)}"
+        imports = rng.sample(IMPORT_POOL, min(imports_per_file, len(IMPORT_POOL)))
+        # Pad with project-local modules so import lists can grow past the pool
+        imports += [f"app.module_{rng.randrange(500)}" for _ in range(imports_per_file - len(imports))]
+        functions = []
+        for j in range(functions_per_file):
+            name = rng.choice(NAME_PARTS) + rng.choice(NAME_PARTS).capitalize() + str(j)
+            functions.append({"name": name, "lineno": j * 10 + 1, "end_lineno": j * 10 + 9, "complexity": rng.randrange(1, 15)})
+        files_data[path] = {"ast": {"functions": functions, "imports": imports}, "complexity": rng.randrange(1, 40)}
+    return files_data
+
+def bench(files_data: dict, repeat: int = 3) -> tuple:
+    detector = HeuristicDetector()
+    best = float("inf")
+    found = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        found = len(detector.detect(files_data))
+        best = min(best, time.perf_counter() - start)
+    return best, found
+
+if __name__ == "__main__":
+    # Same 100k functions, spread over fewer or more files and with short or long
+    # import lists: time should follow functions (and candidates), not functions x imports
+    print(f"{'functions':>10} {'per file':>9} {'imports':>8} {'seconds':>8} {'candidates':>11}")
+    for per_file, n_imports in ((10, 5), (10, 50), (100, 5), (100, 50)):
+        corpus = make_corpus(100_000, per_file, n_imports)
+        seconds, found = bench(corpus)
+        print(f"{100_000:>10} {per_file:>9} {n_imports:>8} {seconds:>8.3f} {found:>11}")
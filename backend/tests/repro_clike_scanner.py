@@ -0,0 +1,123 @@
+import sys
+import os
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from backend.analysis.clike_scanner import CLikeScanner
+
+GO_SOURCE = """package main
+
+import (
+    "fmt"
+    "os"
+)
+
+func main() {
+    for _, f := range getFiles(dir) {
+        if isDir(f) {
+            fmt.Println(f)
+        }
+    }
+}
+"""
+
+JS_SOURCE = """import { load } from './loader';
+
+const total = (items) => items.reduce((a, b) => a + b, 0);
+
+const fetchAll = async (urls) => {
+    if (!urls.length) {
+        return [];
+    }
+    return Promise.all(urls.map(u => load(u)));
+};
+
+export const handler = async function (event) {
+    return event ? fetchAll(event.urls) : null;
+};
+"""
+
+TS_SOURCE = """export class UserService {
+    private cache = new Map();
+
+    getUser(id: string) {
+        const re = /\\{[a-z]+/g;
+        if (re.test(id)) {
+            return this.cache.get(id);
+        }
+        return null;
+    }
+
+    clear() {
+        this.cache.clear();
+    }
+}
+
+export function isPath(value: string) {
+    return value.split(/[/}]/).length > 1;
+}
+"""
+
+def test_go_conditions_are_not_definitions():
+    print("Testing CLikeScanner on Go...")
+    result = CLikeScanner().scan(GO_SOURCE, "main.go")
+
+    # "range getFiles(dir) {" and "if isDir(f) {" are calls, not definitions
+    names = [f["name"] for f in result["functions"]]
+    assert names == ["main"], f"Expected only main, got {names}"
+
+    main = result["functions"][0]
+    assert (main["lineno"], main["end_lineno"]) == (8, 14)
+    assert main["complexity"] == 3, f"Expected the loop and the if charged to main, got {main['complexity']}"
+    assert {"getFiles", "isDir", "Println"} <= set(result["calls"])
+    assert result["imports"] == ["fmt", "os"]
+    assert result["control_structures"]["for"] == 1
+
+    print("✅ Go Scan Test Passed!")
+
+def test_js_arrows():
+    print("Testing CLikeScanner on JS arrows...")
+    result = CLikeScanner().scan(JS_SOURCE, "app.js")
+
+    functions = {f["name"]: f for f in result["functions"]}
+    assert list(functions) == ["total", "fetchAll", "handler"], f"Got {list(functions)}"
+
+    # Expression body: ends with its statement
+    assert (functions["total"]["lineno"], functions["total"]["end_lineno"]) == (3, 3)
+    # Block body: ends at its closing brace
+    assert (functions["fetchAll"]["lineno"], functions["fetchAll"]["end_lineno"]) == (5, 10)
+    assert functions["fetchAll"].get("async") is True
+    assert functions["fetchAll"]["complexity"] == 2
+    # Assigned function expression
+    assert (functions["handler"]["lineno"], functions["handler"]["end_lineno"]) == (12, 14)
+    assert functions["handler"].get("async") is True
+    assert functions["handler"]["complexity"] == 2
+
+    assert result["imports"] == ["./loader"]
+    assert "load" in result["calls"]
+
+    print("✅ JS Arrow Test Passed!")
+
+def test_ts_regex_literals():
+    print("Testing CLikeScanner on TS regex literals...")
+    result = CLikeScanner().scan(TS_SOURCE, "user.ts")
+
+    # Braces and slashes inside /.../ don't open or close anything
+    functions = {f["name"]: f for f in result["functions"]}
+    assert list(functions) == ["getUser", "clear", "isPath"], f"Got {list(functions)}"
+    assert (functions["getUser"]["lineno"], functions["getUser"]["end_lineno"]) == (4, 10)
+    assert functions["getUser"]["complexity"] == 2
+    assert (functions["clear"]["lineno"], functions["clear"]["end_lineno"]) == (12, 14)
+    assert (functions["isPath"]["lineno"], functions["isPath"]["end_lineno"]) == (17, 19)
+
+    service = result["classes"][0]
+    assert (service["name"], service["lineno"], service["end_lineno"]) == ("UserService", 1, 15)
+    assert {"test", "get", "split"} <= set(result["calls"])
+
+    print("✅ TS Regex Literal Test Passed!")
+
+if __name__ == "__main__":
+    test_go_conditions_are_not_definitions()
+    test_js_arrows()
+    test_ts_regex_literals()
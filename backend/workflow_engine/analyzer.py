@@ -1,14 +1,15 @@
 import os
 import json
 import uuid
+from typing import Optional
 from fastapi import UploadFile
 from backend.workflow_engine.text_extractor import TextExtractor
 from backend.ai_engine.llm_client import LLMClient
 
 class WorkflowAnalyzer:
-    def __init__(self):
+    def __init__(self, llm_client: Optional[LLMClient] = None):
         self.extractor = TextExtractor()
-        self.llm_client = LLMClient()
+        self.llm_client = llm_client or LLMClient()
         self.storage_dir = os.path.join("backend", "data", "workflows")
         os.makedirs(self.storage_dir, exist_ok=True)
 
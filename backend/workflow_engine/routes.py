@@ -1,4 +1,8 @@
 from fastapi import APIRouter, UploadFile, File, Form, HTTPException, Depends
+from fastapi.responses import StreamingResponse
+from backend.ai_engine.streaming import sse_event
+from backend.ai_engine.llm_client import LLMClient
+from backend.clients import get_llm_client
 from backend.modernization.engine import ModernizationEngine
 from backend.auth.firebase import verify_token
 
@@ -10,7 +14,8 @@ modernization_engine = ModernizationEngine()
 async def analyze_workflow_document(
     file: UploadFile = File(None),
     text_input: str = Form(None),
-    uid: str = Depends(verify_token)
+    uid: str = Depends(verify_token),
+    llm: LLMClient = Depends(get_llm_client)
 ):
     try:
         # Extract text first (using helper from Engine or manually)
@@ -22,13 +27,46 @@ async def analyze_workflow_document(
         else:
             raise HTTPException(status_code=400, detail="No input provided")
 
-        analysis = await modernization_engine.modernize_workflow(text, uid)
+        analysis = await modernization_engine.modernize_workflow(text, uid, llm_client=llm)
         return analysis
     except Exception as e:
         import traceback
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/analyze/stream")
+async def analyze_workflow_document_stream(
+    file: UploadFile = File(None),
+    text_input: str = Form(None),
+    uid: str = Depends(verify_token),
+    llm: LLMClient = Depends(get_llm_client)
+):
+    """
+    Same as /analyze, but as Server-Sent Events: "start", "section" and "item"
+    events as the playbook is written, then "result" with the saved workflow
+    report (or "error").
+    """
+    if file:
+        text = await modernization_engine.text_extractor.extract(file)
+    elif text_input:
+        text = text_input
+    else:
+        raise HTTPException(status_code=400, detail="No input provided")
+
+    async def messages():
+        events = modernization_engine.modernize_workflow_stream(text, uid, llm_client=llm)
+        try:
+            async for event in events:
+                yield sse_event(event)
+        except Exception as e:
+            import traceback
+            traceback.print_exc()
+            yield sse_event({"type": "error", "detail": str(e)})
+        finally:
+            await events.aclose()
+
+    return StreamingResponse(messages(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
 @router.get("/{id}")
 async def get_workflow_analysis(
     id: str,
@@ -98,6 +98,12 @@ export function AgentOpportunityCard({ opp }: AgentOpportunityProps) {
                         <div className="text-xs text-muted-foreground prose dark:prose-invert max-w-none">
                             <ReactMarkdown>{reasoning}</ReactMarkdown>
                         </div>
+                        {opp.llm_justification && (
+                             <div className="mt-2 bg-muted/50 p-2 rounded text-xs border">
+                                <span className="font-semibold block mb-1 text-primary">Why an agent here</span>
+                                {opp.llm_justification}
+                             </div>
+                        )}
                         {opp.details?.implementation_tips && (
                              <div className="mt-2 bg-muted/50 p-2 rounded text-xs border">
                                 <span className="font-semibold block mb-1 text-primary">💡 Implementation Tip</span>
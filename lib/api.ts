@@ -66,6 +66,28 @@ export async function runAnalysis(repoFullName: string, token: string) {
     return res.json();
 }
 
+// Streams analysis events (start, file, dependencies, summary, done/error) as they arrive
+export async function runAnalysisStream(
+    repoFullName: string,
+    token: string,
+    onEvent: (event: any) => void
+) {
+    const res = await fetch(`${API_URL}/analysis/run/stream`, {
+        method: "POST",
+        headers: {
+            "Content-Type": "application/json",
+            "Authorization": `Bearer ${token}`
+        },
+        body: JSON.stringify({ repo_name: repoFullName }),
+    });
+
+    if (!res.ok || !res.body) {
+        throw new Error("Failed to run analysis");
+    }
+
+    await readNdjsonStream(res, onEvent);
+}
+
 export async function getReports(token: string) {
     const res = await fetch(`${API_URL}/analysis/list`, {
         headers: {
@@ -90,6 +112,53 @@ export async function getReport(id: string, token: string) {
     return res.json();
 }
 
+export async function getReportSummary(id: string, token: string, opportunities = false) {
+    const res = await fetch(`${API_URL}/analysis/${id}/summary?opportunities=${opportunities}`, {
+        headers: {
+            "Authorization": `Bearer ${token}`
+        }
+    });
+    if (!res.ok) {
+        throw new Error("Failed to fetch report summary");
+    }
+    return res.json();
+}
+
+export async function getReportFiles(
+    id: string,
+    token: string,
+    options: { sort?: "complexity" | "functions" | "path"; order?: "asc" | "desc"; offset?: number; limit?: number; fields?: string[] } = {}
+) {
+    const params = new URLSearchParams();
+    if (options.sort) params.set("sort", options.sort);
+    if (options.order) params.set("order", options.order);
+    if (options.offset !== undefined) params.set("offset", String(options.offset));
+    if (options.limit !== undefined) params.set("limit", String(options.limit));
+    if (options.fields) params.set("fields", options.fields.join(","));
+    const res = await fetch(`${API_URL}/analysis/${id}/files?${params}`, {
+        headers: {
+            "Authorization": `Bearer ${token}`
+        }
+    });
+    if (!res.ok) {
+        throw new Error("Failed to fetch report files");
+    }
+    return res.json();
+}
+
+export async function getReportFile(id: string, path: string, token: string) {
+    const encoded = path.split("/").map(encodeURIComponent).join("/");
+    const res = await fetch(`${API_URL}/analysis/${id}/files/${encoded}`, {
+        headers: {
+            "Authorization": `Bearer ${token}`
+        }
+    });
+    if (!res.ok) {
+        throw new Error("Failed to fetch report file");
+    }
+    return res.json();
+}
+
 export async function generateRecommendations(reportId: string, token: string) {
     const res = await fetch(`${API_URL}/ai/recommend`, {
         method: "POST",
@@ -122,6 +191,111 @@ export async function modernizeRepo(reportId: string, token: string) {
     return res.json();
 }
 
+// Streams one LLM explanation per heuristic candidate (start, explanation, done/error) as each completes
+export async function explainOpportunitiesStream(
+    reportId: string,
+    token: string,
+    onEvent: (event: any) => void
+) {
+    const res = await fetch(`${API_URL}/ai/explain/stream`, {
+        method: "POST",
+        headers: {
+            "Content-Type": "application/json",
+            "Authorization": `Bearer ${token}`
+        },
+        body: JSON.stringify({ report_id: reportId }),
+    });
+
+    if (!res.ok || !res.body) {
+        throw new Error("Failed to explain opportunities");
+    }
+
+    await readNdjsonStream(res, onEvent);
+}
+
+// Reads a newline-delimited JSON response, calling onEvent with each line's JSON
+async function readNdjsonStream(res: Response, onEvent: (event: any) => void) {
+    const reader = res.body!.getReader();
+    const decoder = new TextDecoder();
+    let buffer = "";
+    while (true) {
+        const { done, value } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+        const lines = buffer.split("\n");
+        buffer = lines.pop() || "";
+        for (const line of lines) {
+            if (line.trim()) onEvent(JSON.parse(line));
+        }
+    }
+    if (buffer.trim()) onEvent(JSON.parse(buffer));
+}
+
+// Reads a Server-Sent Events response, calling onEvent with each message's JSON data
+async function readEventStream(res: Response, onEvent: (event: any) => void) {
+    const reader = res.body!.getReader();
+    const decoder = new TextDecoder();
+    let buffer = "";
+    while (true) {
+        const { done, value } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+        const messages = buffer.split("\n\n");
+        buffer = messages.pop() || "";
+        for (const message of messages) {
+            const data = message.split("\n").filter(l => l.startsWith("data: ")).map(l => l.slice(6)).join("\n");
+            if (data) onEvent(JSON.parse(data));
+        }
+    }
+}
+
+// Streams the playbook as it is generated: start, section, item, then result (or error)
+export async function modernizeRepoStream(
+    reportId: string,
+    token: string,
+    onEvent: (event: any) => void,
+    refresh = false
+) {
+    const res = await fetch(`${API_URL}/modernize/repo/stream`, {
+        method: "POST",
+        headers: {
+            "Content-Type": "application/json",
+            "Authorization": `Bearer ${token}`
+        },
+        body: JSON.stringify({ report_id: reportId, refresh }),
+    });
+
+    if (!res.ok || !res.body) {
+        throw new Error("Failed to modernize repo");
+    }
+    await readEventStream(res, onEvent);
+}
+
+// Streams a workflow playbook as it is generated: start, section, item, then result (or error)
+export async function uploadWorkflowStream(
+    file: File | null,
+    text: string | null,
+    token: string,
+    onEvent: (event: any) => void
+) {
+    const formData = new FormData();
+    if (file) formData.append("file", file);
+    if (text) formData.append("text_input", text);
+
+    const res = await fetch(`${API_URL}/workflow/analyze/stream`, {
+        method: "POST",
+        headers: {
+             "Authorization": `Bearer ${token}`
+        },
+        body: formData,
+    });
+
+    if (!res.ok || !res.body) {
+        throw new Error("Failed to analyze workflow");
+    }
+    await readEventStream(res, onEvent);
+}
+
 export async function getModernizationRecommendation(reportId: string, token: string) {
     const res = await fetch(`${API_URL}/modernize/repo/${reportId}`, {
         headers: {